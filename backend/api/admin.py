@@ -1,6 +1,11 @@
 from django.contrib import admin
 from django.contrib.auth.admin import UserAdmin
-from .models import User, Post, Comment, SavedPost
+from django.db.models import Count, Q
+
+from . import search
+from .models import (
+    User, Post, Comment, SavedPost, Like, UploadJob, MediaAsset, OutboxEmail, Follow, FanoutJob, PostSearchTerm, Tag
+)
 
 
 @admin.register(User)
@@ -26,6 +31,18 @@ class PostAdmin(admin.ModelAdmin):
     readonly_fields = ('created_at', 'updated_at', 'likes_count')
     ordering = ('-created_at',)
 
+    def get_search_results(self, request, queryset, search_term):
+        # Use the inverted index instead of LIKE '%term%' scans over caption/tags/location
+        terms = search.query_terms(search_term)
+        if not terms:
+            return super().get_search_results(request, queryset, search_term)
+        matching = (
+            PostSearchTerm.objects.filter(term__in=terms).values('post_id')
+            .annotate(matched=Count('term')).filter(matched=len(terms)).values('post_id')
+        )
+        by_author = Q(user__username__iexact=search_term.strip())
+        return queryset.filter(Q(id__in=matching) | by_author), False
+
 
 @admin.register(Comment)
 class CommentAdmin(admin.ModelAdmin):
@@ -43,3 +60,63 @@ class SavedPostAdmin(admin.ModelAdmin):
     search_fields = ('user__username', 'post__caption')
     readonly_fields = ('created_at',)
     ordering = ('-created_at',)
+
+
+@admin.register(Like)
+class LikeAdmin(admin.ModelAdmin):
+    list_display = ('user', 'post', 'created_at')
+    search_fields = ('user__username',)
+    raw_id_fields = ('user', 'post')
+    readonly_fields = ('created_at',)
+    ordering = ('-created_at',)
+
+
+@admin.register(UploadJob)
+class UploadJobAdmin(admin.ModelAdmin):
+    list_display = ('id', 'action', 'target_type', 'target_id', 'status', 'attempts', 'run_after', 'created_at')
+    list_filter = ('action', 'status', 'target_type')
+    search_fields = ('original_name', 'url', 'last_error')
+    readonly_fields = ('created_at', 'updated_at')
+    ordering = ('-created_at',)
+
+
+@admin.register(MediaAsset)
+class MediaAssetAdmin(admin.ModelAdmin):
+    list_display = ('key', 'url', 'format', 'width', 'height', 'size_bytes', 'ref_count', 'created_at')
+    search_fields = ('key', 'url')
+    readonly_fields = ('created_at',)
+    ordering = ('-created_at',)
+
+
+@admin.register(OutboxEmail)
+class OutboxEmailAdmin(admin.ModelAdmin):
+    list_display = ('id', 'recipient', 'subject', 'status', 'attempts', 'run_after', 'created_at', 'sent_at')
+    list_filter = ('status',)
+    search_fields = ('recipient', 'subject', 'last_error')
+    readonly_fields = ('created_at', 'sent_at')
+    ordering = ('-created_at',)
+
+
+@admin.register(Follow)
+class FollowAdmin(admin.ModelAdmin):
+    list_display = ('follower', 'followee', 'created_at')
+    search_fields = ('follower__username', 'followee__username')
+    readonly_fields = ('created_at',)
+    ordering = ('-created_at',)
+
+
+@admin.register(FanoutJob)
+class FanoutJobAdmin(admin.ModelAdmin):
+    list_display = ('id', 'post', 'status', 'attempts', 'run_after', 'created_at')
+    list_filter = ('status',)
+    search_fields = ('last_error',)
+    readonly_fields = ('created_at',)
+    ordering = ('-created_at',)
+
+
+@admin.register(Tag)
+class TagAdmin(admin.ModelAdmin):
+    list_display = ('name', 'post_count', 'created_at', 'updated_at')
+    search_fields = ('name',)
+    readonly_fields = ('created_at', 'updated_at')
+    ordering = ('-post_count',)
@@ -0,0 +1,184 @@
+"""
+Async versions of the hot read endpoints, for ASGI deployments
+
+Under WSGI a worker blocked on a MySQL query serves nothing else until it
+returns. Served through snapgram_backend/asgi.py, GET requests to the home
+feed, post detail, comments and profile posts are handled by the coroutines
+here instead: every query goes through Django's async ORM, so one worker
+keeps accepting requests while earlier ones wait on the database.
+
+The responses are the same JSON as the DRF views (fast_lists rows or the
+same serializers, following FAST_LIST_SERIALIZATION, and the same pagination
+links), with ETags hashed from the same validator rows. Anything else sent
+to these URLs (creating posts and comments, editing, deleting) is handed to
+the existing DRF view in a worker thread, so writes and the Cloudinary/SMTP
+calls they trigger never block the event loop.
+
+urls.py wraps the DRF views with `read_async`, which only takes effect when
+ASYNC_READ_VIEWS is on; asgi.py turns it on by default.
+"""
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db.models import Q
+from django.http import HttpResponse
+from django.utils.cache import get_conditional_response, patch_vary_headers
+from django.views.decorators.csrf import csrf_exempt
+from rest_framework import exceptions
+from rest_framework.request import Request
+from rest_framework.settings import api_settings
+
+from .conditional import (
+    POST_VALIDATOR_FIELDS, POST_DETAIL_VALIDATOR_FIELDS, COMMENT_VALIDATOR_FIELDS, make_etag, with_viewer_state
+)
+from .fast_lists import POST_ROW_FIELDS, COMMENT_ROW_FIELDS, apost_rows, apost_rows_in_order, comment_rows
+from .metrics import serializing
+from .models import Post, Comment
+from .pagination import TimelineCursorPagination, PostCursorPagination, CommentCursorPagination
+from .renderers import FastJSONRenderer
+from .serializers import PostSerializer, PostListSerializer, CommentSerializer, aresolve_viewer_state
+from .timelines import atimeline_sources
+
+
+def read_async(read_view, view):
+    """
+    A view answering GET with the coroutine `read_view` and every other
+    method with the DRF `view`; just `view` when ASYNC_READ_VIEWS is off
+    """
+    if not settings.ASYNC_READ_VIEWS:
+        return view
+    threaded_view = sync_to_async(view)
+
+    async def dispatch(request, *args, **kwargs):
+        if request.method != 'GET':
+            return await threaded_view(request, *args, **kwargs)
+        try:
+            request.user = await authenticate(request)
+            return await read_view(request, *args, **kwargs)
+        except exceptions.APIException as exc:
+            return error_response(request, exc)
+
+    # Requests authenticate with a JWT header, not the session cookie (like APIView)
+    return csrf_exempt(dispatch)
+
+
+async def authenticate(request):
+    """The user for the request's credentials, using the DRF authentication classes"""
+    for authenticator in api_settings.DEFAULT_AUTHENTICATION_CLASSES:
+        # JWTAuthentication reads the user from the database, so it runs in a thread
+        result = await sync_to_async(authenticator().authenticate)(request)
+        if result is not None:
+            return result[0]
+    raise exceptions.NotAuthenticated()
+
+
+def json_response(data, status=200):
+    response = HttpResponse(FastJSONRenderer().render(data), content_type='application/json', status=status)
+    patch_vary_headers(response, ['Accept'])
+    return response
+
+
+def error_response(request, exc):
+    """The response DRF's exception handler would give for `exc`"""
+    data = exc.detail if isinstance(exc.detail, (list, dict)) else {'detail': exc.detail}
+    response = json_response(data, status=exc.status_code)
+    if isinstance(exc, (exceptions.NotAuthenticated, exceptions.AuthenticationFailed)):
+        authenticator = api_settings.DEFAULT_AUTHENTICATION_CLASSES[0]()
+        response['WWW-Authenticate'] = authenticator.authenticate_header(request)
+    return response
+
+
+async def conditional_response(request, validator_rows, build_data):
+    """
+    JSON response with a weak ETag, or 304 Not Modified when If-None-Match matches
+
+    The ETag hashes the same validator rows as the DRF view (ConditionalGetMixin),
+    so both give the same ETag and a 304 never awaits `build_data()`.
+    """
+    etag = make_etag(request.user.pk, request.get_full_path(), request.META.get('HTTP_ACCEPT', ''), validator_rows)
+    response = get_conditional_response(request, etag=etag)
+    if response is None:
+        response = json_response(await build_data())
+    response['ETag'] = etag
+    response['Cache-Control'] = 'private, no-cache'
+    return response
+
+
+async def post_list_data(request, posts):
+    """PostListSerializer data for model instances, with the viewer state resolved through the async ORM"""
+    context = {'request': request, 'viewer_state': await aresolve_viewer_state(request.user, [post.pk for post in posts])}
+    with serializing():
+        return PostListSerializer(posts, many=True, context=context).data
+
+
+async def home_feed(request):
+    """GET /api/posts/ (PostListView)"""
+    paginator = TimelineCursorPagination()
+    rows = await paginator.apaginate_querysets(await atimeline_sources(request.user), Request(request))
+    post_ids = [row['post_id'] for row in rows]
+    # Timeline rows may outlive a post's visibility, so the check happens here
+    visible = Post.objects.filter(Q(user__is_private=False, is_private=False) | Q(user=request.user))
+    validators = with_viewer_state(visible.filter(id__in=post_ids), request.user).order_by()
+    validators = sorted([row async for row in validators.values(*POST_VALIDATOR_FIELDS)], key=lambda row: row['id'])
+
+    async def build_data():
+        if settings.FAST_LIST_SERIALIZATION:
+            page = await apost_rows_in_order(visible, post_ids, request.user)
+        else:
+            posts = {post.pk: post async for post in visible.select_related('user').filter(id__in=post_ids).order_by()}
+            page = await post_list_data(request, [posts[post_id] for post_id in post_ids if post_id in posts])
+        return paginator.get_paginated_data(page)
+    return await conditional_response(request, [post_ids, validators], build_data)
+
+
+async def post_detail(request, id):
+    """GET /api/posts/<id>/ (PostDetailView)"""
+    visible = Post.objects.filter(Q(is_private=False) | Q(user=request.user)).filter(id=id)
+    validators = with_viewer_state(visible, request.user).order_by().values(*POST_DETAIL_VALIDATOR_FIELDS)
+
+    async def build_data():
+        try:
+            post = await visible.select_related('user').aget()
+        except Post.DoesNotExist:
+            raise exceptions.NotFound('No Post matches the given query.')
+        context = {'request': request, 'viewer_state': await aresolve_viewer_state(request.user, [post.pk])}
+        with serializing():
+            return PostSerializer(post, context=context).data
+    return await conditional_response(request, [row async for row in validators], build_data)
+
+
+async def comments(request, post_id):
+    """GET /api/posts/<post_id>/comments/ (CommentListView)"""
+    queryset = Comment.objects.filter(post_id=post_id)
+    # A separate paginator so the real page is read from scratch, as in ConditionalGetMixin
+    validators = await CommentCursorPagination().apaginate_queryset(
+        queryset.values(*COMMENT_VALIDATOR_FIELDS), Request(request)
+    )
+
+    async def build_data():
+        paginator = CommentCursorPagination()
+        if settings.FAST_LIST_SERIALIZATION:
+            rows = await paginator.apaginate_queryset(queryset.values(*COMMENT_ROW_FIELDS), Request(request))
+            return paginator.get_paginated_data(comment_rows(rows))
+        page = await paginator.apaginate_queryset(Comment.thread(post_id), Request(request))
+        with serializing():
+            return paginator.get_paginated_data(CommentSerializer(page, many=True, context={'request': request}).data)
+    return await conditional_response(request, validators, build_data)
+
+
+async def user_posts(request, user_id):
+    """GET /api/users/<user_id>/posts/ (UserPostsView)"""
+    queryset = Post.objects.filter(user_id=user_id)
+    if user_id != request.user.pk:
+        queryset = queryset.filter(is_private=False)
+    validators = await PostCursorPagination().apaginate_queryset(
+        with_viewer_state(queryset, request.user).values(*POST_VALIDATOR_FIELDS), Request(request)
+    )
+
+    async def build_data():
+        paginator = PostCursorPagination()
+        if settings.FAST_LIST_SERIALIZATION:
+            rows = await paginator.apaginate_queryset(queryset.values(*POST_ROW_FIELDS), Request(request))
+            return paginator.get_paginated_data(await apost_rows(rows, request.user))
+        posts = await paginator.apaginate_queryset(queryset.select_related('user'), Request(request))
+        return paginator.get_paginated_data(await post_list_data(request, posts))
+    return await conditional_response(request, validators, build_data)
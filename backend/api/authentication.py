@@ -0,0 +1,98 @@
+"""
+JWT authentication with the user row cached between requests
+
+simplejwt's JWTAuthentication loads the User by id on every request.
+CachedJWTAuthentication keeps that row in the default cache for
+AUTH_USER_CACHE_TIMEOUT seconds, keyed by user id and the user's current
+version token. Changing a user (User.save, follows, avatar uploads, deletion)
+replaces the token on commit, the same way public_cache invalidates, so
+stale entries stop matching and a request that loaded the row before the
+change can't put it back under the new token.
+
+The password hash is never cached: the entry holds the user with that field
+deferred, plus the digest simplejwt's revoke check compares tokens with.
+
+Other processes only see the new token through a shared cache, so the
+user is only cached with CACHE_BACKEND=file. With the per-process locmem
+cache (or the dummy cache) every request loads the user, and a deactivated
+or changed user takes effect on the next request in every process.
+"""
+import copy
+import uuid
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.settings import api_settings as jwt_settings
+from rest_framework_simplejwt.utils import get_md5_hash_password
+
+from .replicas import cache_is_shared, use_primary
+
+
+def version_key(user_id):
+    return f'auth:user:{user_id}:version'
+
+
+def user_key(user_id, version):
+    return f'auth:user:{user_id}:{version}'
+
+
+def current_version(user_id):
+    """The user's version token, creating one if it is missing (an evicted token reads as a change)"""
+    version = cache.get(version_key(user_id))
+    if version is None:
+        cache.add(version_key(user_id), uuid.uuid4().hex, timeout=None)
+        version = cache.get(version_key(user_id))
+    return version
+
+
+def caching_enabled():
+    """Whether users are cached: a timeout is set and every process sees the same cache"""
+    return bool(settings.AUTH_USER_CACHE_TIMEOUT) and cache_is_shared()
+
+
+def invalidate_user(*user_ids):
+    """These users changed: stop serving their cached rows once the transaction commits"""
+    if not caching_enabled():
+        return
+    def replace_versions():
+        cache.set_many({version_key(user_id): uuid.uuid4().hex for user_id in user_ids}, timeout=None)
+    transaction.on_commit(replace_versions)
+
+
+def cache_entry(user):
+    """`user` without its password hash (deferred, so only code reading it queries), and its revoke digest"""
+    cached = copy.copy(user)
+    del cached.password
+    return cached, get_md5_hash_password(user.password) if jwt_settings.CHECK_REVOKE_TOKEN else None
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    """JWTAuthentication that reads the user from the cache, loading it only on a miss"""
+
+    def get_user(self, validated_token):
+        user_id = validated_token.get(jwt_settings.USER_ID_CLAIM)
+        if user_id is None or not caching_enabled():
+            return super().get_user(validated_token)
+
+        version = current_version(user_id)
+        entry = cache.get(user_key(user_id, version))
+        if entry is None:
+            # A lagging replica could return the row from before the change that set this version
+            with use_primary():
+                user = super().get_user(validated_token)  # Rejects unknown and inactive users
+            cache.set(user_key(user_id, version), cache_entry(user), timeout=settings.AUTH_USER_CACHE_TIMEOUT)
+            return user
+
+        user, revoke_digest = entry
+
+        # The checks super().get_user() runs on a freshly loaded user
+        if jwt_settings.CHECK_USER_IS_ACTIVE and not user.is_active:
+            raise AuthenticationFailed('User is inactive', code='user_inactive')
+        if jwt_settings.CHECK_REVOKE_TOKEN and (
+            validated_token.get(jwt_settings.REVOKE_TOKEN_CLAIM) != revoke_digest
+        ):
+            raise AuthenticationFailed("The user's password has been changed.", code='password_changed')
+        return user
@@ -0,0 +1,76 @@
+"""
+Conditional GET (ETag / 304 Not Modified) for read endpoints
+
+A view lists `validator_fields`: narrow columns that change whenever its
+serialized payload would (updated_at, counters, image path, ids). They are
+read with a single values() query, paged exactly like the real response for
+list views, and hashed into a weak ETag together with the viewer, the full
+path and the Accept header. When the client's If-None-Match still matches,
+the view answers 304 without running the serializer or the queries behind it.
+
+No Last-Modified header is sent: likes, comments and follows change what a
+response contains without moving any updated_at, so a date validator would
+produce false 304s.
+"""
+import hashlib
+
+from django.db.models import Exists, OuterRef
+from django.utils.cache import get_conditional_response
+from rest_framework import mixins
+
+from .models import Like, SavedPost
+
+# Columns that determine a post payload (PostSerializer / PostListSerializer)
+POST_VALIDATOR_FIELDS = (
+    'id', 'created_at', 'updated_at', 'caption', 'location', 'tags', 'is_private',
+    'like_count', 'comment_count', 'image_path', 'image_status',
+    'user_id', 'user__updated_at', 'user__image_path', 'viewer_liked', 'viewer_saved',
+)
+POST_DETAIL_VALIDATOR_FIELDS = POST_VALIDATOR_FIELDS + ('image_renditions', 'user__followers_count', 'user__following_count')
+COMMENT_VALIDATOR_FIELDS = ('id', 'pinned', 'created_at', 'updated_at', 'user_id', 'user__updated_at', 'user__image_path')
+
+
+def with_viewer_state(queryset, user):
+    """Annotate posts with the viewer's liked/saved flags, which also appear in post payloads"""
+    return queryset.annotate(
+        viewer_liked=Exists(Like.objects.filter(post_id=OuterRef('pk'), user_id=user.pk)),
+        viewer_saved=Exists(SavedPost.objects.filter(post_id=OuterRef('pk'), user_id=user.pk)),
+    )
+
+
+def make_etag(*parts):
+    digest = hashlib.sha1(repr(parts).encode('utf-8')).hexdigest()
+    return f'W/"{digest}"'
+
+
+class ConditionalGetMixin:
+    """Answer GET with 304 Not Modified while `validator_fields` are unchanged"""
+    validator_fields = ()
+
+    def get_validator_queryset(self):
+        return self.filter_queryset(self.get_queryset())
+
+    def get_validator_rows(self):
+        """Validator values for the resource, or None to skip conditional handling"""
+        queryset = self.get_validator_queryset()
+        if isinstance(self, mixins.RetrieveModelMixin):
+            lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+            queryset = queryset.filter(**{self.lookup_field: self.kwargs[lookup_url_kwarg]})
+            return list(queryset.order_by().values(*self.validator_fields))
+        # A separate paginator so the real response pages from scratch
+        paginator = self.pagination_class()
+        return paginator.paginate_queryset(queryset.values(*self.validator_fields), self.request, view=self)
+
+    def get(self, request, *args, **kwargs):
+        rows = self.get_validator_rows()
+        if rows is None:
+            return super().get(request, *args, **kwargs)
+
+        etag = make_etag(request.user.pk, request.get_full_path(), request.META.get('HTTP_ACCEPT', ''), rows)
+        response = get_conditional_response(request, etag=etag)
+        if response is None:
+            response = super().get(request, *args, **kwargs)
+        response['ETag'] = etag
+        # Clients may keep the body but must revalidate before reusing it
+        response['Cache-Control'] = 'private, no-cache'
+        return response
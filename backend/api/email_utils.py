@@ -1,13 +1,22 @@
 """
 Email utility functions for SnapGram
 """
-from django.core.mail import send_mail
+import logging
+
+from django.core.mail import EmailMultiAlternatives, get_connection
 from django.conf import settings
+from django.utils import timezone
+
+from .job_queue import JobQueue
+from .metrics import external_call
+from .models import OutboxEmail
+
+logger = logging.getLogger(__name__)
 
 
 def send_welcome_email(user):
     """
-    Send a welcome email to newly registered user
+    Queue a welcome email to newly registered user
     """
     subject = 'Welcome to SnapGram! 🎉'
     
@@ -166,17 +175,105 @@ def send_welcome_email(user):
     This is an automated message. Please do not reply to this email.
     """
     
+    return queue_email(user.email, subject, plain_message, html_message=html_message)
+
+
+def send_password_reset_email(user, reset_url):
+    """
+    Queue a password reset email with the given reset link
+    """
+    subject = 'Password Reset Request - SnapGram'
+    message = f'''
+            Hi {user.name},
+            
+            You requested a password reset for your SnapGram account.
+            
+            Click the link below to reset your password:
+            {reset_url}
+            
+            This link will expire in 1 hour.
+            
+            If you didn't request this password reset, please ignore this email.
+            
+            Best regards,
+            The SnapGram Team
+            '''
+    return queue_email(user.email, subject, message)
+
+
+def queue_email(recipient, subject, message, html_message=None):
+    """
+    Append an email to the outbox; `send_queued_emails` delivers it
+    
+    Request paths never talk to SMTP directly, so a slow mail server can't
+    add latency to signup or password reset.
+    """
+    return OutboxEmail.objects.create(
+        recipient=recipient,
+        subject=subject,
+        body=message,
+        html_body=html_message or '',
+        from_email=settings.DEFAULT_FROM_EMAIL,
+    )
+
+
+outbox = JobQueue(
+    OutboxEmail, lease_setting='EMAIL_OUTBOX_LEASE_SECONDS', max_attempts_setting='EMAIL_OUTBOX_MAX_ATTEMPTS',
+    retry_delay_setting='EMAIL_OUTBOX_RETRY_DELAY', running_status=OutboxEmail.STATUS_SENDING,
+    done_status=OutboxEmail.STATUS_SENT, failed_status=OutboxEmail.STATUS_DEAD,
+)
+
+
+def deliver_queued_emails(limit=50):
+    """
+    Send one batch from the outbox over a single reused connection
+    
+    Each message is sent individually so one bad address doesn't fail the
+    batch. Failures are retried with exponential backoff and dead-lettered
+    after EMAIL_OUTBOX_MAX_ATTEMPTS. Returns (sent, failed).
+    """
+    emails = outbox.claim(limit)
+    if not emails:
+        return 0, 0
+
+    sent = failed = 0
+    connection = get_connection(fail_silently=False)
     try:
-        send_mail(
-            subject=subject,
-            message=plain_message,
-            from_email=settings.DEFAULT_FROM_EMAIL,
-            recipient_list=[user.email],
-            html_message=html_message,
-            fail_silently=False,
-        )
-        print(f"Welcome email sent successfully to {user.email}")
-        return True
+        with external_call('smtp'):
+            connection.open()
     except Exception as e:
-        print(f"Welcome email sending failed: {e}")
-        return False
+        # Server unreachable: the whole batch goes back on the queue
+        for email in emails:
+            _schedule_retry(email, e)
+        return 0, len(emails)
+
+    try:
+        for email in emails:
+            message = EmailMultiAlternatives(
+                subject=email.subject,
+                body=email.body,
+                from_email=email.from_email,
+                to=[email.recipient],
+                connection=connection,
+            )
+            if email.html_body:
+                message.attach_alternative(email.html_body, 'text/html')
+            try:
+                with external_call('smtp'):
+                    message.send()
+            except Exception as e:
+                _schedule_retry(email, e)
+                failed += 1
+                continue
+            outbox.complete(email, sent_at=timezone.now())
+            sent += 1
+    finally:
+        with external_call('smtp'):
+            connection.close()
+    return sent, failed
+
+
+def _schedule_retry(email, error):
+    if outbox.retry(email, error):
+        # The recipient stays out of the logs; the row has it
+        logger.warning('Outbox email %s dead-lettered after %s attempts: %s', email.pk, email.attempts + 1, error)
@@ -0,0 +1,193 @@
+"""
+Fast serialization for the post, saved-post and comment lists
+
+PostListSerializer, SavedPostSerializer and CommentSerializer build every
+row through DRF fields and SerializerMethodFields on model instances, which
+is most of the CPU a list request costs. The functions here build the same
+rows straight from values() dicts: the same keys in the same order, with
+values formatted by the same DRF fields, so a page rendered with
+FastJSONRenderer is byte-for-byte what the serializer path would return.
+
+Views opt in with FastListMixin, and take the fast path only while
+FAST_LIST_SERIALIZATION is on; otherwise they use their serializers.
+"""
+from django.conf import settings
+from rest_framework import serializers
+from rest_framework.renderers import BrowsableAPIRenderer
+
+from .metrics import serializing
+from .renderers import FastJSONRenderer
+from .serializers import resolve_viewer_state, aresolve_viewer_state
+
+# Columns behind one PostListSerializer row
+POST_ROW_FIELDS = (
+    'id', 'caption', 'image_path', 'image_renditions', 'image_status', 'location', 'tags', 'is_private',
+    'like_count', 'comment_count', 'created_at', 'updated_at',
+    'user_id', 'user__name', 'user__username', 'user__image_path',
+)
+
+# Columns behind one SavedPostSerializer row
+SAVED_POST_ROW_FIELDS = (
+    'id', 'created_at', 'post_id', 'post__caption', 'post__image_path', 'post__image_renditions',
+    'post__location', 'post__tags', 'post__created_at', 'post__updated_at',
+    'post__user_id', 'post__user__name', 'post__user__username', 'post__user__image_path',
+)
+
+# Columns behind one CommentSerializer row
+COMMENT_ROW_FIELDS = (
+    'id', 'content', 'pinned', 'created_at', 'updated_at',
+    'user_id', 'user__username', 'user__name', 'user__image_path',
+)
+
+format_datetime = serializers.DateTimeField().to_representation
+
+
+def rendition_url(renditions, name, image_path):
+    """Post.rendition_url for a values() row"""
+    rendition = (renditions or {}).get(name)
+    return rendition['url'] if rendition else image_path
+
+
+def is_edited(row):
+    """Same rule as the serializers' get_is_edited"""
+    return (row['updated_at'] - row['created_at']).total_seconds() > 1
+
+
+def post_rows(rows, user):
+    """PostListSerializer data for POST_ROW_FIELDS rows, with `user`'s like/save state"""
+    return build_post_rows(rows, resolve_viewer_state(user, [row['id'] for row in rows]))
+
+
+async def apost_rows(rows, user):
+    """post_rows for async views"""
+    return build_post_rows(rows, await aresolve_viewer_state(user, [row['id'] for row in rows]))
+
+
+def build_post_rows(rows, state):
+    """post_rows given the viewer state from resolve_viewer_state"""
+    liked, saved = state['liked'], state['saved']
+    with serializing():
+        return [
+            {
+                'id': row['id'],
+                'user': {
+                    'id': row['user_id'],
+                    'name': row['user__name'],
+                    'username': row['user__username'],
+                    'imageUrl': row['user__image_path'],
+                },
+                'caption': row['caption'],
+                'imageUrl': rendition_url(row['image_renditions'], 'medium', row['image_path']),
+                'thumbnailUrl': rendition_url(row['image_renditions'], 'thumb', row['image_path']),
+                'image_status': row['image_status'],
+                'location': row['location'],
+                'tags': row['tags'],
+                'is_private': row['is_private'],
+                'likes_count': row['like_count'],
+                'is_liked': row['id'] in liked,
+                'is_saved': row['id'] in saved,
+                'comments_count': row['comment_count'],
+                'is_edited': is_edited(row),
+                'created_at': format_datetime(row['created_at']),
+                'updated_at': format_datetime(row['updated_at']),
+            }
+            for row in rows
+        ]
+
+
+def post_rows_in_order(queryset, post_ids, user):
+    """post_rows for `post_ids` in that order, leaving out posts `queryset` doesn't contain"""
+    found = {row['id']: row for row in queryset.filter(id__in=post_ids).order_by().values(*POST_ROW_FIELDS)}
+    return post_rows([found[post_id] for post_id in post_ids if post_id in found], user)
+
+
+async def apost_rows_in_order(queryset, post_ids, user):
+    """post_rows_in_order for async views"""
+    found = {row['id']: row async for row in queryset.filter(id__in=post_ids).order_by().values(*POST_ROW_FIELDS)}
+    return await apost_rows([found[post_id] for post_id in post_ids if post_id in found], user)
+
+
+def saved_post_rows(rows):
+    """SavedPostSerializer data for SAVED_POST_ROW_FIELDS rows"""
+    with serializing():
+        return [
+            {
+                'id': row['id'],
+                'post': {
+                    'id': row['post_id'],
+                    'caption': row['post__caption'],
+                    'imageUrl': rendition_url(row['post__image_renditions'], 'medium', row['post__image_path']),
+                    'thumbnailUrl': rendition_url(row['post__image_renditions'], 'thumb', row['post__image_path']),
+                    'location': row['post__location'],
+                    'tags': row['post__tags'],
+                    # Left as datetimes, like get_post does; the renderer formats them
+                    'created_at': row['post__created_at'],
+                    'updated_at': row['post__updated_at'],
+                    'user': {
+                        'id': row['post__user_id'],
+                        'name': row['post__user__name'],
+                        'username': row['post__user__username'],
+                        'imageUrl': row['post__user__image_path'],
+                    },
+                },
+                'created_at': format_datetime(row['created_at']),
+            }
+            for row in rows
+        ]
+
+
+def comment_rows(rows):
+    """CommentSerializer data for COMMENT_ROW_FIELDS rows"""
+    with serializing():
+        return [
+            {
+                'id': row['id'],
+                'user': {
+                    'id': row['user_id'],
+                    'username': row['user__username'],
+                    'name': row['user__name'],
+                    'imageUrl': row['user__image_path'],
+                },
+                'content': row['content'],
+                'pinned': row['pinned'],
+                'created_at': format_datetime(row['created_at']),
+                'updated_at': format_datetime(row['updated_at']),
+                'is_edited': is_edited(row),
+            }
+            for row in rows
+        ]
+
+
+class FastListMixin:
+    """
+    Serve a list view's pages from values() rows rendered with orjson
+
+    `list_rows(rows)` turns one page of `list_fields` rows into response data.
+    Views whose pages aren't a plain slice of get_queryset() override list()
+    and build the page with `post_page`.
+    """
+    renderer_classes = [FastJSONRenderer, BrowsableAPIRenderer]
+    list_fields = ()
+
+    def fast_lists_enabled(self):
+        return settings.FAST_LIST_SERIALIZATION
+
+    def list_rows(self, rows):
+        raise NotImplementedError
+
+    def list(self, request, *args, **kwargs):
+        if not self.fast_lists_enabled():
+            with serializing():  # Its queries are still counted as db time
+                return super().list(request, *args, **kwargs)
+        queryset = self.filter_queryset(self.get_queryset()).values(*self.list_fields)
+        rows = self.paginate_queryset(queryset)
+        return self.get_paginated_response(self.list_rows(rows))
+
+    def post_page(self, queryset, post_ids):
+        """List data for the posts among `post_ids` that `queryset` contains, in `post_ids` order"""
+        if self.fast_lists_enabled():
+            return post_rows_in_order(queryset, post_ids, self.request.user)
+        posts = queryset.order_by().in_bulk(post_ids)
+        page = [posts[post_id] for post_id in post_ids if post_id in posts]
+        with serializing():
+            return self.get_serializer(page, many=True).data
@@ -0,0 +1,88 @@
+"""
+Image rendition pipeline (Pillow)
+
+Decodes an uploaded photo once, applies its EXIF orientation, and encodes a
+fixed set of downscaled renditions with all metadata stripped. Used by the
+background upload worker before anything is sent to media storage.
+"""
+import io
+from dataclasses import dataclass
+
+from django.conf import settings
+from PIL import Image, ImageOps, UnidentifiedImageError, features
+
+
+class ImageProcessingError(Exception):
+    """Raised when an upload is not a decodable image (not worth retrying)"""
+
+
+@dataclass
+class Rendition:
+    name: str
+    content: bytes
+    width: int
+    height: int
+    format: str
+
+    @property
+    def extension(self):
+        return 'webp' if self.format == 'WEBP' else 'jpg'
+
+
+def output_format():
+    """The format renditions are encoded in: IMAGE_RENDITION_FORMAT, or JPEG where WEBP isn't available"""
+    fmt = settings.IMAGE_RENDITION_FORMAT.upper()
+    if fmt == 'WEBP' and not features.check('webp'):
+        return 'JPEG'  # Pillow built without libwebp
+    return 'JPEG' if fmt in ('JPG', 'JPEG') else fmt
+
+
+def _prepare(image, fmt):
+    """Convert to a mode the output encoder accepts"""
+    if fmt == 'JPEG':
+        if image.mode in ('RGBA', 'LA') or (image.mode == 'P' and 'transparency' in image.info):
+            background = Image.new('RGB', image.size, (255, 255, 255))
+            background.paste(image.convert('RGBA'), mask=image.convert('RGBA').getchannel('A'))
+            return background
+        return image.convert('RGB') if image.mode != 'RGB' else image
+    if image.mode not in ('RGB', 'RGBA'):
+        return image.convert('RGBA' if 'transparency' in image.info or image.mode in ('LA', 'PA') else 'RGB')
+    return image
+
+
+def _encode(image, fmt):
+    buffer = io.BytesIO()
+    quality = settings.IMAGE_RENDITION_QUALITY
+    if fmt == 'WEBP':
+        image.save(buffer, 'WEBP', quality=quality, method=4)
+    else:
+        image.save(buffer, 'JPEG', quality=quality, optimize=True, progressive=True)
+    # No exif= argument is passed, so EXIF (GPS, camera serials, ...) is dropped
+    return buffer.getvalue()
+
+
+def build_renditions(fileobj, sizes):
+    """
+    Return a list of Renditions for `sizes` ({name: longest edge in px})
+
+    Renditions are produced largest first and each one is downscaled from the
+    previous, so the original is only decoded and resampled once. Images are
+    never upscaled.
+    """
+    try:
+        with Image.open(fileobj) as original:
+            original.load()
+            image = ImageOps.exif_transpose(original)
+    except (UnidentifiedImageError, OSError, Image.DecompressionBombError) as e:
+        raise ImageProcessingError(f"Not a valid image: {e}")
+
+    fmt = output_format()
+    image = _prepare(image, fmt)
+    renditions = []
+    for name, edge in sorted(sizes.items(), key=lambda item: item[1], reverse=True):
+        if max(image.size) > edge:
+            image = image.copy()
+            image.thumbnail((edge, edge), Image.Resampling.LANCZOS)
+        renditions.append(Rendition(name, _encode(image, fmt), image.width, image.height, fmt))
+    return renditions
+
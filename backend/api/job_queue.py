@@ -0,0 +1,139 @@
+"""
+Leased job queues backed by a database table
+
+The upload queue (UploadJob), the timeline fan-out queue (FanoutJob) and
+the email outbox (OutboxEmail) are drained the same way. Workers lease
+runnable rows with SKIP LOCKED, run them, and then either mark them done or
+put them back with exponential backoff until they are dead-lettered. JobQueue
+holds that logic once; the module owning each table decides what running a
+row means. QueueWorkerCommand is the polling loop their management commands
+share.
+"""
+import random
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+MAX_RETRY_DELAY = 3600  # Seconds; backoff stops doubling here
+
+
+class JobQueue:
+    """
+    Lease, complete and retry the rows of `model`
+
+    The model needs status, attempts, run_after, locked_at and last_error
+    columns and a STATUS_PENDING value. Settings are passed by name and read
+    on every call, so overriding them at run time takes effect.
+    """
+
+    def __init__(self, model, *, lease_setting, max_attempts_setting, retry_delay_setting,
+                 running_status, done_status, failed_status):
+        self.model = model
+        self.lease_setting = lease_setting
+        self.max_attempts_setting = max_attempts_setting
+        self.retry_delay_setting = retry_delay_setting
+        self.running_status = running_status
+        self.done_status = done_status
+        self.failed_status = failed_status
+
+    def claim(self, limit):
+        """
+        Lease up to `limit` runnable rows to this worker
+
+        Pending rows whose backoff has elapsed are eligible, as are running rows
+        whose lease expired (the worker that held them died). Rows are locked
+        with SKIP LOCKED where the database supports it so several workers can
+        drain the queue concurrently.
+        """
+        now = timezone.now()
+        lease_expired = now - timedelta(seconds=getattr(settings, self.lease_setting))
+        runnable = (
+            Q(status=self.model.STATUS_PENDING, run_after__lte=now)
+            | Q(status=self.running_status, locked_at__lt=lease_expired)
+        )
+        with transaction.atomic():
+            jobs = list(
+                self.model.objects.filter(runnable).order_by('run_after', 'id')
+                .select_for_update(skip_locked=True)[:limit]
+            )
+            self.model.objects.filter(id__in=[job.id for job in jobs]).update(
+                status=self.running_status, locked_at=now
+            )
+        return jobs
+
+    def complete(self, job, **changes):
+        """Mark a claimed row done, updating any other `changes` columns with it"""
+        self.model.objects.filter(pk=job.pk).update(
+            status=self.done_status, locked_at=None, last_error='', **changes
+        )
+
+    def retry(self, job, error, permanent=False):
+        """
+        Put a failed row back on the queue with backoff
+
+        Rows out of attempts, or `permanent` failures that retrying can't fix,
+        are dead-lettered instead. Returns True when the row was dead-lettered.
+        """
+        attempts = job.attempts + 1
+        if permanent or attempts >= getattr(settings, self.max_attempts_setting):
+            self.model.objects.filter(pk=job.pk).update(
+                status=self.failed_status, attempts=attempts, locked_at=None, last_error=str(error)
+            )
+            return True
+
+        # Exponential backoff with jitter: base, 2x base, 4x base, ... capped at MAX_RETRY_DELAY
+        base = getattr(settings, self.retry_delay_setting)
+        delay = min(base * 2 ** (attempts - 1), MAX_RETRY_DELAY) + random.uniform(0, base)
+        self.model.objects.filter(pk=job.pk).update(
+            status=self.model.STATUS_PENDING, attempts=attempts, locked_at=None,
+            last_error=str(error), run_after=timezone.now() + timedelta(seconds=delay),
+        )
+        return False
+
+
+class QueueWorkerCommand(BaseCommand):
+    """
+    Run batches until nothing is runnable, then poll (or exit with --once)
+
+    Subclasses implement run_batch() and word the progress messages.
+    """
+    items = 'jobs'
+    default_batch_size = 10
+    batch_message = 'Processed {count} job(s): {succeeded} ok, {failed} failed'
+    drained_message = 'Queue drained: {succeeded} succeeded, {failed} failed or retrying'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=self.default_batch_size,
+                            help=f'Number of {self.items} to claim per batch (default: {self.default_batch_size})')
+        parser.add_argument('--poll-interval', type=float, default=2.0,
+                            help='Seconds to sleep when the queue is empty (default: 2)')
+        parser.add_argument('--once', action='store_true',
+                            help=f'Exit once no runnable {self.items} are left instead of polling')
+
+    def run_batch(self, batch_size):
+        """Claim and process one batch; returns (succeeded, failed)"""
+        raise NotImplementedError
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        total_ok = total_failed = 0
+
+        while True:
+            succeeded, failed = self.run_batch(batch_size)
+            total_ok += succeeded
+            total_failed += failed
+            if succeeded or failed:
+                self.stdout.write(self.batch_message.format(
+                    count=succeeded + failed, succeeded=succeeded, failed=failed
+                ))
+                continue
+            if options['once']:
+                break
+            time.sleep(options['poll_interval'])
+
+        self.stdout.write(self.style.SUCCESS(self.drained_message.format(succeeded=total_ok, failed=total_failed)))
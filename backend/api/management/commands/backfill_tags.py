@@ -0,0 +1,54 @@
+"""
+Populate the hashtag index (Tag / PostTag) from existing Post.tags strings.
+
+New and edited posts keep their tag links in sync on save; this command
+migrates the rows written before the hashtag index existed. It is
+idempotent: links are re-synced per post in primary-key batches, and every
+Tag.post_count is then recomputed from the links so drifted counters are
+repaired too.
+"""
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Count, IntegerField, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from api.models import Post, PostTag, Tag
+
+
+class Command(BaseCommand):
+    help = 'Parse Post.tags into Tag/PostTag rows and recompute per-tag post counts'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=500,
+                            help='Number of posts to process per batch (default: 500)')
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        last_id = 0
+        synced = 0
+
+        while True:
+            batch = list(
+                Post.objects.filter(id__gt=last_id).order_by('id')
+                .only('id', 'user_id', 'tags', 'is_private', 'created_at')[:batch_size]
+            )
+            if not batch:
+                break
+            with transaction.atomic():
+                for post in batch:
+                    PostTag.sync(post)
+            last_id = batch[-1].id
+            synced += len(batch)
+
+        links = (
+            PostTag.objects.filter(tag_id=OuterRef('pk'))
+            .order_by().values('tag_id').annotate(c=Count('*')).values('c')
+        )
+        Tag.objects.update(
+            post_count=Coalesce(Subquery(links, output_field=IntegerField()), 0),
+            updated_at=timezone.now(),
+        )
+        self.stdout.write(self.style.SUCCESS(
+            f'Synced tags for {synced} post(s); {Tag.objects.filter(post_count__gt=0).count()} tag(s) in use'
+        ))
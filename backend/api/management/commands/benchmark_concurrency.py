@@ -0,0 +1,208 @@
+"""
+Compare the throughput of one WSGI worker with one ASGI worker.
+
+The same mix of hot read requests (home feed, post detail, comments and
+profile posts, as the busiest user in the database) is sent through
+Django's WSGI handler one request at a time, like a synchronous worker
+process, and through the ASGI handler with --concurrency requests in
+flight on one event loop, like a single uvicorn/daphne worker. Each server
+runs in its own subprocess because the URLconf picks the sync or async read
+views when it is loaded (ASYNC_READ_VIEWS).
+
+Both handlers are driven in-process, so no network or server overhead is
+included. A local SQLite database answers in microseconds, which hides what
+async is for; --db-latency adds a delay to every query to stand in for the
+round trip to a MySQL server.
+"""
+import asyncio
+import json
+import math
+import os
+import subprocess
+import sys
+import time
+from io import BytesIO
+from wsgiref.util import setup_testing_defaults
+
+from django.conf import settings
+from django.core.asgi import get_asgi_application
+from django.core.management.base import BaseCommand, CommandError
+from django.core.wsgi import get_wsgi_application
+from django.db import connections
+from django.db.backends.signals import connection_created
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from api.management.utils import request_host
+from api.models import User, Post
+
+
+class Command(BaseCommand):
+    help = 'Requests per second of one WSGI worker versus one ASGI worker on the hot read endpoints'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=200, help='Requests per server (default: 200)')
+        parser.add_argument('--concurrency', type=int, default=20,
+                            help='Requests in flight on the ASGI worker (default: 20)')
+        parser.add_argument('--db-latency', type=float, default=0.0,
+                            help='Milliseconds added to every query, e.g. 2 for a database on another host')
+        parser.add_argument('--server', choices=['both', 'wsgi', 'asgi'], default='both',
+                            help='Run one server in this process instead of both in subprocesses')
+        parser.add_argument('--json', action='store_true', help='Print the result of one server as JSON')
+
+    def handle(self, *args, **options):
+        if options['server'] == 'both':
+            results = [self.run_subprocess(server, options) for server in ('wsgi', 'asgi')]
+        else:
+            results = [self.run_server(options['server'], options)]
+            if options['json']:
+                self.stdout.write(json.dumps(results[0]))
+                return
+
+        self.stdout.write(f'{"server":<8} {"concurrency":>11} {"req/s":>8} {"p50 ms":>8} {"p95 ms":>8}')
+        for result in results:
+            self.stdout.write(
+                f'{result["server"]:<8} {result["concurrency"]:>11} {result["rps"]:>8.1f} '
+                f'{result["p50"] * 1000:>8.1f} {result["p95"] * 1000:>8.1f}'
+            )
+        if len(results) == 2:
+            self.stdout.write(f'ASGI/WSGI throughput: {results[1]["rps"] / results[0]["rps"]:.2f}x')
+
+    def run_subprocess(self, server, options):
+        command = [
+            sys.executable, '-m', 'django', 'benchmark_concurrency', '--server', server, '--json',
+            '--requests', str(options['requests']), '--concurrency', str(options['concurrency']),
+            '--db-latency', str(options['db_latency']),
+        ]
+        env = dict(os.environ, ASYNC_READ_VIEWS=str(server == 'asgi'), PYTHONPATH=os.pathsep.join(sys.path))
+        completed = subprocess.run(command, env=env, capture_output=True, text=True)
+        if completed.returncode:
+            raise CommandError(f'{server} run failed:\n{completed.stderr}')
+        return json.loads(completed.stdout.strip().splitlines()[-1])
+
+    def run_server(self, server, options):
+        if settings.ASYNC_READ_VIEWS != (server == 'asgi'):
+            raise CommandError(f'Set ASYNC_READ_VIEWS={server == "asgi"} to benchmark {server}')
+        if options['db_latency']:
+            add_query_latency(options['db_latency'] / 1000)
+
+        viewer = User.objects.order_by('-following_count', 'id').first()
+        post = Post.objects.filter(is_private=False, user__is_private=False).order_by('-like_count', 'id').first()
+        user = User.objects.order_by('-followers_count', 'id').first()
+        if not (viewer and post):
+            raise CommandError('Not enough data to benchmark; load some with `manage.py seed_dataset` first')
+        paths = ['/api/posts/', f'/api/posts/{post.pk}/', f'/api/posts/{post.pk}/comments/', f'/api/users/{user.pk}/posts/']
+        requests = [paths[i % len(paths)] for i in range(options['requests'])]
+        host = request_host()
+        headers = {'host': host, 'authorization': f'Bearer {RefreshToken.for_user(viewer).access_token}'}
+        # Connections are opened per worker thread; start the measured run without one
+        connections.close_all()
+
+        if server == 'wsgi':
+            concurrency = 1
+            elapsed, durations = run_wsgi(requests, paths, headers)
+        else:
+            concurrency = options['concurrency']
+            elapsed, durations = asyncio.run(run_asgi(requests, paths, headers, concurrency))
+        durations.sort()
+        return {
+            'server': server,
+            'concurrency': concurrency,
+            'rps': len(durations) / elapsed,
+            'p50': percentile(durations, 50),
+            'p95': percentile(durations, 95),
+        }
+
+
+def add_query_latency(seconds):
+    def delay(execute, sql, params, many, context):
+        time.sleep(seconds)
+        return execute(sql, params, many, context)
+
+    def add(connection, **kwargs):
+        if delay not in connection.execute_wrappers:
+            connection.execute_wrappers.append(delay)
+
+    for connection in connections.all(initialized_only=True):
+        add(connection)
+    connection_created.connect(add, weak=False)
+
+
+def run_wsgi(requests, warmup, headers):
+    """Serve `requests` one at a time, as a synchronous worker does"""
+    application = get_wsgi_application()
+
+    def request(path):
+        path, _, query = path.partition('?')
+        environ = {'REQUEST_METHOD': 'GET', 'PATH_INFO': path, 'QUERY_STRING': query, 'wsgi.input': BytesIO()}
+        environ.update({f'HTTP_{name.upper()}': value for name, value in headers.items()})
+        setup_testing_defaults(environ)
+        status = []
+        body = application(environ, lambda line, response_headers, exc_info=None: status.append(line))
+        try:
+            b''.join(body)
+        finally:
+            body.close()
+        if not status[0].startswith('200'):
+            raise CommandError(f'GET {path} answered {status[0]}')
+
+    for path in warmup:
+        request(path)
+    durations = []
+    start = time.perf_counter()
+    for path in requests:
+        began = time.perf_counter()
+        request(path)
+        durations.append(time.perf_counter() - began)
+    return time.perf_counter() - start, durations
+
+
+async def run_asgi(requests, warmup, headers, concurrency):
+    """Serve `requests` with up to `concurrency` in flight on this event loop"""
+    application = get_asgi_application()
+    scope_headers = [(name.encode(), value.encode()) for name, value in headers.items()]
+
+    async def request(path):
+        path, _, query = path.partition('?')
+        scope = {
+            'type': 'http', 'asgi': {'version': '3.0'}, 'http_version': '1.1', 'method': 'GET',
+            'scheme': 'http', 'path': path, 'raw_path': path.encode(), 'query_string': query.encode(),
+            'root_path': '', 'headers': scope_headers, 'client': ('127.0.0.1', 0), 'server': (headers['host'], 80),
+        }
+        body_sent = False
+
+        async def receive():
+            nonlocal body_sent
+            if not body_sent:
+                body_sent = True
+                return {'type': 'http.request', 'body': b'', 'more_body': False}
+            await asyncio.Event().wait()  # The client never disconnects
+
+        messages = []
+
+        async def send(message):
+            messages.append(message)
+
+        await application(scope, receive, send)
+        status = messages[0]['status']
+        if status != 200:
+            raise CommandError(f'GET {path} answered {status}')
+
+    for path in warmup:
+        await request(path)
+    pending = iter(requests)
+    durations = []
+
+    async def worker():
+        for path in pending:
+            began = time.perf_counter()
+            await request(path)
+            durations.append(time.perf_counter() - began)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return time.perf_counter() - start, durations
+
+
+def percentile(ordered, percent):
+    """Nearest-rank percentile of a sorted, non-empty list"""
+    return ordered[max(math.ceil(percent / 100 * len(ordered)) - 1, 0)]
@@ -0,0 +1,224 @@
+"""
+Time every API endpoint and hold it to its query budget.
+
+Each case in CASES is requested through the full middleware stack as a real
+user picked from the database: the account following the most people (so
+the home timeline has the most sources to merge), looking at the most-liked
+post, the most-followed profile and the most-used tag. The few objects a case
+needs of its own (a post and comment by the viewer, a reset token, a staff
+account) are created first, and every request runs in a savepoint that is
+rolled back, so writes are measured without changing the data. The whole run
+is rolled back at the end.
+
+For each case the command prints p50/p95 latency over --requests requests
+and the most SQL queries one request ran, and fails when a case exceeds its
+budget in api/query_budgets.py or a route in api/urls.py has no case.
+
+Load a realistic dataset first, e.g. `manage.py seed_dataset`; numbers from
+a near-empty database say little about the queries that matter.
+"""
+import json
+import math
+import time
+import uuid
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.test import Client
+from django.test.utils import CaptureQueriesContext, override_settings
+from django.urls import URLPattern, resolve
+from django.utils import timezone
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from api import urls as api_urls
+from api.management.utils import request_host
+from api.models import User, Post, Comment, SavedPost, Tag
+from api.query_budgets import QUERY_BUDGETS
+
+BENCHMARK_PASSWORD = 'benchmark-password'
+
+# (label, method, path, JSON body, who is asking); paths and bodies are
+# formatted with the context built by Command.create_context. A label starts
+# with the URL name of the route it covers.
+CASES = [
+    ('user-registration POST', 'post', '/api/auth/signup/', {
+        'username': 'benchmark_signup', 'email': 'benchmark-signup@example.invalid', 'name': 'Benchmark Signup',
+        'password': BENCHMARK_PASSWORD, 'password_confirm': BENCHMARK_PASSWORD,
+    }, None),
+    ('login POST', 'post', '/api/auth/login/', {'username': '{viewer_email}', 'password': BENCHMARK_PASSWORD}, None),
+    ('current-user GET', 'get', '/api/auth/me/', None, 'viewer'),
+    ('current-user PATCH', 'patch', '/api/auth/me/', {'bio': 'Benchmarking'}, 'viewer'),
+    ('liked-posts GET', 'get', '/api/auth/me/liked/', None, 'viewer'),
+    ('user-list GET', 'get', '/api/auth/users/', None, 'viewer'),
+    ('user-list GET search', 'get', '/api/auth/users/?q={user_prefix}', None, 'viewer'),
+    ('user-autocomplete GET', 'get', '/api/auth/users/autocomplete/?q={user_prefix}', None, 'viewer'),
+    ('user-detail GET', 'get', '/api/auth/users/{user}/', None, 'viewer'),
+    ('toggle-user-privacy PATCH', 'patch', '/api/auth/toggle-privacy/', {'is_private': False}, 'viewer'),
+    ('forgot-password POST', 'post', '/api/auth/forgot-password/', {'email': '{viewer_email}'}, None),
+    ('reset-password POST', 'post', '/api/auth/reset-password/{reset_token}/', {'password': BENCHMARK_PASSWORD}, None),
+    ('post-list GET', 'get', '/api/posts/', None, 'viewer'),
+    ('post-list POST', 'post', '/api/posts/', {'caption': 'Benchmark post', 'tags': '#{tag}'}, 'viewer'),
+    ('recent-posts GET', 'get', '/api/posts/recent/', None, 'viewer'),
+    ('post-detail GET', 'get', '/api/posts/{post}/', None, 'viewer'),
+    ('post-detail PATCH', 'patch', '/api/posts/{own_post}/', {'caption': 'Benchmark edit'}, 'viewer'),
+    ('post-detail DELETE', 'delete', '/api/posts/{own_post}/', None, 'viewer'),
+    ('public-post-detail GET', 'get', '/api/posts/public/{post}/', None, None),
+    ('like-post POST', 'post', '/api/posts/{post}/like/', None, 'viewer'),
+    ('comment-list GET', 'get', '/api/posts/{post}/comments/', None, 'viewer'),
+    ('comment-list POST', 'post', '/api/posts/{post}/comments/', {'content': 'Benchmark comment'}, 'viewer'),
+    ('user-posts GET', 'get', '/api/users/{user}/posts/', None, 'viewer'),
+    ('public-user-posts GET', 'get', '/api/users/public/{user}/posts/', None, None),
+    ('follow-user POST', 'post', '/api/users/{user}/follow/', None, 'viewer'),
+    ('tag-autocomplete GET', 'get', '/api/tags/autocomplete/?q={tag_prefix}', None, 'viewer'),
+    ('tag-posts GET', 'get', '/api/tags/{tag}/posts/', None, 'viewer'),
+    ('search-posts GET', 'get', '/api/search/posts/?q={tag}', None, 'viewer'),
+    ('search-users GET', 'get', '/api/search/users/?q={user_prefix}', None, 'viewer'),
+    ('comment-detail GET', 'get', '/api/comments/{own_comment}/', None, 'viewer'),
+    ('comment-detail PATCH', 'patch', '/api/comments/{own_comment}/', {'content': 'Benchmark edit'}, 'viewer'),
+    ('comment-detail DELETE', 'delete', '/api/comments/{own_comment}/', None, 'viewer'),
+    ('comment-pin POST', 'post', '/api/comments/{pinnable_comment}/pin/', None, 'viewer'),
+    ('saved-post-list GET', 'get', '/api/saves/', None, 'viewer'),
+    ('saved-post-list POST', 'post', '/api/saves/', {'post': '{own_post}'}, 'viewer'),
+    ('saved-state GET', 'get', '/api/saves/state/?ids={recent_post_ids}', None, 'viewer'),
+    ('saved-post-detail DELETE', 'delete', '/api/saves/{saved}/', None, 'viewer'),
+    ('public-cache-stats GET', 'get', '/api/cache/stats/', None, 'staff'),
+    ('metrics GET', 'get', '/api/metrics/', None, 'metrics'),
+]
+
+# Transaction bookkeeping from the per-request savepoints, not the endpoint
+IGNORED_STATEMENTS = ('SAVEPOINT', 'RELEASE SAVEPOINT', 'ROLLBACK TO SAVEPOINT')
+
+
+class Command(BaseCommand):
+    help = 'Measure p50/p95 latency and query counts per endpoint and enforce the query budgets'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=20,
+                            help='Timed requests per case, after one warm-up request (default: 20)')
+        parser.add_argument('--case', default='',
+                            help='Only run cases whose label contains this text')
+
+    def handle(self, *args, **options):
+        check_coverage()
+        cases = [case for case in CASES if options['case'] in case[0]]
+        metrics_token = settings.METRICS_TOKEN or uuid.uuid4().hex
+        host = request_host()
+
+        over_budget = []
+        with transaction.atomic(), override_settings(METRICS_TOKEN=metrics_token):
+            context, tokens = self.create_context()
+            tokens['metrics'] = f'Bearer {metrics_token}'
+            client = Client(HTTP_HOST=host)
+            self.stdout.write(f'{"case":<28} {"p50 ms":>8} {"p95 ms":>8}  queries/budget')
+            for label, method, path, body, auth in cases:
+                path = fill(path, context)
+                if resolve(path.split('?')[0]).url_name != label.split()[0]:
+                    raise CommandError(f'{label}: {path} is not served by the route the label names')
+                durations, queries = self.measure(client, method, path, fill(body, context),
+                                                  tokens.get(auth), options['requests'], label)
+                budget = QUERY_BUDGETS[label]
+                line = (f'{label:<28} {percentile(durations, 50) * 1000:>8.1f} '
+                        f'{percentile(durations, 95) * 1000:>8.1f}  {queries:>7}/{budget}')
+                if queries > budget:
+                    over_budget.append(label)
+                    self.stdout.write(self.style.ERROR(f'{line}  over budget'))
+                else:
+                    self.stdout.write(line)
+            transaction.set_rollback(True)
+
+        if over_budget:
+            raise CommandError(f'{len(over_budget)} case(s) ran more queries than budgeted: {", ".join(over_budget)}')
+        self.stdout.write(self.style.SUCCESS(f'All {len(cases)} cases are within their query budgets'))
+
+    def create_context(self):
+        """Values the case paths are formatted with, and a bearer token per kind of caller"""
+        viewer = User.objects.order_by('-following_count', 'id').first()
+        user = User.objects.exclude(pk=getattr(viewer, 'pk', None)).order_by('-followers_count', 'id').first()
+        post = Post.objects.filter(is_private=False, user__is_private=False).order_by('-like_count', 'id').first()
+        tag = Tag.objects.order_by('-post_count', 'id').first()
+        if not (viewer and user and post and tag):
+            raise CommandError('Not enough data to benchmark; load some with `manage.py seed_dataset` first')
+
+        viewer.set_password(BENCHMARK_PASSWORD)
+        viewer.reset_token = uuid.uuid4().hex
+        viewer.reset_token_expires = timezone.now() + timedelta(hours=1)
+        viewer.save(update_fields=['password', 'reset_token', 'reset_token_expires'])
+        staff = User.objects.create_user(
+            email='benchmark-staff@example.invalid', username='benchmark_staff',
+            name='Benchmark Staff', password=None, is_staff=True,
+        )
+        own_post = Post.objects.create(user=viewer, caption='Benchmark post', tags=f'#{tag.name}')
+        saved, _ = SavedPost.objects.get_or_create(user=viewer, post=post)
+        recent_post_ids = Post.objects.order_by('-created_at', '-id').values_list('id', flat=True)[:20]
+
+        context = {
+            'viewer_email': viewer.email,
+            'user': user.pk,
+            'user_prefix': user.username[:3],
+            'post': post.pk,
+            'own_post': own_post.pk,
+            'own_comment': Comment.objects.create(post=post, user=viewer, content='Benchmark comment').pk,
+            'pinnable_comment': Comment.objects.create(post=own_post, user=user, content='Benchmark comment').pk,
+            'saved': saved.pk,
+            'tag': tag.name,
+            'tag_prefix': tag.name[:2],
+            'recent_post_ids': ','.join(str(post_id) for post_id in recent_post_ids),
+            'reset_token': viewer.reset_token,
+        }
+        tokens = {
+            'viewer': f'Bearer {RefreshToken.for_user(viewer).access_token}',
+            'staff': f'Bearer {RefreshToken.for_user(staff).access_token}',
+        }
+        return context, tokens
+
+    def measure(self, client, method, path, body, authorization, requests, label):
+        """Request durations in seconds and the most queries one request ran"""
+        durations = []
+        most_queries = 0
+        headers = {'Authorization': authorization} if authorization else {}
+        data = json.dumps(body) if body is not None else ''
+        for attempt in range(requests + 1):
+            with transaction.atomic(), CaptureQueriesContext(connection) as captured:
+                start = time.perf_counter()
+                response = client.generic(method.upper(), path, data, content_type='application/json', headers=headers)
+                duration = time.perf_counter() - start
+                transaction.set_rollback(True)
+            if response.status_code >= 400:
+                raise CommandError(f'{label}: {method.upper()} {path} answered {response.status_code}: '
+                                   f'{response.content[:200]!r}')
+            if attempt:  # The first request warms caches and connections
+                durations.append(duration)
+            most_queries = max(most_queries, sum(
+                1 for query in captured.captured_queries
+                if not query['sql'].lstrip().upper().startswith(IGNORED_STATEMENTS)
+            ))
+        return durations, most_queries
+
+
+def check_coverage():
+    """Fail when a route has no benchmark case or a case has no budget"""
+    covered = {label.split()[0] for label, *_ in CASES}
+    routes = {pattern.name for pattern in api_urls.urlpatterns if isinstance(pattern, URLPattern)}
+    missing = sorted(routes - covered)
+    if missing:
+        raise CommandError(f'No benchmark case for route(s): {", ".join(missing)}')
+    unbudgeted = [label for label, *_ in CASES if label not in QUERY_BUDGETS]
+    if unbudgeted:
+        raise CommandError(f'No query budget in api/query_budgets.py for: {", ".join(unbudgeted)}')
+
+
+def fill(value, context):
+    """`value` with {placeholders} formatted from `context`, recursing into dicts"""
+    if isinstance(value, dict):
+        return {key: fill(item, context) for key, item in value.items()}
+    if isinstance(value, str):
+        return value.format(**context)
+    return value
+
+
+def percentile(values, percent):
+    """Nearest-rank percentile of a non-empty list"""
+    ordered = sorted(values)
+    return ordered[max(math.ceil(percent / 100 * len(ordered)) - 1, 0)]
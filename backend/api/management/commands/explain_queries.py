@@ -0,0 +1,196 @@
+"""
+Check that the queries behind the hot endpoints are served from indexes.
+
+Every endpoint in ENDPOINTS is requested as a throwaway probe user with a
+little data of its own; paginated lists are requested a second time through
+their `next` link so the keyset range query is covered too. All of this runs
+inside a transaction that is rolled back at the end, so nothing is left
+behind. Each SELECT the views run is captured and EXPLAINed, and the command
+fails when a plan reads a whole table or sorts rows outside an index:
+
+- SQLite: "SCAN <table>" without an index, "USE TEMP B-TREE"
+- MySQL: type=ALL, "Using filesort" / "Using temporary"
+- PostgreSQL: "Seq Scan", "Sort" (sequential scans are disabled for the
+  check so small tables still show whether an index is usable)
+
+MySQL and SQLite plan from table statistics, so run the check against a
+database holding realistic data (a staging copy, or one filled by seed_dataset)
+rather than an empty one.
+"""
+import json
+import uuid
+from urllib.parse import urlsplit
+
+from asgiref.sync import async_to_sync, iscoroutinefunction
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+from django.urls import resolve
+from rest_framework.test import APIRequestFactory, force_authenticate
+from rest_framework_simplejwt.tokens import AccessToken
+
+from api.management.utils import request_host
+from api.models import User, Post, Comment, SavedPost
+
+# (name, method, path) per endpoint; paths are formatted with the probe ids.
+# A fourth item lists plan problems the endpoint is allowed to have.
+ENDPOINTS = [
+    ('home timeline', 'get', '/api/posts/?page_size=1'),
+    ('recent posts', 'get', '/api/posts/recent/?page_size=1'),
+    ('post detail', 'get', '/api/posts/{post}/'),
+    ('comments', 'get', '/api/posts/{post}/comments/?page_size=1'),
+    ('user posts', 'get', '/api/users/{author}/posts/?page_size=1'),
+    ('public user posts', 'get', '/api/users/public/{author}/posts/?page_size=1'),
+    ('user detail', 'get', '/api/auth/users/{author}/'),
+    ('user directory', 'get', '/api/auth/users/?limit=1'),
+    ('user directory search', 'get', '/api/auth/users/?q=explain&limit=1'),
+    ('user typeahead', 'get', '/api/auth/users/autocomplete/?q=explain'),
+    ('liked posts', 'get', '/api/auth/me/liked/?page_size=1'),
+    ('saved posts', 'get', '/api/saves/?page_size=1'),
+    ('saved state', 'get', '/api/saves/state/?ids={post}'),
+    ('tag feed', 'get', '/api/tags/{tag}/posts/?page_size=1'),
+    # Search results are ranked by a score computed over the matching postings
+    ('post search', 'get', '/api/search/posts/?q={tag}&page_size=1', {'sort'}),
+    ('user search', 'get', '/api/search/users/?q=explain&page_size=1', {'sort'}),
+    ('reset password', 'post', '/api/auth/reset-password/{token}/'),
+]
+
+
+class Command(BaseCommand):
+    help = 'EXPLAIN the queries behind each hot endpoint and fail on full scans or sorts'
+
+    def handle(self, *args, **options):
+        failures = []
+        with transaction.atomic():
+            if connection.vendor == 'postgresql':
+                with connection.cursor() as cursor:
+                    cursor.execute('SET LOCAL enable_seqscan = off')
+            probe = self.create_probe()
+            for endpoint in ENDPOINTS:
+                name, method, path = endpoint[:3]
+                allowed = endpoint[3] if len(endpoint) > 3 else set()
+                problems = [
+                    (kind, detail, sql)
+                    for sql in self.capture(method, path.format(**probe), probe['viewer'])
+                    for kind, detail in explain(sql)
+                    if kind not in allowed
+                ]
+                if problems:
+                    failures.append(name)
+                    self.stdout.write(self.style.ERROR(f'FAIL {name}'))
+                    for kind, detail, sql in problems:
+                        self.stdout.write(f'  {kind}: {detail}')
+                        if options['verbosity'] > 1:
+                            self.stdout.write(f'    {sql}')
+                else:
+                    self.stdout.write(f'ok   {name}')
+            transaction.set_rollback(True)
+
+        if failures:
+            raise CommandError(f'{len(failures)} endpoint(s) fall back to a full scan or sort: {", ".join(failures)}')
+        self.stdout.write(self.style.SUCCESS(f'All {len(ENDPOINTS)} endpoints are served from indexes'))
+
+    def create_probe(self):
+        """A viewer following an author with two tagged posts, each liked, saved and commented on"""
+        suffix = uuid.uuid4().hex[:8]
+        viewer = User.objects.create_user(
+            email=f'explain-viewer-{suffix}@example.invalid', username=f'explain_viewer_{suffix}',
+            name='Explain Viewer', password=None,
+        )
+        author = User.objects.create_user(
+            email=f'explain-author-{suffix}@example.invalid', username=f'explain_author_{suffix}',
+            name='Explain Author', password=None,
+        )
+        viewer.toggle_follow(author)
+        # Count the author as high-fanout so the feed also reads its posts directly
+        User.objects.filter(pk=author.pk).update(followers_count=settings.FEED_FANOUT_MAX_FOLLOWERS)
+        tag = f'explain{suffix}'
+        posts = [
+            Post.objects.create(user=author, caption='Explain probe', tags=f'#{tag}', image_path='probe.jpg')
+            for _ in range(2)
+        ]
+        for post in posts:
+            post.toggle_like(viewer)
+            SavedPost.objects.create(user=viewer, post=post)
+            for _ in range(2):
+                Comment.objects.create(post=post, user=viewer, content='Explain probe')
+        return {'viewer': viewer, 'author': author.pk, 'post': posts[0].pk, 'tag': tag, 'token': uuid.uuid4().hex}
+
+    def capture(self, method, path, user):
+        """SELECT statements run while serving `path` and, for lists, its next page"""
+        # The default 'testserver' host isn't allowed; building `next` links would fail
+        factory = APIRequestFactory(SERVER_NAME=request_host())
+        statements = []
+        while path:
+            if method == 'post':
+                request = factory.post(path, {'password': uuid.uuid4().hex}, format='json')
+            else:
+                request = factory.get(path)
+            force_authenticate(request, user=user)
+            match = resolve(urlsplit(path).path)
+            view = match.func
+            if iscoroutinefunction(view):
+                # An async read view (ASYNC_READ_VIEWS) authenticates from the header itself
+                request.META['HTTP_AUTHORIZATION'] = f'Bearer {AccessToken.for_user(user)}'
+                view = async_to_sync(view)
+            with CaptureQueriesContext(connection) as captured:
+                response = view(request, *match.args, **match.kwargs)
+            if response.status_code >= 400 and method == 'get':
+                raise CommandError(f'GET {path} answered {response.status_code}')
+            statements.extend(query['sql'] for query in captured.captured_queries
+                              if query['sql'].lstrip().upper().startswith('SELECT'))
+
+            # Follow the first `next` link only: that is the keyset range query
+            data = response.data if hasattr(response, 'data') else json.loads(response.content)
+            next_url = isinstance(data, dict) and data.get('next')
+            if not next_url or 'cursor=' in path:
+                break
+            parts = urlsplit(next_url)
+            path = f'{parts.path}?{parts.query}'
+        return statements
+
+
+def explain(sql):
+    """(kind, detail) pairs for every full scan ('scan') or out-of-index sort ('sort') in the plan of `sql`"""
+    with connection.cursor() as cursor:
+        if connection.vendor == 'sqlite':
+            cursor.execute('EXPLAIN QUERY PLAN ' + sql)
+            return list(_sqlite_problems(row[-1] for row in cursor.fetchall()))
+        if connection.vendor == 'mysql':
+            cursor.execute('EXPLAIN ' + sql)
+            columns = [column[0].lower() for column in cursor.description]
+            return list(_mysql_problems(dict(zip(columns, row)) for row in cursor.fetchall()))
+        if connection.vendor == 'postgresql':
+            cursor.execute('EXPLAIN (FORMAT JSON) ' + sql)
+            plan = cursor.fetchone()[0]
+            if isinstance(plan, str):
+                plan = json.loads(plan)
+            return list(_postgresql_problems(plan[0]['Plan']))
+    raise CommandError(f'EXPLAIN checks are not implemented for {connection.vendor}')
+
+
+def _sqlite_problems(details):
+    for detail in details:
+        if detail.startswith('SCAN ') and ' INDEX ' not in detail and not detail.startswith(('SCAN (', 'SCAN CONSTANT')):
+            yield 'scan', detail
+        elif 'TEMP B-TREE' in detail:
+            yield 'sort', detail
+
+
+def _mysql_problems(rows):
+    for row in rows:
+        extra = row.get('extra') or ''
+        if row.get('type') == 'ALL':
+            yield 'scan', f"full scan of {row.get('table')}"
+        if 'Using filesort' in extra or 'Using temporary' in extra:
+            yield 'sort', f"{row.get('table')}: {extra}"
+
+
+def _postgresql_problems(node):
+    if node['Node Type'] == 'Seq Scan':
+        yield 'scan', f"Seq Scan on {node.get('Relation Name')}"
+    elif node['Node Type'] == 'Sort':
+        yield 'sort', f"Sort on {', '.join(node.get('Sort Key', []))}"
+    for child in node.get('Plans', []):
+        yield from _postgresql_problems(child)
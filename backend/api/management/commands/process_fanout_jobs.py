@@ -0,0 +1,18 @@
+"""
+Background worker for the timeline fan-out queue.
+
+Run one or more of these alongside the web servers:
+
+    python manage.py process_fanout_jobs            # poll forever
+    python manage.py process_fanout_jobs --once     # drain what's runnable, then exit
+"""
+from api.job_queue import QueueWorkerCommand
+from api.timelines import run_pending
+
+
+class Command(QueueWorkerCommand):
+    help = "Copy new posts into followers' timelines, retrying failures with backoff"
+    drained_message = 'Fan-out queue drained: {succeeded} succeeded, {failed} failed or retrying'
+
+    def run_batch(self, batch_size):
+        return run_pending(batch_size)
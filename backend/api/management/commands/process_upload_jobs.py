@@ -0,0 +1,18 @@
+"""
+Background worker for the media upload queue.
+
+Run one or more of these alongside the web servers:
+
+    python manage.py process_upload_jobs            # poll forever
+    python manage.py process_upload_jobs --once     # drain what's runnable, then exit
+"""
+from api.job_queue import QueueWorkerCommand
+from api.uploads import run_pending
+
+
+class Command(QueueWorkerCommand):
+    help = 'Upload staged images and delete replaced ones, retrying failures with backoff'
+    drained_message = 'Upload queue drained: {succeeded} succeeded, {failed} failed or retrying'
+
+    def run_batch(self, batch_size):
+        return run_pending(batch_size)
@@ -0,0 +1,39 @@
+"""
+Rebuild the full-text search index (PostSearchTerm / UserSearchTerm).
+
+Postings are maintained on every post and profile save; run this once after
+migrating to index existing rows, or after changing the tokenizer or field
+weights in api/search.py. Rows are processed in primary-key batches, one
+transaction per batch.
+"""
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from api.models import Post, PostSearchTerm, User, UserSearchTerm
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the post and user search index in batches'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=500,
+                            help='Number of posts/users to index per batch (default: 500)')
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        posts = self._rebuild(Post.objects.select_related('user'), PostSearchTerm.index, batch_size)
+        users = self._rebuild(User.objects.all(), UserSearchTerm.index, batch_size)
+        self.stdout.write(self.style.SUCCESS(f'Indexed {posts} post(s) and {users} user(s)'))
+
+    def _rebuild(self, queryset, index, batch_size):
+        last_id = 0
+        indexed = 0
+        while True:
+            batch = list(queryset.filter(id__gt=last_id).order_by('id')[:batch_size])
+            if not batch:
+                return indexed
+            with transaction.atomic():
+                for instance in batch:
+                    index(instance)
+            last_id = batch[-1].id
+            indexed += len(batch)
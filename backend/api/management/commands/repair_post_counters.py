@@ -0,0 +1,53 @@
+"""
+Recompute the denormalized Post.like_count / Post.comment_count columns.
+
+Counters are maintained transactionally by Post.toggle_like and
+Comment.save/delete, but bulk deletes (e.g. a user account being removed)
+bypass those hooks. This command walks the posts table in primary-key
+ranges and rewrites only the rows whose stored counters have drifted, with
+one UPDATE per range that counts and writes in the same statement, so a
+like or comment committed meanwhile is never overwritten.
+"""
+from django.core.management.base import BaseCommand
+from django.db.models import Count, IntegerField, Max, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+from api.models import Post, Comment, Like
+
+
+def _count_subquery(model):
+    return Coalesce(Subquery(
+        model.objects.filter(post_id=OuterRef('pk'))
+        .order_by().values('post_id').annotate(c=Count('*')).values('c'),
+        output_field=IntegerField(),
+    ), 0)
+
+
+class Command(BaseCommand):
+    help = 'Repair drifted like/comment counters on posts in batches'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000,
+                            help='Post ids per UPDATE range (default: 1000)')
+        parser.add_argument('--dry-run', action='store_true',
+                            help='Report drifted posts without writing anything')
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        dry_run = options['dry_run']
+        max_id = Post.objects.aggregate(max_id=Max('id'))['max_id'] or 0
+        checked = repaired = 0
+
+        for start in range(1, max_id + 1, batch_size):
+            posts = Post.objects.filter(id__range=(start, start + batch_size - 1))
+            checked += posts.count()
+            drifted = posts.exclude(like_count=_count_subquery(Like), comment_count=_count_subquery(Comment))
+            if dry_run:
+                repaired += drifted.count()
+            else:
+                repaired += drifted.update(like_count=_count_subquery(Like), comment_count=_count_subquery(Comment))
+
+        verb = 'Found' if dry_run else 'Repaired'
+        self.stdout.write(self.style.SUCCESS(
+            f'{verb} {repaired} drifted post(s) out of {checked} checked'
+        ))
@@ -0,0 +1,275 @@
+"""
+Generate a large, realistic dataset for benchmarks and query-plan checks.
+
+The same --seed always produces the same users, follows, posts, likes,
+comments and saves, timestamped in the --days before SEED_EPOCH. Popularity is skewed the way social data is: a few
+accounts attract most followers and likes, a few tags are on most posts.
+Rows are written with bulk_create in batches, so the model save() hooks
+do not run; the command fills in what they would have maintained itself
+(like/comment/follow counters and home timelines) and then runs
+rebuild_search_index and backfill_tags.
+
+Seeded accounts use the @seed.snapgram.invalid email domain and the
+password SEED_PASSWORD; --clear deletes them (and everything they own)
+before seeding.
+"""
+import random
+from collections import defaultdict
+from contextlib import contextmanager
+from datetime import datetime, timedelta, timezone
+from itertools import accumulate, islice
+
+from django.conf import settings
+from django.contrib.auth.hashers import make_password
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from api.models import User, Post, Comment, SavedPost, Like, Follow, TimelineEntry, ImageStatus
+
+SEED_DOMAIN = 'seed.snapgram.invalid'
+SEED_PASSWORD = 'snapgram-seed'
+SEED_EPOCH = datetime(2025, 1, 1, tzinfo=timezone.utc)  # Newest possible created_at; fixed so a seed is repeatable
+
+FIRST_NAMES = ['Aarav', 'Maya', 'Liam', 'Zara', 'Noah', 'Isha', 'Omar', 'Lena', 'Kai', 'Priya',
+               'Ethan', 'Sofia', 'Arjun', 'Nora', 'Leo', 'Ananya', 'Mateo', 'Chloe', 'Ravi', 'Emma']
+LAST_NAMES = ['Sharma', 'Smith', 'Garcia', 'Patel', 'Kim', 'Nguyen', 'Müller', 'Rossi', 'Silva', 'Khan',
+              'Thorat', 'Brown', 'Ito', 'Novak', 'Costa', 'Singh', 'Jones', 'Dubois', 'Mehta', 'Lopez']
+LOCATIONS = ['Mumbai', 'Pune', 'Goa', 'Delhi', 'Bengaluru', 'London', 'Paris', 'Tokyo', 'New York',
+             'Lisbon', 'Berlin', 'Sydney', 'Cape Town', 'Reykjavik', 'Bali', '']
+WORDS = ['sunset', 'coffee', 'morning', 'beach', 'mountains', 'city', 'lights', 'weekend', 'friends',
+         'food', 'travel', 'street', 'rain', 'autumn', 'garden', 'music', 'night', 'road', 'trip',
+         'golden', 'hour', 'view', 'vibes', 'art', 'market', 'river', 'snow', 'desert', 'forest', 'sky']
+TAGS = ['travel', 'photography', 'nature', 'sunset', 'food', 'love', 'instagood', 'beach', 'art',
+        'streetphotography', 'mountains', 'coffee', 'fitness', 'pets', 'goa', 'mumbai', 'architecture',
+        'nightsky', 'monsoon', 'weekend', 'portrait', 'blackandwhite', 'foodie', 'hiking', 'citylights']
+
+
+def zipf_weights(count, exponent):
+    """Cumulative weights where item i is chosen with probability proportional to 1 / (i + 1) ** exponent"""
+    return list(accumulate(1 / (i + 1) ** exponent for i in range(count)))
+
+
+@contextmanager
+def explicit_timestamps(*models):
+    """Let bulk_create keep the generated created_at (and updated_at) values instead of stamping now()"""
+    created = [model._meta.get_field('created_at') for model in models]
+    updated = [field for model in models for field in model._meta.concrete_fields if field.name == 'updated_at']
+    try:
+        for field in created:
+            field.auto_now_add = False
+        for field in updated:
+            field.auto_now = False
+        yield
+    finally:
+        for field in created:
+            field.auto_now_add = True
+        for field in updated:
+            field.auto_now = True
+
+
+class Command(BaseCommand):
+    help = 'Generate a deterministic, popularity-skewed dataset of users, posts, likes, comments and saves'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--seed', type=int, default=42, help='Random seed (default: 42)')
+        parser.add_argument('--users', type=int, default=1000, help='Number of users (default: 1000)')
+        parser.add_argument('--posts', type=int, default=10000, help='Number of posts (default: 10000)')
+        parser.add_argument('--follows', type=int, default=20000, help='Number of follows (default: 20000)')
+        parser.add_argument('--likes', type=int, default=50000, help='Number of likes (default: 50000)')
+        parser.add_argument('--comments', type=int, default=20000, help='Number of comments (default: 20000)')
+        parser.add_argument('--saves', type=int, default=10000, help='Number of saves (default: 10000)')
+        parser.add_argument('--days', type=int, default=365,
+                            help='Spread creation times over this many past days (default: 365)')
+        parser.add_argument('--batch-size', type=int, default=1000,
+                            help='Rows per bulk_create batch (default: 1000)')
+        parser.add_argument('--clear', action='store_true',
+                            help='Delete previously seeded users and their content first')
+
+    def handle(self, *args, **options):
+        seeded = User.objects.filter(email__endswith=f'@{SEED_DOMAIN}')
+        if options['clear']:
+            deleted, _ = seeded.delete()
+            self.stdout.write(f'Deleted {deleted} previously seeded row(s)')
+        elif seeded.exists():
+            raise CommandError('Seeded users already exist; pass --clear to replace them')
+        if options['users'] < 2:
+            raise CommandError('--users must be at least 2')
+
+        self.rng = random.Random(options['seed'])
+        self.batch_size = options['batch_size']
+        self.now = SEED_EPOCH
+        self.start = self.now - timedelta(days=options['days'])
+
+        with transaction.atomic(), explicit_timestamps(User, Post, Comment, SavedPost, Follow):
+            users = self.create_users(options['users'])
+            self.create_follows(users, options['follows'])
+            posts = self.create_posts(users, options['posts'])
+            self.create_likes(users, posts, options['likes'])
+            self.create_comments(users, posts, options['comments'])
+            self.create_saves(users, posts, options['saves'])
+        # Millions of rows on big seeds: committed batch by batch rather than in the transaction above
+        self.create_timelines(users, posts)
+        self.stdout.write('Indexing search terms and tags...')
+        call_command('rebuild_search_index', stdout=self.stdout)
+        call_command('backfill_tags', stdout=self.stdout)
+        self.stdout.write(self.style.SUCCESS(
+            f'Seeded {len(users)} users and {len(posts)} posts (seed {options["seed"]}); '
+            f'log in as {users[0].email} / {SEED_PASSWORD}'
+        ))
+
+    def random_time(self, after=None):
+        start = max(after or self.start, self.start)
+        return start + timedelta(seconds=self.rng.randrange(max(int((self.now - start).total_seconds()), 1)))
+
+    def bulk_create(self, model, rows):
+        """Insert `rows` (a list or a generator) batch_size at a time; returns how many were inserted"""
+        rows, created = iter(rows), 0
+        stamped = any(field.name == 'updated_at' for field in model._meta.concrete_fields)
+        while batch := list(islice(rows, self.batch_size)):
+            if stamped:
+                for row in batch:
+                    row.updated_at = row.created_at  # Not edited since
+            model.objects.bulk_create(batch)
+            created += len(batch)
+        return created
+
+    def create_users(self, count):
+        password = make_password(SEED_PASSWORD)
+        users = []
+        for i in range(count):
+            first, last = self.rng.choice(FIRST_NAMES), self.rng.choice(LAST_NAMES)
+            bio, location = ' '.join(self.rng.sample(WORDS, 6)), self.rng.choice(LOCATIONS)
+            is_private, created_at = self.rng.random() < 0.05, self.random_time()
+            users.append(User(
+                username=f'{first.lower()}_{last.lower()}_{i}', email=f'user{i}@{SEED_DOMAIN}',
+                name=f'{first} {last}', password=password, bio=bio, location=location,
+                is_private=is_private, created_at=created_at, date_joined=created_at,
+            ))
+        self.bulk_create(User, users)
+        # MySQL doesn't return primary keys from bulk inserts; read them back by username
+        ids = dict(User.objects.filter(email__endswith=f'@{SEED_DOMAIN}').values_list('username', 'id'))
+        for user in users:
+            user.id = ids[user.username]
+        # Rank accounts by popularity independently of creation order
+        self.popular_users = users[:]
+        self.rng.shuffle(self.popular_users)
+        self.popular_weights = zipf_weights(count, 1.1)
+        self.stdout.write(f'Created {count} users')
+        return users
+
+    def create_follows(self, users, count):
+        pairs = set()
+        for _ in range(count * 2):
+            if len(pairs) >= count:
+                break
+            follower = self.rng.choice(users)
+            followee = self.rng.choices(self.popular_users, cum_weights=self.popular_weights)[0]
+            if follower.id != followee.id:
+                pairs.add((follower.id, followee.id))
+        followers = defaultdict(list)
+        following = defaultdict(int)
+        rows = []
+        for follower_id, followee_id in sorted(pairs):
+            followers[followee_id].append(follower_id)
+            following[follower_id] += 1
+            rows.append(Follow(follower_id=follower_id, followee_id=followee_id, created_at=self.random_time()))
+        self.bulk_create(Follow, rows)
+        for user in users:
+            user.followers_count = len(followers[user.id])
+            user.following_count = following[user.id]
+        User.objects.bulk_update(users, ['followers_count', 'following_count'], batch_size=self.batch_size)
+        self.followers = followers
+        self.stdout.write(f'Created {len(rows)} follows')
+
+    def create_posts(self, users, count):
+        tag_weights = zipf_weights(len(TAGS), 1.0)
+        posts = []
+        for i in range(count):
+            author = self.rng.choices(self.popular_users, cum_weights=self.popular_weights)[0]
+            tags = {self.rng.choices(TAGS, cum_weights=tag_weights)[0] for _ in range(self.rng.randint(0, 4))}
+            posts.append(Post(
+                user_id=author.id,
+                caption=' '.join(self.rng.choices(WORDS, k=self.rng.randint(3, 12))).capitalize(),
+                image_path=f'https://picsum.photos/seed/snapgram-{i}/1080/1080',
+                image_status=ImageStatus.READY,
+                location=self.rng.choice(LOCATIONS),
+                tags=' '.join(f'#{tag}' for tag in sorted(tags)),
+                is_private=self.rng.random() < 0.05,
+                created_at=self.random_time(after=author.created_at),
+            ))
+        self.bulk_create(Post, posts)
+        # Auto-increment ids follow insertion order within this transaction
+        ids = list(Post.objects.filter(user__email__endswith=f'@{SEED_DOMAIN}').order_by('id').values_list('id', flat=True))
+        for post, post_id in zip(posts, ids):
+            post.id = post_id
+        # Posts by popular authors draw most of the engagement
+        rank = {user.id: i for i, user in enumerate(self.popular_users)}
+        self.popular_posts = sorted(posts, key=lambda post: (rank[post.user_id], self.rng.random()))
+        self.post_weights = zipf_weights(count, 0.9)
+        self.stdout.write(f'Created {count} posts')
+        return posts
+
+    def engagement(self, users, count):
+        """Up to `count` distinct (user, post) pairs, skewed towards popular posts"""
+        pairs = set()
+        for _ in range(count * 2):
+            if len(pairs) >= count:
+                break
+            post = self.rng.choices(self.popular_posts, cum_weights=self.post_weights)[0]
+            pairs.add((self.rng.choice(users).id, post))
+        return sorted(pairs, key=lambda pair: (pair[0], pair[1].id))
+
+    def create_likes(self, users, posts, count):
+        rows = [
+            Like(user_id=user_id, post_id=post.id, created_at=self.random_time(after=post.created_at))
+            for user_id, post in self.engagement(users, count)
+        ]
+        self.bulk_create(Like, rows)
+        like_counts = defaultdict(int)
+        for like in rows:
+            like_counts[like.post_id] += 1
+        for post in posts:
+            post.like_count = like_counts[post.id]
+        Post.objects.bulk_update(posts, ['like_count'], batch_size=self.batch_size)
+        self.stdout.write(f'Created {len(rows)} likes')
+
+    def create_comments(self, users, posts, count):
+        rows = []
+        comment_counts = defaultdict(int)
+        for _ in range(count):
+            post = self.rng.choices(self.popular_posts, cum_weights=self.post_weights)[0]
+            comment_counts[post.id] += 1
+            rows.append(Comment(
+                post_id=post.id, user_id=self.rng.choice(users).id,
+                content=' '.join(self.rng.choices(WORDS, k=self.rng.randint(2, 10))).capitalize(),
+                created_at=self.random_time(after=post.created_at),
+            ))
+        self.bulk_create(Comment, rows)
+        for post in posts:
+            post.comment_count = comment_counts[post.id]
+        Post.objects.bulk_update(posts, ['comment_count'], batch_size=self.batch_size)
+        self.stdout.write(f'Created {len(rows)} comments')
+
+    def create_saves(self, users, posts, count):
+        rows = [
+            SavedPost(user_id=user_id, post_id=post.id, created_at=self.random_time(after=post.created_at))
+            for user_id, post in self.engagement(users, count)
+        ]
+        self.bulk_create(SavedPost, rows)
+        self.stdout.write(f'Created {len(rows)} saves')
+
+    def create_timelines(self, users, posts):
+        """What Post.save and the fan-out worker would have written, generated a batch at a time"""
+        def entries():
+            for post in posts:
+                readers = [post.user_id]
+                followers = self.followers[post.user_id]
+                if not post.is_private and len(followers) < settings.FEED_FANOUT_MAX_FOLLOWERS:
+                    readers += followers
+                for reader_id in readers:
+                    yield TimelineEntry(user_id=reader_id, post_id=post.id, author_id=post.user_id,
+                                        created_at=post.created_at)
+
+        created = self.bulk_create(TimelineEntry, entries())
+        self.stdout.write(f'Created {created} timeline entries')
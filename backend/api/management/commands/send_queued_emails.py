@@ -0,0 +1,21 @@
+"""
+Background worker for the email outbox.
+
+Run alongside the web servers:
+
+    python manage.py send_queued_emails            # poll forever
+    python manage.py send_queued_emails --once     # drain what's deliverable, then exit
+"""
+from api.email_utils import deliver_queued_emails
+from api.job_queue import QueueWorkerCommand
+
+
+class Command(QueueWorkerCommand):
+    help = 'Deliver queued emails in batches over one SMTP connection, retrying failures with backoff'
+    items = 'emails'
+    default_batch_size = 50  # Sent over one SMTP connection
+    batch_message = 'Sent batch of {count} email(s): {succeeded} sent, {failed} failed'
+    drained_message = 'Email outbox drained: {succeeded} sent, {failed} failed or retrying'
+
+    def run_batch(self, batch_size):
+        return deliver_queued_emails(batch_size)
@@ -0,0 +1,7 @@
+"""Helpers shared by the management commands that send requests through the app"""
+from django.conf import settings
+
+
+def request_host():
+    """A host name ALLOWED_HOSTS accepts, for requests built inside a command"""
+    return next((host.lstrip('.') for host in settings.ALLOWED_HOSTS if '*' not in host), 'localhost')
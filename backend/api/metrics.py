@@ -0,0 +1,276 @@
+"""
+Per-request performance metrics: SQL, serializer and external call time
+
+PerformanceMetricsMiddleware times every request and records, through a
+context variable, how many SQL queries it ran and how long they took (an
+execute wrapper on every connection), how long serializing the response
+took (`serializing`: the JSON renderers and the list views building their
+data, excluding the queries they triggered) and how long calls to external
+services such as Cloudinary and SMTP took (`external_call`). The numbers are
+folded into per-route histograms that `GET /api/metrics/` exposes in the
+Prometheus text format, and sent back in a `Server-Timing` header to staff,
+in DEBUG, or to everyone with SERVER_TIMING_HEADER on.
+
+Everything is kept in process memory: recording a request costs a few
+perf_counter() calls per query plus one short locked update. Each server
+process reports its own counters, so scrape every process (or sum them).
+"""
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+from django.db.backends.signals import connection_created
+
+# Upper bounds of the histogram buckets
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100)
+
+# Methods recorded under their own label; anything else is counted as OTHER
+HTTP_METHODS = frozenset({'GET', 'HEAD', 'POST', 'PUT', 'PATCH', 'DELETE', 'OPTIONS'})
+
+_current = ContextVar('request_timings', default=None)
+
+
+class RequestTimings:
+    def __init__(self):
+        self.queries = 0
+        self.db_time = 0.0
+        self.serializer_time = 0.0
+        self.serializer_depth = 0   # Nested .data calls are timed once
+        self.external = {}          # service -> seconds
+
+
+def _record_query(execute, sql, params, many, context):
+    timings = _current.get()
+    if timings is None:
+        return execute(sql, params, many, context)
+    start = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        timings.db_time += time.perf_counter() - start
+        timings.queries += 1
+
+
+@contextmanager
+def external_call(service):
+    """Time a call to an external service (e.g. 'cloudinary', 'smtp') for the current request"""
+    timings = _current.get()
+    if timings is None:
+        yield  # Background workers have no request to report to
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        timings.external[service] = timings.external.get(service, 0.0) + time.perf_counter() - start
+
+
+@contextmanager
+def serializing():
+    """Count the enclosed block as serializer time, e.g. response rows built without a serializer"""
+    timings = _current.get()
+    if timings is None or timings.serializer_depth:
+        yield
+        return
+    timings.serializer_depth += 1
+    start, db_before = time.perf_counter(), timings.db_time
+    try:
+        yield
+    finally:
+        timings.serializer_depth -= 1
+        # Lazy querysets run inside .data; that time is already counted as db
+        timings.serializer_time += time.perf_counter() - start - (timings.db_time - db_before)
+
+
+def install_query_timing():
+    """
+    Time queries on every database connection, now and as they are opened
+
+    Connections are per thread, and under ASGI the ORM runs in worker
+    threads, so wrapping the connection inside the middleware would miss
+    them. `_record_query` finds the request through the context variable,
+    which sync_to_async carries into those threads.
+    """
+    for connection in connections.all(initialized_only=True):
+        _add_query_timing(connection)
+    connection_created.connect(_add_query_timing, dispatch_uid='api.metrics.query_timing')
+
+
+def _add_query_timing(connection, **kwargs):
+    if _record_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(_record_query)
+
+
+class Histogram:
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.total = 0
+        self.sum = 0.0
+
+    def observe(self, value):
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[i] += 1
+                break
+        self.total += 1
+        self.sum += value
+
+    def cumulative(self):
+        running = 0
+        for bound, count in zip(self.buckets, self.counts):
+            running += count
+            yield bound, running
+
+
+class RouteStats:
+    def __init__(self):
+        self.duration = Histogram(DURATION_BUCKETS)
+        self.queries = Histogram(QUERY_COUNT_BUCKETS)
+        self.db_time = 0.0
+        self.serializer_time = 0.0
+        self.external = {}
+
+
+class Registry:
+    def __init__(self):
+        self.routes = {}  # (method, route, status class) -> RouteStats
+        self.lock = threading.Lock()
+
+    def record(self, method, route, status_class, duration, timings):
+        with self.lock:
+            stats = self.routes.get((method, route, status_class))
+            if stats is None:
+                stats = self.routes[(method, route, status_class)] = RouteStats()
+            stats.duration.observe(duration)
+            stats.queries.observe(timings.queries)
+            stats.db_time += timings.db_time
+            stats.serializer_time += timings.serializer_time
+            for service, seconds in timings.external.items():
+                stats.external[service] = stats.external.get(service, 0.0) + seconds
+
+    def render(self):
+        """All metrics in the Prometheus text exposition format (version 0.0.4)"""
+        with self.lock:
+            routes = sorted(self.routes.items())
+            lines = [
+                '# HELP snapgram_request_duration_seconds Request duration by route',
+                '# TYPE snapgram_request_duration_seconds histogram',
+            ]
+            for key, stats in routes:
+                lines.extend(_histogram_lines('snapgram_request_duration_seconds', _labels(key), stats.duration))
+            lines += [
+                '# HELP snapgram_request_db_queries SQL queries per request by route',
+                '# TYPE snapgram_request_db_queries histogram',
+            ]
+            for key, stats in routes:
+                lines.extend(_histogram_lines('snapgram_request_db_queries', _labels(key), stats.queries))
+            lines += [
+                '# HELP snapgram_request_db_seconds_total Time spent in SQL queries by route',
+                '# TYPE snapgram_request_db_seconds_total counter',
+            ]
+            lines += [f'snapgram_request_db_seconds_total{{{_labels(key)}}} {stats.db_time:.6f}' for key, stats in routes]
+            lines += [
+                '# HELP snapgram_request_serializer_seconds_total Time spent building serializer data by route',
+                '# TYPE snapgram_request_serializer_seconds_total counter',
+            ]
+            lines += [f'snapgram_request_serializer_seconds_total{{{_labels(key)}}} {stats.serializer_time:.6f}'
+                      for key, stats in routes]
+            lines += [
+                '# HELP snapgram_request_external_seconds_total Time spent calling external services by route',
+                '# TYPE snapgram_request_external_seconds_total counter',
+            ]
+            lines += [
+                f'snapgram_request_external_seconds_total{{{_labels(key)},service="{service}"}} {seconds:.6f}'
+                for key, stats in routes for service, seconds in sorted(stats.external.items())
+            ]
+        return '\n'.join(lines) + '\n'
+
+
+def _labels(key):
+    method, route, status_class = key
+    route = route.replace('\\', '\\\\').replace('"', '\\"')
+    return f'method="{method}",route="{route}",status="{status_class}"'
+
+
+def _histogram_lines(name, labels, histogram):
+    for bound, count in histogram.cumulative():
+        yield f'{name}_bucket{{{labels},le="{bound}"}} {count}'
+    yield f'{name}_bucket{{{labels},le="+Inf"}} {histogram.total}'
+    yield f'{name}_sum{{{labels}}} {histogram.sum:.6f}'
+    yield f'{name}_count{{{labels}}} {histogram.total}'
+
+
+registry = Registry()
+
+
+class PerformanceMetricsMiddleware:
+    """Measure each request, add a Server-Timing header and record it in `registry`"""
+    sync_capable = True
+    async_capable = True  # Under ASGI the async read views stay on the event loop
+
+    def __init__(self, get_response):
+        if not settings.PERF_METRICS_ENABLED:
+            raise MiddlewareNotUsed
+        install_query_timing()
+        self.get_response = get_response
+        self.is_async = iscoroutinefunction(get_response)
+        if self.is_async:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.is_async:
+            return self.__acall__(request)
+        timings = RequestTimings()
+        token = _current.set(timings)
+        start = time.perf_counter()
+        try:
+            response = self.get_response(request)
+        finally:
+            _current.reset(token)
+        return self.finish(request, response, time.perf_counter() - start, timings)
+
+    async def __acall__(self, request):
+        timings = RequestTimings()
+        token = _current.set(timings)
+        start = time.perf_counter()
+        try:
+            response = await self.get_response(request)
+        finally:
+            _current.reset(token)
+        return self.finish(request, response, time.perf_counter() - start, timings)
+
+    def finish(self, request, response, duration, timings):
+        match = getattr(request, 'resolver_match', None)
+        # Unmatched paths share one label so scanners can't blow up the series count
+        route = match.route if match else 'unmatched'
+        method = request.method if request.method in HTTP_METHODS else 'OTHER'  # Same for made-up verbs
+        registry.record(method, route, f'{response.status_code // 100}xx', duration, timings)
+        if show_server_timing(request):
+            response['Server-Timing'] = server_timing(duration, timings)
+        return response
+
+
+def show_server_timing(request):
+    """Whether the response may reveal DB time and query counts to this caller"""
+    if settings.SERVER_TIMING_HEADER or settings.DEBUG:
+        return True
+    # DRF views put the authenticated user on the request; session users (the admin) come from middleware
+    return getattr(getattr(request, 'user', None), 'is_staff', False)
+
+
+def server_timing(duration, timings):
+    metrics = [
+        f'db;dur={timings.db_time * 1000:.1f};desc="{timings.queries} queries"',
+        f'serializer;dur={timings.serializer_time * 1000:.1f}',
+    ]
+    metrics += [f'{service};dur={seconds * 1000:.1f}' for service, seconds in sorted(timings.external.items())]
+    metrics.append(f'total;dur={duration * 1000:.1f}')
+    return ', '.join(metrics)
@@ -0,0 +1,45 @@
+# Generated by Django 5.2.6 on 2026-10-18 04:33
+
+from django.db import migrations, models
+from django.db.models import Count, IntegerField, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def backfill_counters(apps, schema_editor):
+    Post = apps.get_model('api', 'Post')
+    Comment = apps.get_model('api', 'Comment')
+    Like = Post.likes.through
+
+    def count_of(model):
+        return Coalesce(Subquery(
+            model.objects.filter(post_id=OuterRef('pk'))
+            .order_by().values('post_id').annotate(c=Count('*')).values('c'),
+            output_field=IntegerField(),
+        ), 0)
+
+    Post.objects.update(like_count=count_of(Like), comment_count=count_of(Comment))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0009_remove_website_field'),
+    ]
+
+    operations = [
+        migrations.AlterModelOptions(
+            name='user',
+            options={'ordering': ['-created_at']},
+        ),
+        migrations.AddField(
+            model_name='post',
+            name='comment_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='post',
+            name='like_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.RunPython(backfill_counters, migrations.RunPython.noop),
+    ]
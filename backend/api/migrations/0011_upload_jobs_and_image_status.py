@@ -0,0 +1,55 @@
+# Generated by Django 5.2.6 on 2026-10-18 04:37
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+def mark_existing_images_ready(apps, schema_editor):
+    for model_name in ('Post', 'User'):
+        model = apps.get_model('api', model_name)
+        model.objects.exclude(image_path__isnull=True).exclude(image_path='').update(image_status='ready')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0010_post_like_count_post_comment_count'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='post',
+            name='image_status',
+            field=models.CharField(choices=[('none', 'No image'), ('processing', 'Processing'), ('ready', 'Ready'), ('failed', 'Failed')], default='none', max_length=20),
+        ),
+        migrations.AddField(
+            model_name='user',
+            name='image_status',
+            field=models.CharField(choices=[('none', 'No image'), ('processing', 'Processing'), ('ready', 'Ready'), ('failed', 'Failed')], default='none', max_length=20),
+        ),
+        migrations.CreateModel(
+            name='UploadJob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('action', models.CharField(choices=[('upload', 'Upload'), ('delete', 'Delete')], default='upload', max_length=10)),
+                ('status', models.CharField(choices=[('pending', 'Pending'), ('running', 'Running'), ('done', 'Done'), ('failed', 'Failed')], default='pending', max_length=10)),
+                ('target_type', models.CharField(blank=True, choices=[('post', 'Post image'), ('user', 'Profile image')], max_length=10)),
+                ('target_id', models.BigIntegerField(blank=True, null=True)),
+                ('file', models.FileField(blank=True, max_length=500, upload_to='upload_jobs/%Y/%m/%d/')),
+                ('original_name', models.CharField(blank=True, max_length=255)),
+                ('folder', models.CharField(blank=True, max_length=255)),
+                ('url', models.CharField(blank=True, max_length=500)),
+                ('attempts', models.PositiveIntegerField(default=0)),
+                ('last_error', models.TextField(blank=True)),
+                ('run_after', models.DateTimeField(default=django.utils.timezone.now)),
+                ('locked_at', models.DateTimeField(blank=True, null=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'ordering': ['run_after', 'id'],
+                'indexes': [models.Index(fields=['status', 'run_after'], name='uploadjob_status_run_after'), models.Index(fields=['target_type', 'target_id'], name='uploadjob_target')],
+            },
+        ),
+        migrations.RunPython(mark_existing_images_ready, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,89 @@
+import hashlib
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+def _legacy_storage_key(url):
+    """One-off recovery of (storage, key) for URLs stored before keys were kept explicitly"""
+    if 'cloudinary.com' in url and '/upload/' in url:
+        parts = url.split('/upload/', 1)[1].split('/')
+        if parts and parts[0].startswith('v') and parts[0][1:].isdigit():
+            parts = parts[1:]  # Skip version segment
+        return 'cloudinary', '/'.join(parts).rsplit('.', 1)[0]
+    local_url = getattr(settings, 'LOCAL_MEDIA_URL', '/media/local_storage/')
+    if url.startswith(local_url):
+        return 'local', url[len(local_url):]
+    return getattr(settings, 'MEDIA_STORAGE', 'cloudinary'), url
+
+
+def backfill_storage_keys(apps, schema_editor):
+    MediaAsset = apps.get_model('api', 'MediaAsset')
+    Post = apps.get_model('api', 'Post')
+    User = apps.get_model('api', 'User')
+    UploadJob = apps.get_model('api', 'UploadJob')
+
+    for asset in MediaAsset.objects.all():
+        asset.storage, asset.storage_key = _legacy_storage_key(asset.url)
+        asset.save(update_fields=['storage', 'storage_key'])
+
+    for job in UploadJob.objects.filter(action='delete').exclude(url=''):
+        job.urls = [job.url]
+        job.save(update_fields=['urls'])
+
+    # Every image still referenced (or waiting to be deleted) gets an asset row
+    references = {}
+    for image_path, renditions in Post.objects.values_list('image_path', 'image_renditions'):
+        urls = {meta['url'] for meta in (renditions or {}).values()}
+        urls.update([image_path] if image_path else [])
+        for url in urls:
+            references[url] = references.get(url, 0) + 1
+    for image_path in User.objects.exclude(image_path__isnull=True).exclude(image_path='') \
+            .values_list('image_path', flat=True):
+        references[image_path] = references.get(image_path, 0) + 1
+    for urls in UploadJob.objects.filter(action='delete', status__in=['pending', 'running']) \
+            .values_list('urls', flat=True):
+        for url in urls:
+            references[url] = references.get(url, 0) + 1
+
+    known = set(MediaAsset.objects.values_list('url', flat=True))
+    for url, ref_count in references.items():
+        if url in known:
+            continue
+        storage, storage_key = _legacy_storage_key(url)
+        MediaAsset.objects.create(
+            key=f"legacy-{hashlib.sha256(url.encode('utf-8')).hexdigest()[:57]}",
+            storage=storage, storage_key=storage_key, url=url, ref_count=ref_count,
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0013_media_assets'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='mediaasset',
+            name='storage',
+            field=models.CharField(default='', max_length=100),
+            preserve_default=False,
+        ),
+        migrations.AddField(
+            model_name='mediaasset',
+            name='storage_key',
+            field=models.CharField(default='', max_length=500),
+            preserve_default=False,
+        ),
+        migrations.AddField(
+            model_name='uploadjob',
+            name='urls',
+            field=models.JSONField(blank=True, default=list),
+        ),
+        migrations.RunPython(backfill_storage_keys, migrations.RunPython.noop),
+        migrations.RemoveField(
+            model_name='uploadjob',
+            name='url',
+        ),
+    ]
@@ -0,0 +1,43 @@
+# Generated by Django 5.2.6 on 2026-10-18 04:54
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0016_follows_and_timelines'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PostSearchTerm',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('term', models.CharField(max_length=64)),
+                ('weight', models.PositiveSmallIntegerField(default=1)),
+                ('is_public', models.BooleanField(default=True)),
+                ('created_at', models.DateTimeField()),
+                ('author', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to=settings.AUTH_USER_MODEL)),
+                ('post', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='api.post')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['term', 'is_public', 'post'], name='postsearch_term_public'), models.Index(fields=['author', 'term'], name='postsearch_author_term')],
+                'unique_together': {('term', 'post')},
+            },
+        ),
+        migrations.CreateModel(
+            name='UserSearchTerm',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('term', models.CharField(max_length=64)),
+                ('weight', models.PositiveSmallIntegerField(default=1)),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'unique_together': {('term', 'user')},
+            },
+        ),
+    ]
@@ -0,0 +1,54 @@
+# Generated by Django 5.2.6 on 2026-10-18 05:01
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    """
+    Turn the implicit Post.likes table into the explicit Like model.
+    
+    The model keeps the existing api_post_likes table, its rows and its
+    (post, user) unique index, so only created_at and the (user, created_at)
+    index touch the database. Existing likes get the migration time; their
+    ids still keep them in the order they were made.
+    """
+
+    dependencies = [
+        ('api', '0019_user_directory_indexes'),
+    ]
+
+    operations = [
+        migrations.SeparateDatabaseAndState(
+            state_operations=[
+                migrations.CreateModel(
+                    name='Like',
+                    fields=[
+                        ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                        ('post', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='api.post')),
+                        ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='likes', to=settings.AUTH_USER_MODEL)),
+                    ],
+                    options={
+                        'db_table': 'api_post_likes',
+                        'unique_together': {('post', 'user')},
+                    },
+                ),
+                migrations.AlterField(
+                    model_name='post',
+                    name='likes',
+                    field=models.ManyToManyField(blank=True, related_name='liked_posts', through='api.Like', to=settings.AUTH_USER_MODEL),
+                ),
+            ],
+        ),
+        migrations.AddField(
+            model_name='like',
+            name='created_at',
+            field=models.DateTimeField(default=django.utils.timezone.now),
+        ),
+        migrations.AddIndex(
+            model_name='like',
+            index=models.Index(fields=['user', '-created_at', '-id'], name='like_user_created'),
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 5.2.6 on 2026-10-18 05:02
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0020_like_through_model'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='savedpost',
+            index=models.Index(fields=['user', '-created_at', '-id'], name='savedpost_user_created'),
+        ),
+    ]
@@ -1,7 +1,11 @@
+from django.conf import settings
 from django.contrib.auth.models import AbstractUser
-from django.db import models
+from django.db import models, transaction, IntegrityError
+from django.db.models import Count, F, Q, Sum
+from django.db.models.functions import Lower
 from django.utils import timezone
-from .cloudinary_utils import upload_to_cloudinary, delete_from_cloudinary
+
+from . import authentication, public_cache, search
 
 """
 SnapGram Database Models
@@ -10,6 +14,15 @@ This file defines the core data models for the SnapGram social media application
 The models represent users, posts, and comments with relationships and business logic.
 """
 
+
+class ImageStatus(models.TextChoices):
+    """Lifecycle of an image handed to the background upload pipeline"""
+    NONE = 'none', 'No image'
+    PROCESSING = 'processing', 'Processing'
+    READY = 'ready', 'Ready'
+    FAILED = 'failed', 'Failed'
+
+
 class User(AbstractUser):
     """
     Custom User Model - Core user profile and authentication
@@ -28,12 +41,18 @@ class User(AbstractUser):
     bio = models.TextField(blank=True, max_length=500)                    # User bio/description
     location = models.CharField(max_length=255, blank=True)               # User location
     image_path = models.CharField(max_length=500, blank=True, null=True)  # Cloudinary avatar URL
+    image_status = models.CharField(max_length=20, choices=ImageStatus.choices,
+                                    default=ImageStatus.NONE)             # Avatar upload state
     
     # Privacy and Security
     is_private = models.BooleanField(default=False)                         # Profile privacy setting
-    reset_token = models.CharField(max_length=100, blank=True, null=True)  # Password reset token
+    reset_token = models.CharField(max_length=100, blank=True, null=True, db_index=True)  # Password reset token
     reset_token_expires = models.DateTimeField(blank=True, null=True)     # Token expiration
     
+    # Denormalized follow counters, kept in sync by toggle_follow
+    followers_count = models.PositiveIntegerField(default=0)                # Users following this user
+    following_count = models.PositiveIntegerField(default=0)                # Users this user follows
+    
     # Timestamps
     created_at = models.DateTimeField(auto_now_add=True)                    # Account creation time
     updated_at = models.DateTimeField(auto_now=True)                      # Last profile update
@@ -41,8 +60,17 @@ class User(AbstractUser):
     USERNAME_FIELD = 'email'
     REQUIRED_FIELDS = ['username', 'name']
 
+    # Columns the user directory and typeahead serialize (UserSummarySerializer)
+    SUMMARY_FIELDS = ('id', 'username', 'name', 'image_path', 'is_private', 'created_at')
+
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['-created_at', '-id'], name='user_created'),  # Directory pages
+            # Case-insensitive prefix lookups for typeahead
+            models.Index(Lower('username'), name='user_username_lower'),
+            models.Index(Lower('name'), name='user_name_lower'),
+        ]
 
     def __str__(self):
         return self.username
@@ -51,25 +79,152 @@ class User(AbstractUser):
     def imageUrl(self):
         return self.image_path
 
+    def image_urls(self):
+        """Every stored asset backing the avatar"""
+        return [self.image_path] if self.image_path else []
+
+    def toggle_follow(self, target):
+        """
+        Follow or unfollow `target` in a single transaction.
+        
+        Works like Post.toggle_like: delete first, insert only when nothing
+        was deleted, and move both counters by the rows that changed. Following
+        copies the target's recent posts into this user's timeline; unfollowing
+        removes them. Returns a (following, followers_count) tuple.
+        """
+        with transaction.atomic():
+            deleted, _ = Follow.objects.filter(follower_id=self.pk, followee_id=target.pk).delete()
+            if deleted:
+                following, delta = False, -1
+            else:
+                try:
+                    with transaction.atomic():
+                        Follow.objects.create(follower_id=self.pk, followee_id=target.pk)
+                    following, delta = True, 1
+                except IntegrityError:
+                    # A concurrent request already inserted the same follow
+                    following, delta = True, 0
+            if delta:
+                followers = User.objects.filter(pk=target.pk)
+                followed = User.objects.filter(pk=self.pk)
+                if delta < 0:
+                    # Never underflow a drifted counter
+                    followers = followers.filter(followers_count__gt=0)
+                    followed = followed.filter(following_count__gt=0)
+                followers.update(followers_count=F('followers_count') + delta)
+                followed.update(following_count=F('following_count') + delta)
+                if following:
+                    TimelineEntry.backfill(self, target)
+                else:
+                    TimelineEntry.objects.filter(user_id=self.pk, author_id=target.pk).delete()
+                public_cache.invalidate_user(self.pk, target.pk)  # Both counters moved
+                authentication.invalidate_user(self.pk, target.pk)
+            target.followers_count = User.objects.values_list('followers_count', flat=True).get(pk=target.pk)
+        return following, target.followers_count
+
+    @classmethod
+    def prefix_matches(cls, prefix):
+        """
+        Users whose username or display name starts with `prefix` (already lowercased)
+        
+        Returns two querysets annotated with the matched value as `match_key`,
+        one per Lower() index. Each is a single index range, so ordering it by
+        (match_key, id) needs no sort. Users whose username matches are left
+        out of the name source so nobody is listed twice.
+        """
+        low, high = search.prefix_range(prefix)
+        usernames = cls.objects.annotate(match_key=Lower('username')).filter(match_key__gte=low, match_key__lt=high)
+        names = (
+            cls.objects.annotate(match_key=Lower('name'), username_key=Lower('username'))
+            .filter(match_key__gte=low, match_key__lt=high)
+            .exclude(username_key__gte=low, username_key__lt=high)
+        )
+        return [usernames, names]
+
+    @classmethod
+    def suggest(cls, prefix, limit=10):
+        """Typeahead: the first `limit` users by username/name prefix, alphabetically"""
+        users = []
+        for queryset in cls.prefix_matches(prefix):
+            users.extend(queryset.only(*cls.SUMMARY_FIELDS).order_by('match_key', 'id')[:limit])
+        users.sort(key=lambda user: (user.match_key, user.id))
+        return users[:limit]
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Remember the stored privacy so save() can tell when it flips
+        instance._saved_is_private = instance.__dict__.get('is_private')
+        return instance
+
     def save(self, *args, **kwargs):
-        # Handle image upload to Cloudinary
-        if hasattr(self, '_image_file') and self._image_file:
-            # Delete old image from Cloudinary if exists
-            if self.image_path:
-                delete_from_cloudinary(self.image_path)
-            
-            # Upload new image to Cloudinary with original filename
-            cloudinary_url = upload_to_cloudinary(self._image_file, 'snapgram/profiles')
-            if cloudinary_url:
-                self.image_path = cloudinary_url
+        # New avatars are staged and uploaded by the background worker
+        image_file = getattr(self, '_image_file', None)
+        if image_file:
+            self.image_status = ImageStatus.PROCESSING
+        update_fields = kwargs.get('update_fields')
         
-        super().save(*args, **kwargs)
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+            if image_file:
+                self._image_file = None
+                UploadJob.enqueue_upload(self, image_file, 'snapgram/profiles')
+            if update_fields is None or set(update_fields) & set(search.USER_FIELD_WEIGHTS):
+                UserSearchTerm.index(self)
+            if getattr(self, '_saved_is_private', self.is_private) != self.is_private:
+                PostSearchTerm.sync_author_privacy(self)
+                PostTag.sync_author_privacy(self)
+            self._saved_is_private = self.is_private
+            public_cache.invalidate_user(self.pk)
+            authentication.invalidate_user(self.pk)
 
     def delete(self, *args, **kwargs):
-        # Delete image from Cloudinary when user is deleted
-        if self.image_path:
-            delete_from_cloudinary(self.image_path)
-        super().delete(*args, **kwargs)
+        # Remove the avatar from storage in the background when user is deleted
+        with transaction.atomic():
+            # Follow rows cascade away; release the counters they held on other users
+            User.objects.filter(
+                pk__in=Follow.objects.filter(follower_id=self.pk).values('followee_id'), followers_count__gt=0
+            ).update(followers_count=F('followers_count') - 1)
+            User.objects.filter(
+                pk__in=Follow.objects.filter(followee_id=self.pk).values('follower_id'), following_count__gt=0
+            ).update(following_count=F('following_count') - 1)
+            self._release_post_counters()
+            if self.image_urls():
+                UploadJob.enqueue_delete(self.image_urls())
+            public_cache.invalidate_user(self.pk)
+            authentication.invalidate_user(self.pk)
+            return super().delete(*args, **kwargs)
+
+    def _release_post_counters(self):
+        """
+        Take this user's likes and comments off other users' post counters
+
+        The rows themselves go with the cascade. Posts are updated in groups
+        that lose the same number of comments, so this is one UPDATE for likes
+        plus one or two per distinct comment count rather than one per post.
+        """
+        liked = Post.objects.filter(
+            pk__in=Like.objects.filter(user_id=self.pk).values('post_id')
+        ).exclude(user_id=self.pk)  # The user's own posts are deleted with them
+        touched = set(liked.values_list('pk', 'user_id'))
+        liked.filter(like_count__gt=0).update(like_count=F('like_count') - 1)
+
+        commented = (
+            Comment.objects.filter(user_id=self.pk).exclude(post__user_id=self.pk)
+            .values('post_id', 'post__user_id').annotate(removed=Count('id')).order_by()
+        )
+        by_removed = {}
+        for row in commented:
+            by_removed.setdefault(row['removed'], []).append(row['post_id'])
+            touched.add((row['post_id'], row['post__user_id']))
+        for removed, post_ids in by_removed.items():
+            posts = Post.objects.filter(pk__in=post_ids)
+            # Never underflow a drifted counter (zero those first, before the others drop below `removed`)
+            posts.filter(comment_count__lt=removed).update(comment_count=0)
+            posts.filter(comment_count__gte=removed).update(comment_count=F('comment_count') - removed)
+
+        for post_id, author_id in touched:
+            public_cache.invalidate_post(post_id, author_id)
 
 
 class Post(models.Model):
@@ -88,12 +243,19 @@ class Post(models.Model):
     user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='posts')  # Post author
     caption = models.TextField()                                                    # Post text content
     image_path = models.CharField(max_length=500, blank=True, null=True)            # Cloudinary image URL
+    image_status = models.CharField(max_length=20, choices=ImageStatus.choices,
+                                    default=ImageStatus.NONE)                       # Image upload state
+    image_renditions = models.JSONField(default=dict, blank=True)                   # {name: url/width/height/bytes}
     location = models.CharField(max_length=255, blank=True)                         # Post location
     tags = models.CharField(max_length=500, blank=True)                             # Hashtags and tags
     
     # Privacy and Social Features
     is_private = models.BooleanField(default=False)                                 # Post privacy setting
-    likes = models.ManyToManyField(User, related_name='liked_posts', blank=True)   # Users who liked this post
+    likes = models.ManyToManyField(User, through='Like', related_name='liked_posts', blank=True)  # Users who liked this post
+    
+    # Denormalized counters, kept in sync with likes/comments inside the same transaction
+    like_count = models.PositiveIntegerField(default=0)                             # Number of likes
+    comment_count = models.PositiveIntegerField(default=0)                          # Number of comments
     
     # Timestamps
     created_at = models.DateTimeField(auto_now_add=True)                            # Post creation time
@@ -101,6 +263,12 @@ class Post(models.Model):
 
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            # Author profile pages and fan-out-on-read for high-follower accounts
+            models.Index(fields=['user', '-created_at', '-id'], name='post_user_created'),
+            # Recent posts: read in keyset order, privacy filtered along the way
+            models.Index(fields=['-created_at', '-id'], name='post_created'),
+        ]
 
     def __str__(self):
         return f"{self.user.username} - {self.caption[:50]}"
@@ -111,27 +279,89 @@ class Post(models.Model):
 
     @property
     def likes_count(self):
-        return self.likes.count()
+        return self.like_count
+
+    def rendition_url(self, name):
+        """URL of a size rendition, falling back to the original image"""
+        rendition = (self.image_renditions or {}).get(name)
+        return rendition['url'] if rendition else self.image_path
+
+    @property
+    def thumbnailUrl(self):
+        return self.rendition_url('thumb')
+
+    @property
+    def mediumImageUrl(self):
+        return self.rendition_url('medium')
+
+    def image_urls(self):
+        """Every stored asset backing the post image (original and renditions)"""
+        urls = {rendition['url'] for rendition in (self.image_renditions or {}).values()}
+        if self.image_path:
+            urls.add(self.image_path)
+        return sorted(urls)
+
+    def toggle_like(self, user):
+        """
+        Like or unlike the post for `user` in a single transaction.
+        
+        Tries to delete the like row first and only inserts when nothing was
+        deleted, so the counter is adjusted by exactly the rows that changed.
+        Returns a (liked, like_count) tuple.
+        """
+        with transaction.atomic():
+            deleted, _ = Like.objects.filter(post_id=self.pk, user_id=user.pk).delete()
+            if deleted:
+                liked, delta = False, -1
+            else:
+                try:
+                    with transaction.atomic():
+                        Like.objects.create(post_id=self.pk, user_id=user.pk)
+                    liked, delta = True, 1
+                except IntegrityError:
+                    # A concurrent request already inserted the same like
+                    liked, delta = True, 0
+            if delta:
+                counter = Post.objects.filter(pk=self.pk)
+                if delta < 0:
+                    counter = counter.filter(like_count__gt=0)  # Never underflow a drifted counter
+                counter.update(like_count=F('like_count') + delta)
+                public_cache.invalidate_post(self.pk, self.user_id)
+            self.like_count = Post.objects.values_list('like_count', flat=True).get(pk=self.pk)
+        return liked, self.like_count
 
     def save(self, *args, **kwargs):
-        # Handle image upload to Cloudinary
-        if hasattr(self, '_image_file') and self._image_file:
-            # Delete old image from Cloudinary if exists
-            if self.image_path:
-                delete_from_cloudinary(self.image_path)
-            
-            # Upload new image to Cloudinary with original filename
-            cloudinary_url = upload_to_cloudinary(self._image_file, 'snapgram/posts')
-            if cloudinary_url:
-                self.image_path = cloudinary_url
+        # New images are staged and uploaded by the background worker
+        image_file = getattr(self, '_image_file', None)
+        if image_file:
+            self.image_status = ImageStatus.PROCESSING
         
-        super().save(*args, **kwargs)
+        adding = self._state.adding
+        update_fields = kwargs.get('update_fields')
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+            if image_file:
+                self._image_file = None
+                UploadJob.enqueue_upload(self, image_file, 'snapgram/posts')
+            if update_fields is None or set(update_fields) & {*search.POST_FIELD_WEIGHTS, 'is_private'}:
+                PostSearchTerm.index(self)
+                PostTag.sync(self)
+            if adding:
+                # The author sees the post at once; followers get it from the fan-out worker
+                TimelineEntry.objects.create(user_id=self.user_id, post=self, author_id=self.user_id,
+                                             created_at=self.created_at)
+                if not self.is_private:
+                    FanoutJob.objects.create(post=self)
+            public_cache.invalidate_post(self.pk, self.user_id)
 
     def delete(self, *args, **kwargs):
-        # Delete image from Cloudinary when post is deleted
-        if self.image_path:
-            delete_from_cloudinary(self.image_path)
-        super().delete(*args, **kwargs)
+        # Remove the image and its renditions from storage in the background when post is deleted
+        with transaction.atomic():
+            if self.image_urls():
+                UploadJob.enqueue_delete(self.image_urls())
+            PostTag.release(self)
+            public_cache.invalidate_post(self.pk, self.user_id)
+            return super().delete(*args, **kwargs)
 
 
 class Comment(models.Model):
@@ -145,10 +375,40 @@ class Comment(models.Model):
 
     class Meta:
         ordering = ['-pinned', '-created_at']
+        indexes = [
+            # Comment threads: pinned first, then newest first, in keyset order
+            models.Index(fields=['post', '-pinned', '-created_at', '-id'], name='comment_post_pinned_created'),
+        ]
 
     def __str__(self):
         return f"{self.user.username} - {self.content[:50]}"
 
+    @classmethod
+    def thread(cls, post_id):
+        """A post's comments with just the columns CommentSerializer reads"""
+        return cls.objects.filter(post_id=post_id).select_related('user').only(
+            'id', 'content', 'pinned', 'created_at', 'updated_at', 'post_id',
+            'user__id', 'user__username', 'user__name', 'user__image_path',
+        )
+
+    def save(self, *args, **kwargs):
+        # Keep Post.comment_count in step with newly created comments
+        if not self._state.adding:
+            return super().save(*args, **kwargs)
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+            Post.objects.filter(pk=self.post_id).update(comment_count=F('comment_count') + 1)
+            public_cache.invalidate_post(self.post_id, self.post.user_id)
+
+    def delete(self, *args, **kwargs):
+        with transaction.atomic():
+            result = super().delete(*args, **kwargs)
+            Post.objects.filter(pk=self.post_id, comment_count__gt=0).update(
+                comment_count=F('comment_count') - 1
+            )
+            public_cache.invalidate_post(self.post_id, self.post.user_id)
+        return result
+
 
 class SavedPost(models.Model):
     """Model for saved posts"""
@@ -157,8 +417,469 @@ class SavedPost(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
 
     class Meta:
-        unique_together = ['user', 'post']
+        unique_together = ['user', 'post']  # Also serves the bulk saved-state lookup
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['user', '-created_at', '-id'], name='savedpost_user_created'),
+        ]
 
     def __str__(self):
         return f"{self.user.username} saved {self.post.id}"
+
+    @classmethod
+    def records_for(cls, user, post_ids):
+        """{post_id: saved record id} for the posts in `post_ids` that `user` has saved"""
+        return dict(cls.objects.filter(user_id=user.pk, post_id__in=post_ids).order_by().values_list('post_id', 'id'))
+
+
+class Like(models.Model):
+    """
+    A user's like on a post (the Post.likes through table)
+    
+    created_at orders the viewer's liked-posts page, read newest first from
+    the (user, created_at) index.
+    """
+    post = models.ForeignKey(Post, on_delete=models.CASCADE, related_name='+')
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='likes')
+    created_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        db_table = 'api_post_likes'  # The table Django created for the implicit M2M
+        unique_together = ['post', 'user']
+        indexes = [
+            models.Index(fields=['user', '-created_at', '-id'], name='like_user_created'),
+        ]
+
+    def __str__(self):
+        return f"user {self.user_id} likes post {self.post_id}"
+
+    @classmethod
+    def liked_by(cls, user):
+        """The viewer's likes as {'id', 'created_at', 'post_id'} rows for keyset paging"""
+        return cls.objects.filter(user_id=user.pk).values('id', 'created_at', 'post_id')
+
+
+class UploadJob(models.Model):
+    """
+    Durable queue of media work for the background upload worker
+    
+    Requests stage the raw file on local disk and return immediately; the
+    `process_upload_jobs` command uploads it to the configured media storage
+    with retries and exponential backoff, then points the target row's
+    image_path at the result. Targets are referenced by type and id rather
+    than a foreign key so delete jobs outlive the post or user they belong to.
+    """
+    ACTION_UPLOAD = 'upload'
+    ACTION_DELETE = 'delete'
+    ACTION_CHOICES = [(ACTION_UPLOAD, 'Upload'), (ACTION_DELETE, 'Delete')]
+
+    STATUS_PENDING = 'pending'
+    STATUS_RUNNING = 'running'
+    STATUS_DONE = 'done'
+    STATUS_FAILED = 'failed'
+    STATUS_CHOICES = [
+        (STATUS_PENDING, 'Pending'),
+        (STATUS_RUNNING, 'Running'),
+        (STATUS_DONE, 'Done'),
+        (STATUS_FAILED, 'Failed'),
+    ]
+
+    TARGET_POST = 'post'
+    TARGET_USER = 'user'
+    TARGET_CHOICES = [(TARGET_POST, 'Post image'), (TARGET_USER, 'Profile image')]
+
+    action = models.CharField(max_length=10, choices=ACTION_CHOICES, default=ACTION_UPLOAD)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=STATUS_PENDING)
+    target_type = models.CharField(max_length=10, choices=TARGET_CHOICES, blank=True)
+    target_id = models.BigIntegerField(null=True, blank=True)
+    file = models.FileField(upload_to='upload_jobs/%Y/%m/%d/', max_length=500, blank=True)  # Staged raw file
+    original_name = models.CharField(max_length=255, blank=True)
+    folder = models.CharField(max_length=255, blank=True)                                  # Storage folder
+    urls = models.JSONField(default=list, blank=True)                                      # Assets to release
+    attempts = models.PositiveIntegerField(default=0)
+    last_error = models.TextField(blank=True)
+    run_after = models.DateTimeField(default=timezone.now)                                 # Backoff schedule
+    locked_at = models.DateTimeField(null=True, blank=True)                                # Worker lease
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ['run_after', 'id']
+        indexes = [
+            models.Index(fields=['status', 'run_after'], name='uploadjob_status_run_after'),
+            models.Index(fields=['target_type', 'target_id'], name='uploadjob_target'),
+        ]
+
+    def __str__(self):
+        return f"{self.action} {self.target_type or 'assets'} #{self.target_id or ''} ({self.status})"
+
+    @classmethod
+    def enqueue_upload(cls, instance, image_file, folder):
+        """Stage `image_file` for upload and supersede older pending uploads for the same target"""
+        target_type = cls.TARGET_POST if isinstance(instance, Post) else cls.TARGET_USER
+        for stale in cls.objects.filter(target_type=target_type, target_id=instance.pk,
+                                        action=cls.ACTION_UPLOAD, status=cls.STATUS_PENDING):
+            stale.file.delete(save=False)
+            stale.delete()
+        job = cls(action=cls.ACTION_UPLOAD, target_type=target_type, target_id=instance.pk,
+                  original_name=image_file.name, folder=folder)
+        job.file.save(image_file.name, image_file, save=False)
+        job.save()
+        return job
+
+    @classmethod
+    def enqueue_delete(cls, urls):
+        """Release the assets at `urls`; storage deletes happen in one bulk call"""
+        return cls.objects.create(action=cls.ACTION_DELETE, urls=list(urls))
+
+
+class MediaAsset(models.Model):
+    """
+    Content-addressed, reference-counted media blob
+    
+    `key` is derived from the SHA-256 of the uploaded source bytes plus the
+    rendition spec, and is used as the storage public id. Identical uploads
+    reuse the existing blob instead of transferring it again, URLs never
+    change once written (safe to cache forever), and the blob is only deleted
+    from storage when the last post/profile referencing it lets go.
+    """
+    key = models.CharField(max_length=64, unique=True)     # Content hash (hex)
+    storage = models.CharField(max_length=100)             # MEDIA_STORAGE backend holding the blob
+    storage_key = models.CharField(max_length=500)         # Backend key (e.g. Cloudinary public_id)
+    url = models.CharField(max_length=500, db_index=True)  # Immutable public URL
+    width = models.PositiveIntegerField(default=0)
+    height = models.PositiveIntegerField(default=0)
+    size_bytes = models.PositiveIntegerField(default=0)
+    format = models.CharField(max_length=10, blank=True)
+    ref_count = models.PositiveIntegerField(default=0)     # Posts/profiles using this blob
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"{self.key[:12]} ({self.ref_count} refs)"
+
+    def describe(self):
+        """Rendition metadata as recorded on Post.image_renditions"""
+        return {
+            'url': self.url,
+            'width': self.width,
+            'height': self.height,
+            'bytes': self.size_bytes,
+            'format': self.format,
+        }
+
+
+class OutboxEmail(models.Model):
+    """
+    Durable outbox for transactional email
+    
+    Request paths append a row here instead of talking to SMTP; the
+    `send_queued_emails` command drains the table in batches over a single
+    reused connection, retrying with backoff and dead-lettering messages that
+    keep failing.
+    """
+    STATUS_PENDING = 'pending'
+    STATUS_SENDING = 'sending'
+    STATUS_SENT = 'sent'
+    STATUS_DEAD = 'dead'
+    STATUS_CHOICES = [
+        (STATUS_PENDING, 'Pending'),
+        (STATUS_SENDING, 'Sending'),
+        (STATUS_SENT, 'Sent'),
+        (STATUS_DEAD, 'Dead letter'),
+    ]
+
+    recipient = models.EmailField()
+    from_email = models.CharField(max_length=255)
+    subject = models.CharField(max_length=255)
+    body = models.TextField()                                       # Plain text part
+    html_body = models.TextField(blank=True)                        # Optional HTML alternative
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=STATUS_PENDING)
+    attempts = models.PositiveIntegerField(default=0)
+    last_error = models.TextField(blank=True)
+    run_after = models.DateTimeField(default=timezone.now)          # Backoff schedule
+    locked_at = models.DateTimeField(null=True, blank=True)         # Worker lease
+    created_at = models.DateTimeField(auto_now_add=True)
+    sent_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ['run_after', 'id']
+        indexes = [
+            models.Index(fields=['status', 'run_after'], name='outboxemail_status_run_after'),
+        ]
+
+    def __str__(self):
+        return f"{self.subject} -> {self.recipient} ({self.status})"
+
+
+class Follow(models.Model):
+    """Directed follow edge: `follower` sees `followee`'s posts in their home timeline"""
+    follower = models.ForeignKey(User, on_delete=models.CASCADE, related_name='following')
+    followee = models.ForeignKey(User, on_delete=models.CASCADE, related_name='followers')
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        unique_together = ['follower', 'followee']
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['followee', 'follower'], name='follow_followee_follower'),
+        ]
+
+    def __str__(self):
+        return f"{self.follower.username} follows {self.followee.username}"
+
+
+class TimelineEntry(models.Model):
+    """
+    Materialized home timeline row (fan-out-on-write)
+    
+    One row per (viewer, post) for posts by the viewer and the accounts they
+    follow, written by the fan-out worker when a post is created. `created_at`
+    is the post's creation time, copied so that a feed page is a single range
+    scan on (user, created_at, post). Posts by accounts with more than
+    FEED_FANOUT_MAX_FOLLOWERS followers are not fanned out; the feed reads
+    them directly at request time instead (fan-out-on-read).
+    """
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='timeline')  # Timeline owner
+    post = models.ForeignKey(Post, on_delete=models.CASCADE, related_name='+')
+    author = models.ForeignKey(User, on_delete=models.CASCADE, related_name='+')      # For unfollow cleanup
+    created_at = models.DateTimeField()                                                # Post creation time
+
+    class Meta:
+        unique_together = ['user', 'post']
+        indexes = [
+            models.Index(fields=['user', '-created_at', '-post'], name='timeline_user_created'),
+            models.Index(fields=['user', 'author'], name='timeline_user_author'),
+        ]
+
+    def __str__(self):
+        return f"{self.user_id} <- post {self.post_id}"
+
+    @classmethod
+    def backfill(cls, user, author):
+        """Copy `author`'s recent public posts into `user`'s timeline after a follow"""
+        if author.followers_count >= settings.FEED_FANOUT_MAX_FOLLOWERS:
+            return  # Read at request time instead
+        posts = Post.objects.filter(user_id=author.pk, is_private=False).order_by('-created_at')
+        cls.objects.bulk_create([
+            cls(user_id=user.pk, post_id=post_id, author_id=author.pk, created_at=created_at)
+            for post_id, created_at in posts.values_list('id', 'created_at')[:settings.FEED_FOLLOW_BACKFILL]
+        ], ignore_conflicts=True)
+
+
+class FanoutJob(models.Model):
+    """
+    Queue of posts waiting to be copied into their followers' timelines
+    
+    Drained by the `process_fanout_jobs` command with the same lease, retry
+    and backoff scheme as UploadJob.
+    """
+    STATUS_PENDING = 'pending'
+    STATUS_RUNNING = 'running'
+    STATUS_DONE = 'done'
+    STATUS_FAILED = 'failed'
+    STATUS_CHOICES = [
+        (STATUS_PENDING, 'Pending'),
+        (STATUS_RUNNING, 'Running'),
+        (STATUS_DONE, 'Done'),
+        (STATUS_FAILED, 'Failed'),
+    ]
+
+    post = models.ForeignKey(Post, on_delete=models.CASCADE, related_name='+')
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=STATUS_PENDING)
+    attempts = models.PositiveIntegerField(default=0)
+    last_error = models.TextField(blank=True)
+    run_after = models.DateTimeField(default=timezone.now)  # Backoff schedule
+    locked_at = models.DateTimeField(null=True, blank=True)  # Worker lease
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ['run_after', 'id']
+        indexes = [
+            models.Index(fields=['status', 'run_after'], name='fanoutjob_status_run_after'),
+        ]
+
+    def __str__(self):
+        return f"fan-out post #{self.post_id} ({self.status})"
+
+
+class PostSearchTerm(models.Model):
+    """
+    Inverted index posting: `term` occurs in a post's caption, tags or location
+    
+    Rewritten whenever the post is saved. `is_public` mirrors "post is public
+    and its author's profile is public" so privacy is filtered inside the
+    index query, and `created_at` is copied from the post for ordering ties.
+    """
+    term = models.CharField(max_length=64)
+    post = models.ForeignKey(Post, on_delete=models.CASCADE, related_name='+')
+    author = models.ForeignKey(User, on_delete=models.CASCADE, related_name='+')
+    weight = models.PositiveSmallIntegerField(default=1)  # Field weight x occurrences
+    is_public = models.BooleanField(default=True)          # Visible to everyone
+    created_at = models.DateTimeField()                    # Post creation time
+
+    class Meta:
+        unique_together = ['term', 'post']
+        indexes = [
+            models.Index(fields=['term', 'is_public', 'post'], name='postsearch_term_public'),
+            models.Index(fields=['author', 'term'], name='postsearch_author_term'),
+        ]
+
+    def __str__(self):
+        return f"{self.term} -> post {self.post_id}"
+
+    @classmethod
+    def index(cls, post):
+        """Replace the postings for `post`"""
+        # Read the author's privacy from the database; a cached post.user may be stale
+        author_private = User.objects.values_list('is_private', flat=True).get(pk=post.user_id)
+        is_public = not post.is_private and not author_private
+        cls.objects.filter(post_id=post.pk).delete()
+        cls.objects.bulk_create([
+            cls(term=term, post_id=post.pk, author_id=post.user_id, weight=weight,
+                is_public=is_public, created_at=post.created_at)
+            for term, weight in search.weighted_terms(post, search.POST_FIELD_WEIGHTS).items()
+        ])
+
+    @classmethod
+    def sync_author_privacy(cls, user):
+        """Recompute `is_public` for every posting of `user`'s posts after a profile privacy change"""
+        postings = cls.objects.filter(author_id=user.pk)
+        if user.is_private:
+            postings.update(is_public=False)
+        else:
+            postings.filter(post__is_private=False).update(is_public=True)
+
+    @classmethod
+    def search(cls, terms, viewer):
+        """
+        Posts matching every term, as {'post_id', 'created_at', 'score'} rows
+        
+        Only postings of the query terms are read (via the term index), and
+        posts the viewer may not see are excluded in the same query.
+        """
+        return (
+            cls.objects.filter(Q(is_public=True) | Q(author_id=viewer.pk), term__in=terms)
+            .values('post_id', 'created_at')
+            .annotate(score=Sum('weight'), matched=Count('term'))
+            .filter(matched=len(terms))
+        )
+
+
+class UserSearchTerm(models.Model):
+    """Inverted index posting: `term` occurs in a user's username, name, location or bio"""
+    term = models.CharField(max_length=64)
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='+')
+    weight = models.PositiveSmallIntegerField(default=1)
+
+    class Meta:
+        unique_together = ['term', 'user']
+
+    def __str__(self):
+        return f"{self.term} -> user {self.user_id}"
+
+    @classmethod
+    def index(cls, user):
+        """Replace the postings for `user`"""
+        cls.objects.filter(user_id=user.pk).delete()
+        cls.objects.bulk_create([
+            cls(term=term, user_id=user.pk, weight=weight)
+            for term, weight in search.weighted_terms(user, search.USER_FIELD_WEIGHTS).items()
+        ])
+
+    @classmethod
+    def search(cls, terms):
+        """Users matching every term, as {'user_id', 'score'} rows"""
+        return (
+            cls.objects.filter(term__in=terms)
+            .values('user_id')
+            .annotate(score=Sum('weight'), matched=Count('term'))
+            .filter(matched=len(terms))
+        )
+
+
+class Tag(models.Model):
+    """Normalized hashtag (lowercase, no '#') with a denormalized count of tagged posts"""
+    name = models.CharField(max_length=64, unique=True)
+    post_count = models.PositiveIntegerField(default=0)     # Posts carrying this tag
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(default=timezone.now, db_index=True)  # Bumped on count changes
+
+    def __str__(self):
+        return f"#{self.name} ({self.post_count})"
+
+    @classmethod
+    def adjust_counts(cls, tag_ids, delta):
+        tags = cls.objects.filter(id__in=tag_ids)
+        if delta < 0:
+            tags = tags.filter(post_count__gt=0)  # Never underflow a drifted counter
+        # Touch updated_at so in-memory autocomplete indexes pick the change up
+        tags.update(post_count=F('post_count') + delta, updated_at=timezone.now())
+
+
+class PostTag(models.Model):
+    """
+    Post-tag link, the posting list behind /api/tags/<name>/posts/
+    
+    Like TimelineEntry it copies the post's created_at so a tag feed page is
+    a single range scan on (tag, created_at, post), and like PostSearchTerm
+    it keeps an is_public flag so privacy is filtered inside that scan.
+    """
+    tag = models.ForeignKey(Tag, on_delete=models.CASCADE, related_name='post_tags')
+    post = models.ForeignKey(Post, on_delete=models.CASCADE, related_name='post_tags')
+    author = models.ForeignKey(User, on_delete=models.CASCADE, related_name='+')
+    is_public = models.BooleanField(default=True)  # Post and author profile are public
+    created_at = models.DateTimeField()            # Post creation time
+
+    class Meta:
+        unique_together = ['tag', 'post']
+        indexes = [
+            models.Index(fields=['tag', '-created_at', '-post'], name='posttag_tag_created'),
+            models.Index(fields=['author', 'tag'], name='posttag_author_tag'),
+        ]
+
+    def __str__(self):
+        return f"#{self.tag_id} -> post {self.post_id}"
+
+    @classmethod
+    def sync(cls, post):
+        """Make the post's Tag links match its `tags` string and adjust per-tag counts"""
+        names = search.parse_tags(post.tags)
+        author_private = User.objects.values_list('is_private', flat=True).get(pk=post.user_id)
+        is_public = not post.is_private and not author_private
+
+        current = dict(cls.objects.filter(post_id=post.pk).values_list('tag__name', 'tag_id'))
+        removed = [tag_id for name, tag_id in current.items() if name not in names]
+        added = [name for name in names if name not in current]
+
+        if removed:
+            cls.objects.filter(post_id=post.pk, tag_id__in=removed).delete()
+            Tag.adjust_counts(removed, -1)
+        if added:
+            Tag.objects.bulk_create([Tag(name=name) for name in added], ignore_conflicts=True)
+            tag_ids = list(Tag.objects.filter(name__in=added).values_list('id', flat=True))
+            cls.objects.bulk_create([
+                cls(tag_id=tag_id, post_id=post.pk, author_id=post.user_id,
+                    is_public=is_public, created_at=post.created_at)
+                for tag_id in tag_ids
+            ])
+            Tag.adjust_counts(tag_ids, 1)
+        cls.objects.filter(post_id=post.pk).exclude(is_public=is_public).update(is_public=is_public)
+
+    @classmethod
+    def release(cls, post):
+        """Decrement the counts of the post's tags before the post is deleted"""
+        Tag.adjust_counts(list(cls.objects.filter(post_id=post.pk).values_list('tag_id', flat=True)), -1)
+
+    @classmethod
+    def sync_author_privacy(cls, user):
+        """Recompute `is_public` for every link of `user`'s posts after a profile privacy change"""
+        links = cls.objects.filter(author_id=user.pk)
+        if user.is_private:
+            links.update(is_public=False)
+        else:
+            links.filter(post__is_private=False).update(is_public=True)
+
+    @classmethod
+    def feed(cls, tag, viewer):
+        """Posts tagged `tag` that the viewer may see, as {'created_at', 'post_id'} rows"""
+        return cls.objects.filter(Q(is_public=True) | Q(author_id=viewer.pk), tag=tag).values('created_at', 'post_id')
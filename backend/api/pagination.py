@@ -0,0 +1,296 @@
+"""
+SnapGram Pagination Classes
+
+Keyset (cursor) pagination for the feed-style list endpoints.
+
+Unlike PageNumberPagination, keyset pagination never runs COUNT(*) and never
+uses OFFSET. Each page is fetched with a range condition on the ordering
+columns (e.g. created_at, id), so page 5,000 costs the same as page 1 and
+posts don't shift between pages when new ones are created.
+"""
+import base64
+import json
+from datetime import datetime
+
+from django.core.exceptions import FieldDoesNotExist, ValidationError
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import replace_query_param
+
+
+class KeysetPagination(BasePagination):
+    """
+    Opaque cursor pagination keyed on a unique ordering tuple.
+
+    `ordering` must end with a unique column (normally `id`) so every row has
+    a distinct position. Cursors encode the ordering values of the boundary
+    row plus a direction flag; no total count is ever returned.
+    """
+    ordering = ('-created_at', '-id')
+    page_size = api_settings.PAGE_SIZE
+    page_size_query_param = 'page_size'
+    max_page_size = 50
+    cursor_query_param = 'cursor'
+    invalid_cursor_message = 'Invalid cursor'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        return self.paginate_querysets([queryset], request, view)
+
+    def paginate_querysets(self, querysets, request, view=None):
+        """
+        Paginate the merge of several querysets that share the ordering columns.
+        
+        Each source is fetched with the same keyset window, so every one costs a
+        single range scan, and the windows are merged in Python. Rows at the
+        same position are collapsed, so sources may overlap.
+        """
+        rows = []
+        for window in self._windows(querysets, request):
+            rows.extend(window)
+        return self._finish_page(rows)
+
+    async def apaginate_queryset(self, queryset, request, view=None):
+        return await self.apaginate_querysets([queryset], request, view)
+
+    async def apaginate_querysets(self, querysets, request, view=None):
+        """paginate_querysets for async views: each window is read through the async ORM"""
+        rows = []
+        for window in self._windows(querysets, request):
+            rows.extend([row async for row in window])
+        return self._finish_page(rows)
+
+    def _windows(self, querysets, request):
+        """One unevaluated page-sized slice of each queryset, in page order"""
+        self.request = request
+        self.base_url = request.build_absolute_uri()
+        self.page_size = self.get_page_size(request)
+        self.position, self.reverse = self.decode_cursor(request)
+
+        self.page_ordering = self.ordering
+        if self.reverse:
+            self.page_ordering = tuple(self._invert(field) for field in self.ordering)
+
+        # Fetch one extra row to find out whether there is another page
+        windows = []
+        for queryset in querysets:
+            queryset = queryset.order_by(*self.page_ordering)
+            if self.position is not None:
+                queryset = queryset.filter(self._position_filter(queryset, self.position, self.reverse))
+            windows.append(queryset[:self.page_size + 1])
+        self.merge_windows = len(windows) > 1
+        return windows
+
+    def _finish_page(self, rows):
+        position, reverse = self.position, self.reverse
+        if self.merge_windows:
+            rows = self._merge(rows, self.page_ordering)
+        has_more = len(rows) > self.page_size
+        rows = rows[:self.page_size]
+
+        if reverse:
+            rows.reverse()
+            self.has_previous = has_more
+            self.has_next = position is not None
+        else:
+            self.has_next = has_more
+            self.has_previous = position is not None
+
+        if rows:
+            self.next_position = self._row_position(rows[-1])
+            self.previous_position = self._row_position(rows[0])
+        else:
+            # Empty page: both links point back at the cursor we were given
+            self.next_position = self.previous_position = position
+
+        self.page = rows
+        return rows
+
+    def get_page_size(self, request):
+        if self.page_size_query_param:
+            try:
+                size = int(request.query_params[self.page_size_query_param])
+                if size > 0:
+                    return min(size, self.max_page_size)
+            except (KeyError, ValueError):
+                pass
+        return self.page_size
+
+    def get_paginated_response(self, data):
+        return Response(self.get_paginated_data(data))
+
+    def get_paginated_data(self, data):
+        return {
+            'next': self.get_next_link(),
+            'previous': self.get_previous_link(),
+            'results': data,
+        }
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            'type': 'object',
+            'required': ['results'],
+            'properties': {
+                'next': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'previous': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'results': schema,
+            },
+        }
+
+    def get_next_link(self):
+        if not self.has_next:
+            return None
+        return self.encode_cursor(self.next_position, reverse=False)
+
+    def get_previous_link(self):
+        if not self.has_previous:
+            return None
+        return self.encode_cursor(self.previous_position, reverse=True)
+
+    def decode_cursor(self, request):
+        """Return (position, reverse) for the cursor in the request, if any"""
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None, False
+        try:
+            padded = encoded + '=' * (-len(encoded) % 4)
+            payload = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')))
+            position = payload['p']
+            reverse = bool(payload.get('r', False))
+            if not isinstance(position, list) or len(position) != len(self.ordering):
+                raise ValueError
+        except (TypeError, ValueError, KeyError, UnicodeEncodeError):
+            raise NotFound(self.invalid_cursor_message)
+        return position, reverse
+
+    def encode_cursor(self, position, reverse):
+        payload = {'p': [self._encode_value(value) for value in position]}
+        if reverse:
+            payload['r'] = 1
+        raw = json.dumps(payload, separators=(',', ':')).encode('utf-8')
+        encoded = base64.urlsafe_b64encode(raw).decode('ascii').rstrip('=')
+        return replace_query_param(self.base_url, self.cursor_query_param, encoded)
+
+    def _row_position(self, row):
+        values = []
+        for field in self.ordering:
+            name = field.lstrip('-')
+            values.append(row[name] if isinstance(row, dict) else getattr(row, name))
+        return values
+
+    def _merge(self, rows, ordering):
+        # Stable sorts from the last column to the first give the full ordering
+        for field in reversed(ordering):
+            name = field.lstrip('-')
+            rows.sort(key=lambda row: row[name] if isinstance(row, dict) else getattr(row, name),
+                      reverse=field.startswith('-'))
+        merged = []
+        for row in rows:
+            if not merged or self._row_position(row) != self._row_position(merged[-1]):
+                merged.append(row)
+        return merged
+
+    def _position_filter(self, queryset, position, reverse):
+        """
+        Build the "strictly after this row" condition for the ordering tuple.
+
+        For ordering (a, b, c) this expands to
+        a > x OR (a = x AND b > y) OR (a = x AND b = y AND c > z)
+        with each comparison flipped for descending columns.
+        """
+        condition = Q()
+        equal_prefix = {}
+        for field, raw_value in zip(self.ordering, position):
+            name = field.lstrip('-')
+            value = self._decode_value(queryset, name, raw_value)
+            descending = field.startswith('-')
+            lookup = 'lt' if descending != reverse else 'gt'
+            condition |= Q(**equal_prefix, **{f'{name}__{lookup}': value})
+            equal_prefix[name] = value
+        return condition
+
+    def _decode_value(self, queryset, name, value):
+        if value is None or isinstance(value, (list, dict)):
+            raise NotFound(self.invalid_cursor_message)  # Positions only hold scalars
+        try:
+            field = queryset.model._meta.get_field(name)
+        except FieldDoesNotExist:
+            annotation = queryset.query.annotations.get(name)
+            field = getattr(annotation, '_output_field_or_none', None)
+            if field is None:
+                # Untyped columns: only datetimes need converting back
+                try:
+                    parsed = parse_datetime(value) if isinstance(value, str) else None
+                except ValueError:
+                    parsed = None
+                return parsed or value
+        try:
+            return field.to_python(value)
+        except (TypeError, ValueError, ValidationError):
+            # Crafted cursors can hold any JSON type in any slot
+            raise NotFound(self.invalid_cursor_message)
+
+    @staticmethod
+    def _encode_value(value):
+        if isinstance(value, datetime):
+            return value.isoformat()
+        return value
+
+    @staticmethod
+    def _invert(field):
+        return field[1:] if field.startswith('-') else f'-{field}'
+
+
+class PostCursorPagination(KeysetPagination):
+    """Newest-first keyset pagination for post feeds"""
+    ordering = ('-created_at', '-id')
+
+
+class LikedPostsCursorPagination(PostCursorPagination):
+    """Liked posts: most recently liked first over Like {'id', 'created_at', 'post_id'} rows"""
+
+
+class SavedPostCursorPagination(PostCursorPagination):
+    """Saved posts: most recently saved first over SavedPost rows"""
+
+
+class TimelineCursorPagination(KeysetPagination):
+    """Home timeline: newest first over {'created_at', 'post_id'} rows"""
+    ordering = ('-created_at', '-post_id')
+
+
+class TagFeedCursorPagination(TimelineCursorPagination):
+    """Tag feeds: newest first over PostTag {'created_at', 'post_id'} rows"""
+
+
+class SearchCursorPagination(KeysetPagination):
+    """Search results: best score first, newest first among equal scores"""
+    ordering = ('-score', '-created_at', '-post_id')
+    page_size = 20
+
+
+class UserSearchCursorPagination(KeysetPagination):
+    """User search results: best score first"""
+    ordering = ('-score', '-user_id')
+    page_size = 20
+
+
+class UserDirectoryCursorPagination(KeysetPagination):
+    """User directory: newest accounts first, 20 compact cards per page"""
+    ordering = ('-created_at', '-id')
+    page_size = 20
+    page_size_query_param = 'limit'  # The directory has always taken ?limit=
+
+
+class UserPrefixCursorPagination(UserDirectoryCursorPagination):
+    """User directory search: alphabetical by the matched username or name"""
+    ordering = ('match_key', 'id')
+
+
+class CommentCursorPagination(KeysetPagination):
+    """Comment threads: the pinned comment first, then newest first"""
+    ordering = ('-pinned', '-created_at', '-id')
+    page_size = 20
@@ -0,0 +1,111 @@
+"""
+Server-side response cache for the anonymous share endpoints
+
+Cached responses record the current token of every post/user they were
+built from. Invalidating a post or user just replaces its token, so stale
+entries stop matching without having to find and delete them. That keeps
+invalidation O(1) on any Django cache backend (local memory, file, ...)
+and makes an evicted token look like a change rather than serving stale data.
+
+Invalidations run on transaction commit, so a reader can never pair a new
+token with data from before the change.
+"""
+import hashlib
+import uuid
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+
+HITS_KEY = 'public:stats:hits'
+MISSES_KEY = 'public:stats:misses'
+
+
+def _cache():
+    return caches[settings.PUBLIC_CACHE_ALIAS]
+
+
+def post_dependency(post_id):
+    return f'public:post:{post_id}:token'
+
+
+def user_dependency(user_id):
+    return f'public:user:{user_id}:token'
+
+
+def post_detail_key(post_id):
+    return f'public:post:{post_id}:detail'
+
+
+def user_posts_key(user_id, query_string):
+    # Cursor and page size are part of the page; hash them into a backend-safe key
+    digest = hashlib.sha1(query_string.encode('utf-8')).hexdigest()
+    return f'public:user:{user_id}:posts:{digest}'
+
+
+def lookup(key):
+    """Return the cached data for `key`, or None if missing or any dependency changed"""
+    cache = _cache()
+    entry = cache.get(key)
+    if entry is not None and cache.get_many(list(entry['deps'])) == entry['deps']:
+        _count(HITS_KEY)
+        return entry['data']
+    _count(MISSES_KEY)
+    return None
+
+
+def snapshot(*dependencies):
+    """
+    Current tokens for `dependencies`, creating missing ones
+
+    Take the snapshot before building the response so a change that lands
+    while it is being built invalidates the entry we are about to store.
+    """
+    cache = _cache()
+    tokens = cache.get_many(dependencies)
+    missing = {dependency: uuid.uuid4().hex for dependency in dependencies if dependency not in tokens}
+    for dependency, token in missing.items():
+        cache.add(dependency, token, timeout=None)
+    if missing:
+        tokens.update(cache.get_many(list(missing)))
+    return tokens
+
+
+def store(key, data, tokens):
+    _cache().set(key, {'deps': tokens, 'data': data}, timeout=settings.PUBLIC_CACHE_TIMEOUT)
+
+
+def _invalidate(dependencies):
+    def replace_tokens():
+        _cache().set_many({dependency: uuid.uuid4().hex for dependency in dependencies}, timeout=None)
+    transaction.on_commit(replace_tokens)
+
+
+def invalidate_post(post_id, user_id):
+    """A post changed: drop its detail page and its author's post listings"""
+    _invalidate([post_dependency(post_id), user_dependency(user_id)])
+
+
+def invalidate_user(*user_ids):
+    """These profiles changed: drop everything that embeds or lists them"""
+    _invalidate([user_dependency(user_id) for user_id in user_ids])
+
+
+def _count(key):
+    cache = _cache()
+    try:
+        cache.incr(key)
+    except ValueError:
+        if not cache.add(key, 1, timeout=None):
+            cache.incr(key)
+
+
+def stats():
+    counts = _cache().get_many([HITS_KEY, MISSES_KEY])
+    hits, misses = counts.get(HITS_KEY, 0), counts.get(MISSES_KEY, 0)
+    total = hits + misses
+    return {
+        'hits': hits,
+        'misses': misses,
+        'hit_rate': round(hits / total, 4) if total else None,
+    }
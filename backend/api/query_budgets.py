@@ -0,0 +1,68 @@
+"""
+Query budgets for the endpoint benchmark
+
+The most SQL queries each benchmark case may run per request (see
+`manage.py benchmark_endpoints`). Every route in api/urls.py has at least one
+case. A budget going up means a change added queries to that endpoint:
+raise it only on purpose, in the same commit, and say why.
+
+Counts were measured on a `seed_dataset` database. The home timeline reads
+one extra query per followed account above FEED_FANOUT_MAX_FOLLOWERS, which
+the seeded viewer has none of. They include loading the viewer on a cold
+authentication cache (api/authentication.py), which warm requests skip.
+"""
+
+QUERY_BUDGETS = {
+    # Auth
+    'user-registration POST': 6,
+    'login POST': 1,
+    'current-user GET': 1,
+    'current-user PATCH': 4,
+    'liked-posts GET': 4,
+    'user-list GET': 2,
+    'user-list GET search': 3,
+    'user-autocomplete GET': 3,
+    'user-detail GET': 3,
+    'toggle-user-privacy PATCH': 4,
+    'forgot-password POST': 5,
+    'reset-password POST': 4,
+
+    # Posts
+    'post-list GET': 6,
+    'post-list POST': 14,
+    'recent-posts GET': 4,
+    'post-detail GET': 4,
+    'post-detail PATCH': 9,
+    'post-detail DELETE': 12,
+    'public-post-detail GET': 2,
+    'like-post POST': 5,
+    'comment-list GET': 3,
+    'comment-list POST': 4,
+
+    # Users
+    'user-posts GET': 4,
+    'public-user-posts GET': 1,
+    'follow-user POST': 7,
+
+    # Tags and search
+    'tag-autocomplete GET': 2,
+    'tag-posts GET': 5,
+    'search-posts GET': 4,
+    'search-users GET': 2,
+
+    # Comments
+    'comment-detail GET': 2,
+    'comment-detail PATCH': 4,
+    'comment-detail DELETE': 4,
+    'comment-pin POST': 7,
+
+    # Saved posts
+    'saved-post-list GET': 2,
+    'saved-post-list POST': 3,
+    'saved-state GET': 2,
+    'saved-post-detail DELETE': 3,
+
+    # Operations
+    'public-cache-stats GET': 1,
+    'metrics GET': 0,
+}
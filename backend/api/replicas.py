@@ -0,0 +1,209 @@
+"""
+Read replica routing with read-your-writes
+
+With DATABASE_REPLICAS configured, ReplicaRouter sends the reads of GET,
+HEAD and OPTIONS requests to one replica, picked at random per request, and
+everything else to the primary ('default'): writes, reads inside a
+transaction or after the request has written, and all background workers
+and management commands (they run outside a request).
+
+Replicas lag behind the primary, so a user who just liked, commented or
+posted could reload and not see it. ReplicaMiddleware pins a user to the
+primary for REPLICA_PIN_SECONDS after any request of theirs that wrote. Pins
+live in the default cache keyed by user id, so every process serving the
+API has to share that cache (CACHE_BACKEND=file on one host). With a
+per-process cache (locmem, dummy) a pin would be missed by the other
+processes, so reads stay on the primary and `manage.py check` warns.
+
+A replica that can't be reached is skipped for REPLICA_RETRY_SECONDS and its
+requests read from the primary instead.
+
+Any aliases in DATABASES can act as replicas, so the routing can be tried
+without MySQL: add SQLite aliases pointing at copies of the primary's file
+and list them in DATABASE_REPLICAS.
+"""
+import random
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+
+from django.conf import settings
+from django.core import checks
+from django.core.cache import cache
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import DEFAULT_DB_ALIAS, DatabaseError, connections
+from rest_framework.permissions import SAFE_METHODS
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import InvalidToken
+from rest_framework_simplejwt.settings import api_settings as jwt_settings
+
+REPLICA_RETRY_SECONDS = 30
+
+# Cache backends whose entries other processes can't see
+PER_PROCESS_BACKENDS = (
+    'django.core.cache.backends.locmem.LocMemCache',
+    'django.core.cache.backends.dummy.DummyCache',
+)
+
+_current = ContextVar('database_routing', default=None)
+_unavailable = {}  # Replica alias -> time.monotonic() until which it is skipped
+
+
+class RequestRouting:
+    def __init__(self, request):
+        self.request = request
+        self.alias = None       # Database for this request's reads, picked on the first one
+        self.wrote = False
+        self.primary_only = 0   # Depth of use_primary() blocks
+
+
+def cache_is_shared():
+    return settings.CACHES['default']['BACKEND'] not in PER_PROCESS_BACKENDS
+
+
+def routing_enabled():
+    """Whether reads may go to replicas: some are configured and every process sees the same pins"""
+    return bool(settings.DATABASE_REPLICAS) and cache_is_shared()
+
+
+@checks.register(checks.Tags.database)
+def check_pin_cache(app_configs, **kwargs):
+    if settings.DATABASE_REPLICAS and not cache_is_shared():
+        return [checks.Warning(
+            'DATABASE_REPLICAS is set but the default cache is per-process, so reads stay on the primary.',
+            hint='Read-your-writes pins must be visible to every process; set CACHE_BACKEND=file.',
+            id='api.W001',
+        )]
+    return []
+
+
+def pin_key(user_id):
+    return f'replicas:pin:{user_id}'
+
+
+def pin_to_primary(user_id):
+    """Read `user_id`'s requests from the primary until the replicas have caught up with their writes"""
+    if routing_enabled():
+        cache.set(pin_key(user_id), True, settings.REPLICA_PIN_SECONDS)
+
+
+@contextmanager
+def use_primary():
+    """Send the reads of the enclosed block to the primary"""
+    routing = _current.get()
+    if routing is None:
+        yield
+        return
+    routing.primary_only += 1
+    try:
+        yield
+    finally:
+        routing.primary_only -= 1
+
+
+def request_user_id(request):
+    """The user id in the request's JWT, without a database lookup (None if there is no valid token)"""
+    authentication = JWTAuthentication()
+    header = authentication.get_header(request)
+    raw_token = header and authentication.get_raw_token(header)
+    if not raw_token:
+        return None
+    try:
+        return authentication.get_validated_token(raw_token)[jwt_settings.USER_ID_CLAIM]
+    except (InvalidToken, KeyError):
+        return None
+
+
+def pick_database(request):
+    """A reachable replica for `request`'s reads, or the primary if it must see its user's writes"""
+    if request.method not in SAFE_METHODS:
+        return DEFAULT_DB_ALIAS
+    # Session users (the admin) can't be identified without a query; keep them on the primary
+    if settings.SESSION_COOKIE_NAME in request.COOKIES:
+        return DEFAULT_DB_ALIAS
+    user_id = request_user_id(request)
+    if user_id is not None and cache.get(pin_key(user_id)):
+        return DEFAULT_DB_ALIAS
+
+    now = time.monotonic()
+    replicas = [alias for alias in settings.DATABASE_REPLICAS if _unavailable.get(alias, 0) <= now]
+    random.shuffle(replicas)
+    for alias in replicas:
+        connection = connections[alias]
+        try:
+            connection.close_if_health_check_failed()
+            connection.ensure_connection()
+        except DatabaseError:
+            _unavailable[alias] = now + REPLICA_RETRY_SECONDS
+            continue
+        return alias
+    return DEFAULT_DB_ALIAS
+
+
+class ReplicaRouter:
+    """Route reads to the replica picked for the current request and everything else to the primary"""
+
+    def db_for_read(self, model, **hints):
+        routing = _current.get()
+        if routing is None or routing.wrote or routing.primary_only:
+            return DEFAULT_DB_ALIAS
+        if connections[DEFAULT_DB_ALIAS].in_atomic_block:
+            return DEFAULT_DB_ALIAS  # Reads in a transaction must see its writes and locks
+        if routing.alias is None:
+            routing.alias = pick_database(routing.request)
+        return routing.alias
+
+    def db_for_write(self, model, **hints):
+        routing = _current.get()
+        if routing is not None:
+            routing.wrote = True
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        return True  # Replicas hold the same rows as the primary
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db == DEFAULT_DB_ALIAS  # Replicas get schema changes through replication
+
+
+class ReplicaMiddleware:
+    """Track the database routing of each request and pin users who wrote to the primary"""
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not routing_enabled():
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.is_async = iscoroutinefunction(get_response)
+        if self.is_async:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.is_async:
+            return self.__acall__(request)
+        routing = RequestRouting(request)
+        token = _current.set(routing)
+        try:
+            response = self.get_response(request)
+        finally:
+            _current.reset(token)
+        return self.finish(request, response, routing)
+
+    async def __acall__(self, request):
+        routing = RequestRouting(request)
+        token = _current.set(routing)
+        try:
+            response = await self.get_response(request)
+        finally:
+            _current.reset(token)
+        return self.finish(request, response, routing)
+
+    def finish(self, request, response, routing):
+        if routing.wrote:
+            user_id = request_user_id(request)
+            if user_id is not None:
+                pin_to_primary(user_id)
+        return response
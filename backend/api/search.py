@@ -0,0 +1,77 @@
+"""
+Tokenizers for the full-text search index and the hashtag index, plus the
+prefix helpers behind user typeahead
+
+Posts and users are indexed as (term, weight) postings in PostSearchTerm and
+UserSearchTerm. A term's weight is the sum of the weights of the fields it
+appears in, counted once per occurrence, so a tag match outranks a passing
+mention in a caption. Post.tags is parsed separately into Tag names.
+"""
+import re
+from collections import Counter
+
+TOKEN_RE = re.compile(r'\w+', re.UNICODE)
+TAG_SPLIT_RE = re.compile(r'[\s,]+')
+MAX_TAG_LENGTH = 64
+MAX_TAGS_PER_POST = 30
+MIN_TERM_LENGTH = 2
+MAX_TERM_LENGTH = 64
+MAX_QUERY_TERMS = 10
+MAX_TERM_WEIGHT = 100
+MAX_PREFIX_LENGTH = 150
+
+STOP_WORDS = frozenset({
+    'a', 'an', 'and', 'are', 'as', 'at', 'be', 'by', 'for', 'from', 'in', 'is', 'it',
+    'of', 'on', 'or', 'that', 'the', 'this', 'to', 'was', 'with',
+})
+
+POST_FIELD_WEIGHTS = {'tags': 3, 'location': 2, 'caption': 1}
+USER_FIELD_WEIGHTS = {'username': 4, 'name': 3, 'location': 1, 'bio': 1}
+
+
+def tokenize(text):
+    """Lowercased word tokens of `text` (hashtags lose their '#'), minus stop words"""
+    terms = []
+    for token in TOKEN_RE.findall((text or '').lower()):
+        token = token.strip('_')[:MAX_TERM_LENGTH]
+        if len(token) >= MIN_TERM_LENGTH and token not in STOP_WORDS:
+            terms.append(token)
+    return terms
+
+
+def weighted_terms(instance, field_weights):
+    """{term: weight} for the indexed fields of `instance`"""
+    weights = Counter()
+    for field, weight in field_weights.items():
+        for term in tokenize(getattr(instance, field)):
+            weights[term] += weight
+    return {term: min(weight, MAX_TERM_WEIGHT) for term, weight in weights.items()}
+
+
+def query_terms(query):
+    """Distinct terms of a search query, in order, capped at MAX_QUERY_TERMS"""
+    return list(dict.fromkeys(tokenize(query)))[:MAX_QUERY_TERMS]
+
+
+def normalize_prefix(query):
+    """Typeahead prefix: lowercased, trimmed and without a leading '@'"""
+    return (query or '').strip().lstrip('@').lower()[:MAX_PREFIX_LENGTH]
+
+
+def prefix_range(prefix):
+    """(low, high) such that low <= s < high holds exactly for strings s starting with `prefix`"""
+    prefix = prefix.rstrip(chr(0x10ffff))  # Has no successor; the shorter prefix is a superset
+    if not prefix:
+        return '', chr(0x10ffff)
+    return prefix, prefix[:-1] + chr(ord(prefix[-1]) + 1)
+
+
+def normalize_tag(tag):
+    """Canonical tag name: lowercase word characters without the leading '#', or ''"""
+    return ''.join(TOKEN_RE.findall(tag.lower()))[:MAX_TAG_LENGTH]
+
+
+def parse_tags(tags):
+    """Distinct tag names in a free-form Post.tags string ("#sunset, beach #goa")"""
+    names = (normalize_tag(tag) for tag in TAG_SPLIT_RE.split(tags or ''))
+    return list(dict.fromkeys(name for name in names if name))[:MAX_TAGS_PER_POST]
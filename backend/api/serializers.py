@@ -1,7 +1,84 @@
 from rest_framework import serializers
 from django.contrib.auth import authenticate
 from django.contrib.auth.password_validation import validate_password
-from .models import User, Post, Comment, SavedPost
+from django.db.models import Value, CharField
+from .models import User, Post, Comment, SavedPost, Like
+
+
+def resolve_viewer_state(user, post_ids):
+    """
+    Resolve which of `post_ids` the viewer has liked and saved in one query.
+    
+    Returns a dict with the resolved `post_ids`, plus `liked` and `saved`
+    sets of post ids.
+    """
+    state = {'post_ids': set(post_ids), 'liked': set(), 'saved': set()}
+    if not post_ids or not user or not user.is_authenticated:
+        return state
+    for post_id, kind in viewer_state_query(user, post_ids):
+        state[kind].add(post_id)
+    return state
+
+
+async def aresolve_viewer_state(user, post_ids):
+    """resolve_viewer_state through the async ORM"""
+    state = {'post_ids': set(post_ids), 'liked': set(), 'saved': set()}
+    if not post_ids or not user or not user.is_authenticated:
+        return state
+    async for post_id, kind in viewer_state_query(user, post_ids):
+        state[kind].add(post_id)
+    return state
+
+
+def viewer_state_query(user, post_ids):
+    """(post_id, 'liked' or 'saved') rows for the viewer's likes and saves among `post_ids`"""
+    likes = (Like.objects
+             .filter(user_id=user.id, post_id__in=post_ids).order_by()
+             .annotate(kind=Value('liked', output_field=CharField()))
+             .values_list('post_id', 'kind'))
+    saves = (SavedPost.objects
+             .filter(user_id=user.id, post_id__in=post_ids).order_by()
+             .annotate(kind=Value('saved', output_field=CharField()))
+             .values_list('post_id', 'kind'))
+    return likes.union(saves, all=True)
+
+
+class ViewerStateListSerializer(serializers.ListSerializer):
+    """
+    List serializer that resolves the viewer's like/save state for the
+    whole page up front, so per-post fields read from memory instead of
+    issuing one query per row. Async views pass the state already resolved
+    (aresolve_viewer_state) as context['viewer_state'].
+    """
+
+    def to_representation(self, data):
+        items = list(data.all() if hasattr(data, 'all') else data)
+        post_ids = [item.pk for item in items]
+        state = self.context.get('viewer_state')
+        if state is None or not state['post_ids'].issuperset(post_ids):
+            request = self.context.get('request')
+            self.context['viewer_state'] = resolve_viewer_state(getattr(request, 'user', None), post_ids)
+        return super().to_representation(items)
+
+
+class ViewerStateMixin:
+    """is_liked / is_saved lookups backed by ViewerStateListSerializer"""
+
+    def _viewer_state(self, obj):
+        state = self.context.setdefault('viewer_state', {'post_ids': set(), 'liked': set(), 'saved': set()})
+        if obj.pk not in state['post_ids']:
+            # Serialized on its own (e.g. a detail view): resolve just this post
+            request = self.context.get('request')
+            resolved = resolve_viewer_state(getattr(request, 'user', None), [obj.pk])
+            for key in state:
+                state[key] |= resolved[key]
+        return state
+
+    def get_is_liked(self, obj):
+        return obj.pk in self._viewer_state(obj)['liked']
+
+    def get_is_saved(self, obj):
+        return obj.pk in self._viewer_state(obj)['saved']
 
 
 class UserRegistrationSerializer(serializers.ModelSerializer):
@@ -25,14 +102,36 @@ class UserRegistrationSerializer(serializers.ModelSerializer):
 
 
 class UserSerializer(serializers.ModelSerializer):
-    """Serializer for user data"""
+    """
+    Serializer for user data
+    
+    The embedded `posts` list is expensive and only included when the view
+    passes `expand=posts`; profile posts are normally read from the
+    paginated /users/<id>/posts/ endpoint instead.
+    """
     imageUrl = serializers.ReadOnlyField()
     posts = serializers.SerializerMethodField()
 
     class Meta:
         model = User
-        fields = ('id', 'username', 'email', 'name', 'bio', 'location', 'imageUrl', 'is_private', 'posts', 'created_at')
-        read_only_fields = ('id', 'created_at')
+        fields = ('id', 'username', 'email', 'name', 'bio', 'location', 'imageUrl', 'image_status', 'is_private',
+                  'followers_count', 'following_count', 'posts', 'created_at')
+        read_only_fields = ('id', 'followers_count', 'following_count', 'created_at')
+
+    def get_fields(self):
+        fields = super().get_fields()
+        if 'posts' not in self.context.get('expand', ()):
+            fields.pop('posts')
+        return fields
+
+    def to_representation(self, instance):
+        data = super().to_representation(instance)
+        # Views that annotate a post count (e.g. profile detail) expose it
+        if hasattr(instance, 'posts_count'):
+            data['posts_count'] = instance.posts_count
+        if hasattr(instance, 'is_following'):
+            data['is_following'] = instance.is_following
+        return data
 
     def get_posts(self, obj):
         # Get user's posts and serialize them with minimal data to avoid circular reference
@@ -49,17 +148,28 @@ class UserSerializer(serializers.ModelSerializer):
             {
                 'id': post.id,
                 'caption': post.caption,
-                'imageUrl': post.imageUrl,
+                'imageUrl': post.mediumImageUrl,
+                'thumbnailUrl': post.thumbnailUrl,
                 'location': post.location,
                 'tags': post.tags,
-                'likes_count': post.likes_count,
-                'comments_count': post.comments.count(),
+                'likes_count': post.like_count,
+                'comments_count': post.comment_count,
                 'created_at': post.created_at,
             }
             for post in posts
         ]
 
 
+class UserSummarySerializer(serializers.ModelSerializer):
+    """Compact author representation for comments and other nested lists"""
+    imageUrl = serializers.ReadOnlyField()
+
+    class Meta:
+        model = User
+        fields = ('id', 'username', 'name', 'imageUrl')
+        read_only_fields = fields
+
+
 class UserUpdateSerializer(serializers.ModelSerializer):
     """Serializer for updating user profile"""
     imageUrl = serializers.ReadOnlyField()
@@ -67,43 +177,46 @@ class UserUpdateSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = User
-        fields = ('name', 'bio', 'location', 'image', 'imageUrl', 'is_private')
+        fields = ('name', 'bio', 'location', 'image', 'imageUrl', 'image_status', 'is_private')
+        read_only_fields = ('image_status',)
 
     def update(self, instance, validated_data):
         instance.name = validated_data.get('name', instance.name)
         instance.bio = validated_data.get('bio', instance.bio)
         instance.location = validated_data.get('location', instance.location)
         instance.is_private = validated_data.get('is_private', instance.is_private)
+        # The instance is request.user, possibly from the auth cache: save only these columns
+        update_fields = ['name', 'bio', 'location', 'is_private', 'updated_at']
         if 'image' in validated_data:
             # Store the image file temporarily for processing in save method
             instance._image_file = validated_data['image']
-        instance.save()
+            update_fields.append('image_status')
+        instance.save(update_fields=update_fields)
         return instance
 
 
-class PostSerializer(serializers.ModelSerializer):
+class PostSerializer(ViewerStateMixin, serializers.ModelSerializer):
     """Serializer for posts"""
-    user = UserSerializer(read_only=True)
+    user = UserSummarySerializer(read_only=True)  # Public pages serve this to anyone; no email or profile stats
     imageUrl = serializers.ReadOnlyField()
-    likes_count = serializers.ReadOnlyField()
+    thumbnailUrl = serializers.ReadOnlyField()
+    renditions = serializers.ReadOnlyField(source='image_renditions')
+    likes_count = serializers.IntegerField(source='like_count', read_only=True)
     is_liked = serializers.SerializerMethodField()
+    is_saved = serializers.SerializerMethodField()
     comments_count = serializers.SerializerMethodField()
     is_edited = serializers.SerializerMethodField()
 
     class Meta:
         model = Post
-        fields = ('id', 'user', 'caption', 'imageUrl', 'location', 'tags', 'is_private',
-                 'likes_count', 'is_liked', 'comments_count', 'is_edited', 'created_at', 'updated_at')
+        fields = ('id', 'user', 'caption', 'imageUrl', 'thumbnailUrl', 'renditions', 'image_status', 'location', 'tags',
+                 'is_private', 'likes_count', 'is_liked', 'is_saved', 'comments_count', 'is_edited',
+                 'created_at', 'updated_at')
         read_only_fields = ('id', 'created_at', 'updated_at')
-
-    def get_is_liked(self, obj):
-        request = self.context.get('request')
-        if request and request.user.is_authenticated:
-            return obj.likes.filter(id=request.user.id).exists()
-        return False
+        list_serializer_class = ViewerStateListSerializer
 
     def get_comments_count(self, obj):
-        return obj.comments.count()
+        return obj.comment_count
 
     def get_is_edited(self, obj):
         """Check if post has been edited"""
@@ -111,20 +224,23 @@ class PostSerializer(serializers.ModelSerializer):
         return time_diff.total_seconds() > 1  # More than 1 second difference
 
 
-class PostListSerializer(serializers.ModelSerializer):
-    """Lightweight serializer for post lists"""
+class PostListSerializer(ViewerStateMixin, serializers.ModelSerializer):
+    """Lightweight serializer for post lists (serves the medium rendition, not the full image)"""
     user = serializers.SerializerMethodField()
-    imageUrl = serializers.ReadOnlyField()
-    likes_count = serializers.ReadOnlyField()
+    imageUrl = serializers.ReadOnlyField(source='mediumImageUrl')
+    thumbnailUrl = serializers.ReadOnlyField()
+    likes_count = serializers.IntegerField(source='like_count', read_only=True)
     is_liked = serializers.SerializerMethodField()
+    is_saved = serializers.SerializerMethodField()
     comments_count = serializers.SerializerMethodField()
     is_edited = serializers.SerializerMethodField()
 
     class Meta:
         model = Post
-        fields = ('id', 'user', 'caption', 'imageUrl', 'location', 'tags', 'is_private',
-                 'likes_count', 'is_liked', 'comments_count', 'is_edited', 'created_at', 'updated_at')
+        fields = ('id', 'user', 'caption', 'imageUrl', 'thumbnailUrl', 'image_status', 'location', 'tags', 'is_private',
+                 'likes_count', 'is_liked', 'is_saved', 'comments_count', 'is_edited', 'created_at', 'updated_at')
         read_only_fields = ('id', 'created_at', 'updated_at')
+        list_serializer_class = ViewerStateListSerializer
 
     def get_user(self, obj):
         """Return lightweight user data"""
@@ -135,14 +251,8 @@ class PostListSerializer(serializers.ModelSerializer):
             'imageUrl': obj.user.imageUrl,
         }
 
-    def get_is_liked(self, obj):
-        request = self.context.get('request')
-        if request and request.user.is_authenticated:
-            return obj.likes.filter(id=request.user.id).exists()
-        return False
-
     def get_comments_count(self, obj):
-        return obj.comments.count()
+        return obj.comment_count
 
     def get_is_edited(self, obj):
         """Check if post has been edited"""
@@ -156,7 +266,8 @@ class PostCreateSerializer(serializers.ModelSerializer):
     
     class Meta:
         model = Post
-        fields = ('caption', 'image', 'location', 'tags', 'is_private')
+        fields = ('caption', 'image', 'image_status', 'location', 'tags', 'is_private')
+        read_only_fields = ('image_status',)
 
     def create(self, validated_data):
         validated_data['user'] = self.context['request'].user
@@ -165,8 +276,8 @@ class PostCreateSerializer(serializers.ModelSerializer):
             image_file = validated_data.pop('image')
             post = super().create(validated_data)
             post._image_file = image_file
-            # Save without updating the updated_at field for image processing
-            post.save(update_fields=['image_path'])
+            # Queue the upload without updating the updated_at field
+            post.save(update_fields=['image_status'])
             return post
         return super().create(validated_data)
 
@@ -177,7 +288,8 @@ class PostUpdateSerializer(serializers.ModelSerializer):
     
     class Meta:
         model = Post
-        fields = ('caption', 'image', 'location', 'tags', 'is_private')
+        fields = ('caption', 'image', 'image_status', 'location', 'tags', 'is_private')
+        read_only_fields = ('image_status',)
 
     def update(self, instance, validated_data):
         # Store the image file temporarily for processing in save method
@@ -185,15 +297,15 @@ class PostUpdateSerializer(serializers.ModelSerializer):
             instance._image_file = validated_data.pop('image')
             # Update other fields first
             instance = super().update(instance, validated_data)
-            # Save image without updating updated_at field
-            instance.save(update_fields=['image_path'])
+            # Queue the upload without updating updated_at field
+            instance.save(update_fields=['image_status'])
             return instance
         return super().update(instance, validated_data)
 
 
 class CommentSerializer(serializers.ModelSerializer):
     """Serializer for comments"""
-    user = UserSerializer(read_only=True)
+    user = UserSummarySerializer(read_only=True)
     is_edited = serializers.SerializerMethodField()
 
     class Meta:
@@ -228,7 +340,8 @@ class SavedPostSerializer(serializers.ModelSerializer):
         return {
             'id': post.id,
             'caption': post.caption,
-            'imageUrl': post.imageUrl,
+            'imageUrl': post.mediumImageUrl,
+            'thumbnailUrl': post.thumbnailUrl,
             'location': post.location,
             'tags': post.tags,
             'created_at': post.created_at,
@@ -251,7 +364,8 @@ class SavedPostCreateSerializer(serializers.ModelSerializer):
     
     class Meta:
         model = SavedPost
-        fields = ('post',)
+        fields = ('id', 'post')
+        read_only_fields = ('id',)
 
     def create(self, validated_data):
         validated_data['user'] = self.context['request'].user
@@ -0,0 +1,82 @@
+"""
+In-memory prefix index for hashtag autocomplete
+
+Each process keeps every tag name in one sorted list with a parallel list of
+post counts, so a prefix lookup is two binary searches plus a top-N pick over
+the matching slice and never touches the database. The index is loaded once
+and then refreshed incrementally: at most every TAG_INDEX_REFRESH_SECONDS a
+lookup pulls only the tags whose updated_at moved since the last refresh.
+
+Refreshes apply changes to copies of the two lists and publish them together
+as one tuple, so lookups read a consistent pair without taking the lock.
+"""
+import heapq
+import threading
+import time
+from datetime import timedelta
+from bisect import bisect_left
+
+from django.conf import settings
+from django.utils import timezone
+
+from .models import Tag
+
+# Prefix upper bound: sorts after any name starting with the prefix
+_PREFIX_END = '\U0010ffff'
+
+# Re-read rows this far behind the high-water mark: a transaction may commit
+# after our read with an updated_at stamped before it. Re-reads are harmless.
+_COMMIT_GRACE = timedelta(seconds=60)
+
+
+class TagIndex:
+    def __init__(self):
+        self.entries = ([], [])  # (sorted tag names, post_count for names[i]), replaced as a whole
+        self.synced_at = None  # updated_at high-water mark of the last refresh
+        self.checked_at = 0.0  # time.monotonic() of the last refresh
+        self.lock = threading.Lock()
+
+    def refresh(self, force=False):
+        """Load tags changed since the last refresh (everything on first use)"""
+        if not force and time.monotonic() - self.checked_at < settings.TAG_INDEX_REFRESH_SECONDS:
+            return
+        with self.lock:
+            if not force and time.monotonic() - self.checked_at < settings.TAG_INDEX_REFRESH_SECONDS:
+                return  # Another thread refreshed while we waited
+            started = timezone.now()
+            changed = Tag.objects.order_by()
+            if self.synced_at is not None:
+                changed = changed.filter(updated_at__gte=self.synced_at)
+            rows = list(changed.values_list('name', 'post_count'))
+            if rows:
+                names, counts = list(self.entries[0]), list(self.entries[1])
+                for name, count in rows:
+                    self._upsert(names, counts, name, count)
+                self.entries = (names, counts)
+            self.synced_at = started - _COMMIT_GRACE
+            self.checked_at = time.monotonic()
+
+    @staticmethod
+    def _upsert(names, counts, name, count):
+        i = bisect_left(names, name)
+        if i < len(names) and names[i] == name:
+            counts[i] = count
+        else:
+            names.insert(i, name)
+            counts.insert(i, count)
+
+    def suggest(self, prefix, limit=10):
+        """Up to `limit` (name, post_count) pairs starting with `prefix`, most used first"""
+        self.refresh()
+        names, counts = self.entries  # One read: a concurrent refresh publishes a new pair
+        start = bisect_left(names, prefix)
+        end = bisect_left(names, prefix + _PREFIX_END, lo=start)
+        best = heapq.nlargest(
+            limit,
+            (i for i in range(start, end) if counts[i] > 0),
+            key=lambda i: (counts[i], -i),
+        )
+        return [(names[i], counts[i]) for i in best]
+
+
+tag_index = TagIndex()
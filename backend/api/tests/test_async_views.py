@@ -0,0 +1,99 @@
+from asgiref.sync import async_to_sync, sync_to_async
+from urllib.parse import urlsplit
+
+from django.conf import settings
+from django.db import connection
+from django.test import RequestFactory, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import include, path, resolve
+from rest_framework_simplejwt.tokens import AccessToken
+
+from api import views, async_views
+from api.async_views import read_async
+from api.models import User, Post, Comment
+
+# This module doubles as the URLconf for the async requests: urls.py picks sync or async views on
+# import, so the async ones are wired up here with ASYNC_READ_VIEWS on, ahead of the same URLs
+with override_settings(ASYNC_READ_VIEWS=True):
+    urlpatterns = [
+        path('api/posts/', read_async(async_views.home_feed, views.PostListView.as_view())),
+        path('api/posts/<int:id>/', read_async(async_views.post_detail, views.PostDetailView.as_view())),
+        path('api/posts/<int:post_id>/comments/', read_async(async_views.comments, views.CommentListView.as_view())),
+        path('api/users/<int:user_id>/posts/', read_async(async_views.user_posts, views.UserPostsView.as_view())),
+    ]
+urlpatterns.append(path('api/', include('api.urls')))  # Imported with the setting off, so these are DRF views
+
+class AsyncReadViewTests(TestCase):
+    """The coroutine views answer GET exactly like the DRF views and pass everything else to them"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.viewer = User.objects.create_user(email='viewer@example.com', username='viewer', password='password123')
+        cls.other = User.objects.create_user(email='other@example.com', username='other', password='password123')
+        cls.viewer.toggle_follow(cls.other)
+        cls.posts = [Post.objects.create(user=cls.other, caption=f'Post {n}', tags='#travel') for n in range(3)]
+        cls.posts.append(Post.objects.create(user=cls.viewer, caption='Mine'))
+        Post.objects.create(user=cls.other, caption='Hidden', is_private=True)
+        cls.posts[0].toggle_like(cls.viewer)
+        Comment.objects.create(post=cls.posts[0], user=cls.other, content='First')
+        Comment.objects.create(post=cls.posts[0], user=cls.viewer, content='Pinned', pinned=True)
+        Comment.objects.create(post=cls.posts[0], user=cls.viewer, content='Last')
+
+    def setUp(self):
+        self.headers = {'Authorization': f'Bearer {AccessToken.for_user(self.viewer)}'}
+
+    def paths(self):
+        return [
+            '/api/posts/?page_size=2',
+            f'/api/posts/{self.posts[0].pk}/',
+            f'/api/posts/{self.posts[0].pk}/comments/?page_size=2',
+            f'/api/users/{self.other.pk}/posts/?page_size=2',
+            f'/api/users/{self.viewer.pk}/posts/',
+        ]
+
+    def drf_response(self, path):
+        """The response of the DRF view the project URLconf routes `path` to"""
+        match = resolve(urlsplit(path).path, urlconf=settings.ROOT_URLCONF)
+        response = match.func(RequestFactory().get(path, headers=self.headers), *match.args, **match.kwargs)
+        return response.render()
+
+    async def async_request(self, method, path, headers=None, **kwargs):
+        with override_settings(ROOT_URLCONF=__name__):
+            return await getattr(self.async_client, method)(path, headers={**self.headers, **(headers or {})}, **kwargs)
+
+    async def test_same_body_and_etag_as_drf_view(self):
+        for fast in (True, False):
+            for path in self.paths():
+                with self.subTest(path=path, fast=fast), override_settings(FAST_LIST_SERIALIZATION=fast):
+                    expected = await sync_to_async(self.drf_response)(path)
+                    response = await self.async_request('get', path)
+                    self.assertEqual(response.status_code, 200)
+                    self.assertEqual(response.content, expected.content)
+                    self.assertEqual(response['ETag'], expected['ETag'])
+
+    def test_not_modified_skips_the_body(self):
+        async_request = async_to_sync(self.async_request)  # Queries are only captured outside the event loop
+        for path in self.paths():
+            with self.subTest(path=path):
+                with CaptureQueriesContext(connection) as full:
+                    etag = async_request('get', path)['ETag']
+                with CaptureQueriesContext(connection) as validators:
+                    response = async_request('get', path, headers={'If-None-Match': etag})
+                self.assertEqual(response.status_code, 304)
+                self.assertLess(len(validators), len(full))
+
+    async def test_hidden_post_is_not_found(self):
+        hidden = await Post.objects.aget(caption='Hidden')
+        response = await self.async_request('get', f'/api/posts/{hidden.pk}/')
+        self.assertEqual(response.status_code, 404)
+
+    async def test_writes_fall_through_to_drf_view(self):
+        response = await self.async_request('post', f'/api/posts/{self.posts[0].pk}/comments/',
+                                            data={'content': 'From async'}, content_type='application/json')
+        self.assertEqual(response.status_code, 201)
+        self.assertTrue(await Comment.objects.filter(content='From async').aexists())
+
+        response = await self.async_request('patch', f'/api/posts/{self.posts[3].pk}/',
+                                            data={'caption': 'Edited'}, content_type='application/json')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual((await Post.objects.aget(pk=self.posts[3].pk)).caption, 'Edited')
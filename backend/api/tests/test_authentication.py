@@ -0,0 +1,54 @@
+import pickle
+import tempfile
+
+from django.core.cache import cache
+from django.test import override_settings
+from rest_framework.test import APITestCase
+from rest_framework_simplejwt.tokens import AccessToken
+
+from api.authentication import current_version, user_key
+from api.models import User
+
+
+class CachedUserTests(APITestCase):
+    """A deactivated user is rejected on their next request, cached or not"""
+
+    def setUp(self):
+        self.user = User.objects.create_user(email='user@example.com', username='user', password='password123')
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {AccessToken.for_user(self.user)}')
+
+    def me(self):
+        return self.client.get('/api/auth/me/')
+
+    def deactivate(self):
+        self.user.is_active = False
+        with self.captureOnCommitCallbacks(execute=True):
+            self.user.save()
+
+    def test_per_process_cache_is_not_used(self):
+        self.assertEqual(self.me().status_code, 200)
+        # Another process deactivating the user can't reach this process's cache
+        User.objects.filter(pk=self.user.pk).update(is_active=False)
+        self.assertEqual(self.me().status_code, 401)
+
+    def test_deactivation_takes_effect_with_a_shared_cache(self):
+        with tempfile.TemporaryDirectory() as location, override_settings(CACHES={'default': {
+            'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache', 'LOCATION': location,
+        }}):
+            self.assertEqual(self.me().status_code, 200)
+            with self.assertNumQueries(0):
+                self.assertEqual(self.me().status_code, 200)  # Served from the cache
+            self.deactivate()
+            self.assertEqual(self.me().status_code, 401)
+            cache.clear()
+
+    def test_password_hash_is_not_cached(self):
+        with tempfile.TemporaryDirectory() as location, override_settings(CACHES={'default': {
+            'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache', 'LOCATION': location,
+        }}):
+            self.assertEqual(self.me().status_code, 200)
+            entry = cache.get(user_key(self.user.pk, current_version(self.user.pk)))
+            self.assertNotIn(self.user.password.encode(), pickle.dumps(entry))
+            self.assertIn('password', entry[0].get_deferred_fields())
+            self.assertEqual(self.me().status_code, 200)  # The revoke check passes from the cache
+            cache.clear()
@@ -0,0 +1,72 @@
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase
+
+from api.models import User, Post, Comment
+
+
+class CounterTestCase(TestCase):
+    """Likes and comments from two users on three posts, one of them by the user who leaves"""
+
+    def setUp(self):
+        self.author = User.objects.create_user(email='author@example.com', username='author', password='password123')
+        self.leaving = User.objects.create_user(email='leaving@example.com', username='leaving', password='password123')
+        self.staying = User.objects.create_user(email='staying@example.com', username='staying', password='password123')
+        self.first = Post.objects.create(user=self.author, caption='first')
+        self.second = Post.objects.create(user=self.author, caption='second')
+        self.own = Post.objects.create(user=self.leaving, caption='own')
+
+        for post in (self.first, self.second, self.own):
+            post.toggle_like(self.leaving)
+        self.first.toggle_like(self.staying)
+        for content in ('one', 'two', 'three'):
+            Comment.objects.create(post=self.first, user=self.leaving, content=content)
+        Comment.objects.create(post=self.second, user=self.leaving, content='one')
+        Comment.objects.create(post=self.first, user=self.staying, content='kept')
+
+    def counters(self, post):
+        post.refresh_from_db()
+        return post.like_count, post.comment_count
+
+
+class DeletedUserCounterTests(CounterTestCase):
+    """Deleting a user takes their likes and comments off other users' posts"""
+
+    def test_delete_decrements_likes_and_comments(self):
+        self.assertEqual(self.counters(self.first), (2, 4))
+        self.assertEqual(self.counters(self.second), (1, 1))
+
+        self.leaving.delete()
+
+        self.assertEqual(self.counters(self.first), (1, 1))
+        self.assertEqual(self.counters(self.second), (0, 0))
+        self.assertFalse(Post.objects.filter(pk=self.own.pk).exists())
+
+    def test_drifted_counters_do_not_underflow(self):
+        Post.objects.filter(pk=self.first.pk).update(like_count=0, comment_count=2)
+
+        self.leaving.delete()
+
+        self.assertEqual(self.counters(self.first), (0, 0))
+
+
+class RepairPostCountersTests(CounterTestCase):
+    """repair_post_counters recounts drifted posts in place"""
+
+    def repair(self, *args):
+        out = StringIO()
+        call_command('repair_post_counters', '--batch-size', '2', *args, stdout=out)
+        return out.getvalue()
+
+    def test_repairs_only_drifted_posts(self):
+        Post.objects.filter(pk=self.first.pk).update(like_count=9, comment_count=0)
+        Post.objects.filter(pk=self.own.pk).update(comment_count=3)
+
+        self.assertIn('Found 2 drifted post(s) out of 3 checked', self.repair('--dry-run'))
+        self.assertEqual(self.counters(self.first), (9, 0))
+
+        self.assertIn('Repaired 2 drifted post(s) out of 3 checked', self.repair())
+        self.assertEqual(self.counters(self.first), (2, 4))
+        self.assertEqual(self.counters(self.second), (1, 1))
+        self.assertEqual(self.counters(self.own), (1, 0))
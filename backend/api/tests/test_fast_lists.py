@@ -0,0 +1,74 @@
+from datetime import timedelta
+
+from django.core.cache import cache
+from django.test import override_settings
+from rest_framework.test import APITestCase
+
+from api.models import User, Post, Comment, SavedPost
+
+
+class FastListEquivalenceTests(APITestCase):
+    """With FAST_LIST_SERIALIZATION on, every list returns the bytes its serializers would"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.viewer = User.objects.create_user(email='viewer@example.com', username='viewer', password='password123')
+        cls.other = User.objects.create_user(email='other@example.com', username='other', name='Zoë Other',
+                                             password='password123')
+        cls.viewer.toggle_follow(cls.other)
+        cls.posts = [
+            Post.objects.create(user=cls.other, caption='Sunset é 😀 "quoted" \\ </script>', tags='#travel #beach'),
+            Post.objects.create(user=cls.viewer, caption='Travel morning coffee', tags='#travel', location='Goa'),
+            Post.objects.create(user=cls.other, caption='Travel without tags'),
+        ]
+        # An edited post and comment, so is_edited is true on some rows
+        Post.objects.filter(pk=cls.posts[2].pk).update(updated_at=cls.posts[2].created_at + timedelta(minutes=5))
+        for post in cls.posts[:2]:
+            post.toggle_like(cls.viewer)
+            SavedPost.objects.create(user=cls.viewer, post=post)
+        comment = Comment.objects.create(post=cls.posts[0], user=cls.other, content='First ✨')
+        Comment.objects.create(post=cls.posts[0], user=cls.viewer, content='Pinned', pinned=True)
+        Comment.objects.filter(pk=comment.pk).update(updated_at=comment.created_at + timedelta(minutes=5))
+
+    def setUp(self):
+        self.client.force_authenticate(self.viewer)
+
+    def paths(self):
+        return [
+            '/api/posts/',
+            '/api/posts/recent/',
+            f'/api/users/{self.viewer.pk}/posts/',
+            f'/api/users/{self.other.pk}/posts/',
+            '/api/tags/travel/posts/',
+            '/api/search/posts/?q=travel',
+            '/api/auth/me/liked/',
+            '/api/saves/',
+            f'/api/posts/{self.posts[0].pk}/comments/',
+        ]
+
+    def pages(self, path, fast):
+        """Response bodies of the first two pages of `path`"""
+        separator = '&' if '?' in path else '?'
+        with override_settings(FAST_LIST_SERIALIZATION=fast):
+            first = self.client.get(f'{path}{separator}page_size=2')
+            self.assertEqual(first.status_code, 200, path)
+            self.assertTrue(first.json()['results'], f'{path} has nothing to compare')
+            bodies = [first.content]
+            if first.json().get('next'):
+                bodies.append(self.client.get(first.json()['next']).content)
+        return bodies
+
+    def test_same_bytes_in_both_modes(self):
+        for path in self.paths():
+            with self.subTest(path=path):
+                self.assertEqual(self.pages(path, fast=True), self.pages(path, fast=False))
+
+    def test_public_profile_posts_in_both_modes(self):
+        self.client.force_authenticate(None)
+        path = f'/api/users/public/{self.other.pk}/posts/'
+        with override_settings(FAST_LIST_SERIALIZATION=True):
+            fast = self.client.get(path).content
+        cache.clear()  # Otherwise the second request is answered from the public response cache
+        with override_settings(FAST_LIST_SERIALIZATION=False):
+            slow = self.client.get(path).content
+        self.assertEqual(fast, slow)
@@ -0,0 +1,70 @@
+from datetime import timedelta
+
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from api.email_utils import outbox, queue_email
+from api.models import User, Post, FanoutJob, OutboxEmail
+from api.timelines import queue
+
+
+@override_settings(FANOUT_JOB_MAX_ATTEMPTS=2, FANOUT_JOB_RETRY_DELAY=10, FANOUT_JOB_LEASE_SECONDS=60)
+class JobQueueTests(TestCase):
+    def setUp(self):
+        user = User.objects.create_user(email='author@example.com', username='author', password='password123')
+        Post.objects.create(user=user, caption='hello')  # Queues its fan-out
+        self.job = FanoutJob.objects.get()
+
+    def refreshed(self):
+        return FanoutJob.objects.get(pk=self.job.pk)
+
+    def test_claim_leases_runnable_rows_once(self):
+        self.assertEqual([job.pk for job in queue.claim(10)], [self.job.pk])
+        self.assertEqual(self.refreshed().status, FanoutJob.STATUS_RUNNING)
+        self.assertEqual(queue.claim(10), [])
+
+    def test_expired_lease_is_reclaimed(self):
+        queue.claim(10)
+        FanoutJob.objects.filter(pk=self.job.pk).update(locked_at=timezone.now() - timedelta(seconds=61))
+        self.assertEqual([job.pk for job in queue.claim(10)], [self.job.pk])
+
+    def test_retry_backs_off_then_dead_letters(self):
+        [job] = queue.claim(10)
+        self.assertFalse(queue.retry(job, 'timeout'))
+        job = self.refreshed()
+        self.assertEqual((job.status, job.attempts, job.last_error), (FanoutJob.STATUS_PENDING, 1, 'timeout'))
+        self.assertGreaterEqual(job.run_after, timezone.now() + timedelta(seconds=9))
+        self.assertEqual(queue.claim(10), [])  # Still backing off
+
+        self.assertTrue(queue.retry(job, 'timeout'))
+        self.assertEqual(self.refreshed().status, FanoutJob.STATUS_FAILED)
+
+    def test_complete(self):
+        [job] = queue.claim(10)
+        queue.complete(job)
+        job = self.refreshed()
+        self.assertEqual((job.status, job.locked_at, job.last_error), (FanoutJob.STATUS_DONE, None, ''))
+
+
+@override_settings(EMAIL_OUTBOX_MAX_ATTEMPTS=2)
+class OutboxQueueTests(TestCase):
+    """The email outbox uses its own statuses and stamps sent_at on completion"""
+
+    def setUp(self):
+        self.email = queue_email('someone@example.com', 'Subject', 'Body')
+
+    def refreshed(self):
+        return OutboxEmail.objects.get(pk=self.email.pk)
+
+    def test_complete_stamps_sent_at(self):
+        [email] = outbox.claim(10)
+        self.assertEqual(self.refreshed().status, OutboxEmail.STATUS_SENDING)
+        sent_at = timezone.now()
+        outbox.complete(email, sent_at=sent_at)
+        email = self.refreshed()
+        self.assertEqual((email.status, email.locked_at, email.sent_at), (OutboxEmail.STATUS_SENT, None, sent_at))
+
+    def test_dead_letter_status(self):
+        [email] = outbox.claim(10)
+        self.assertTrue(outbox.retry(email, 'refused', permanent=True))
+        self.assertEqual(self.refreshed().status, OutboxEmail.STATUS_DEAD)
@@ -0,0 +1,44 @@
+from django.test import TestCase, override_settings
+from rest_framework.test import APIClient
+
+from api import metrics
+from api.models import User, Post
+
+
+class RequestMetricsTests(TestCase):
+    """Server-Timing is only sent to callers allowed to see it, and labels stay bounded"""
+
+    def setUp(self):
+        metrics.registry.routes.clear()
+        self.user = User.objects.create_user(email='user@example.com', username='user', password='password123')
+        self.staff = User.objects.create_user(email='staff@example.com', username='staff', password='password123',
+                                              is_staff=True)
+        Post.objects.create(user=self.user, caption='hello')
+        self.client = APIClient()
+
+    def test_no_header_for_anonymous_or_regular_users(self):
+        self.assertNotIn('Server-Timing', self.client.get('/api/posts/recent/'))
+        self.client.force_authenticate(self.user)
+        self.assertNotIn('Server-Timing', self.client.get('/api/posts/recent/'))
+
+    def test_header_for_staff(self):
+        self.client.force_authenticate(self.staff)
+        response = self.client.get('/api/posts/recent/')
+        self.assertIn('db;dur=', response['Server-Timing'])
+
+    @override_settings(SERVER_TIMING_HEADER=True)
+    def test_header_for_everyone_when_enabled(self):
+        self.assertIn('Server-Timing', self.client.get('/api/posts/recent/'))
+
+    def test_unknown_methods_share_one_label(self):
+        self.client.generic('BREW', '/api/posts/recent/')
+        self.client.generic('WHEN', '/api/posts/recent/')
+        methods = {method for method, route, status_class in metrics.registry.routes}
+        self.assertEqual(methods, {'OTHER'})
+
+    def test_rendering_counts_as_serializer_time(self):
+        self.client.force_authenticate(self.user)
+        self.client.get(f'/api/auth/users/{self.user.pk}/')
+        stats = next(stats for (method, route, status_class), stats in metrics.registry.routes.items()
+                     if method == 'GET')
+        self.assertGreater(stats.serializer_time, 0)
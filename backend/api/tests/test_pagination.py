@@ -0,0 +1,95 @@
+import base64
+import json
+from urllib.parse import parse_qs, urlparse
+
+from rest_framework.test import APITestCase
+
+from api.models import User, Post, Comment, SavedPost
+
+# Values no keyset position can hold, whatever the column type
+WRONG_TYPES = ([1, 2], {'value': 1}, None)
+# Scalars of the wrong type: a number where a string goes and the reverse
+MISMATCHED_SCALARS = (12345, 'not-a-position', 1.5, True)
+
+
+def cursor_of(url):
+    return parse_qs(urlparse(url).query)['cursor'][0]
+
+
+def decode(cursor):
+    return json.loads(base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)))
+
+
+def encode(payload):
+    return base64.urlsafe_b64encode(json.dumps(payload).encode()).decode().rstrip('=')
+
+
+class CraftedCursorTests(APITestCase):
+    """Every keyset ordering answers a malformed cursor with 404, never a 500"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.viewer = User.objects.create_user(email='viewer@example.com', username='alviewer', name='Al Viewer',
+                                              password='password123')
+        cls.other = User.objects.create_user(email='other@example.com', username='alother', name='Al Other',
+                                             password='password123')
+        cls.posts = [Post.objects.create(user=cls.viewer, caption=f'sunset number {i}', tags='#beach') for i in range(3)]
+        for post in cls.posts:
+            post.toggle_like(cls.viewer)
+            SavedPost.objects.create(user=cls.viewer, post=post)
+            Comment.objects.create(post=cls.posts[0], user=cls.other, content=f'comment {post.pk}')
+
+    def setUp(self):
+        self.client.force_authenticate(self.viewer)
+
+    def endpoints(self):
+        """(path, page size parameter) for every list served by a keyset paginator"""
+        return [
+            ('/api/posts/', 'page_size'),                               # Timeline
+            ('/api/posts/recent/', 'page_size'),                        # Posts
+            (f'/api/users/{self.viewer.pk}/posts/', 'page_size'),       # Posts
+            ('/api/auth/me/liked/', 'page_size'),                       # Likes
+            ('/api/saves/', 'page_size'),                               # Saved posts
+            ('/api/tags/beach/posts/', 'page_size'),                    # Tag feed
+            ('/api/search/posts/?q=sunset', 'page_size'),               # Search score
+            ('/api/search/users/?q=al', 'page_size'),                   # User search score
+            ('/api/auth/users/', 'limit'),                              # Directory
+            ('/api/auth/users/?q=al', 'limit'),                         # Prefix match key
+            (f'/api/posts/{self.posts[0].pk}/comments/', 'page_size'),  # Pinned, created_at, id
+        ]
+
+    def get(self, path, **params):
+        separator = '&' if '?' in path else '?'
+        query = '&'.join(f'{name}={value}' for name, value in params.items())
+        return self.client.get(f'{path}{separator}{query}')
+
+    def real_position(self, path, size_param):
+        response = self.get(path, **{size_param: 1})
+        self.assertEqual(response.status_code, 200, path)
+        self.assertTrue(response.data['next'], f'{path} needs a second page')
+        return decode(cursor_of(response.data['next']))['p']
+
+    def test_wrong_type_in_each_slot(self):
+        for path, size_param in self.endpoints():
+            position = self.real_position(path, size_param)
+            for slot in range(len(position)):
+                for value in WRONG_TYPES:
+                    crafted = position[:slot] + [value] + position[slot + 1:]
+                    with self.subTest(path=path, slot=slot, value=value):
+                        response = self.get(path, cursor=encode({'p': crafted}))
+                        self.assertEqual(response.status_code, 404)
+                for value in MISMATCHED_SCALARS:
+                    crafted = position[:slot] + [value] + position[slot + 1:]
+                    with self.subTest(path=path, slot=slot, value=value):
+                        response = self.get(path, cursor=encode({'p': crafted}))
+                        self.assertIn(response.status_code, (200, 404))
+
+    def test_numbers_in_comment_cursor(self):
+        response = self.client.get(f'/api/posts/{self.posts[0].pk}/comments/', {'cursor': encode({'p': [1, 2, 3]})})
+        self.assertEqual(response.status_code, 404)
+
+    def test_wrong_length_and_garbage(self):
+        for path, _ in self.endpoints():
+            for cursor in (encode({'p': [1]}), encode({'p': 'x'}), encode([1, 2]), 'not base64!'):
+                with self.subTest(path=path, cursor=cursor):
+                    self.assertEqual(self.get(path, cursor=cursor).status_code, 404)
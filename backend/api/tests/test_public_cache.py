@@ -0,0 +1,37 @@
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from api import public_cache
+from api.models import User, Post
+
+
+class FollowInvalidationTests(TestCase):
+    """Following moves a counter on both profiles, so both lose their cached pages"""
+
+    def test_follow_replaces_both_tokens(self):
+        follower = User.objects.create_user(email='follower@example.com', username='follower', password='password123')
+        target = User.objects.create_user(email='target@example.com', username='target', password='password123')
+        dependencies = (public_cache.user_dependency(follower.pk), public_cache.user_dependency(target.pk))
+        before = public_cache.snapshot(*dependencies)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            follower.toggle_follow(target)
+
+        after = public_cache.snapshot(*dependencies)
+        for dependency in dependencies:
+            self.assertNotEqual(before[dependency], after[dependency], dependency)
+
+
+class PublicPostAuthorTests(TestCase):
+    """Shared post pages only show the author's public card"""
+
+    def test_author_is_summarized(self):
+        author = User.objects.create_user(email='author@example.com', username='author', name='Author',
+                                          bio='private bio', password='password123')
+        post = Post.objects.create(user=author, caption='hello')
+
+        response = APIClient().get(f'/api/posts/public/{post.pk}/')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(set(response.json()['user']), {'id', 'username', 'name', 'imageUrl'})
+        self.assertNotIn(b'author@example.com', response.content)
@@ -0,0 +1,77 @@
+import tempfile
+import time
+
+from django.core.management import call_command
+from django.core.management.base import SystemCheckError
+from django.db import connections
+from django.test import TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
+
+from api.models import User, Post
+
+REPLICAS = ['replica1', 'replica2']
+
+# Registered on import: the test runner creates (or mirrors) every alias a test case uses before
+# any case is set up. They are test mirrors of the primary, as DB_REPLICA_HOSTS replicas are
+for alias in REPLICAS:
+    connections.settings.setdefault(alias, dict(connections.settings['default'], TEST={'MIRROR': 'default'}))
+
+
+class ReplicaRoutingTests(TransactionTestCase):
+    """
+    Safe requests read from a replica until their user writes
+
+    The replica aliases mirror the test database, so the data is the same
+    everywhere and the tests only look at which connection ran the queries.
+    """
+    databases = {'default', *REPLICAS}
+
+    def setUp(self):
+        cache_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(cache_dir.cleanup)
+        overrides = override_settings(DATABASE_REPLICAS=REPLICAS, REPLICA_PIN_SECONDS=1, CACHES={'default': {
+            'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache', 'LOCATION': cache_dir.name,
+        }})
+        overrides.enable()
+        self.addCleanup(overrides.disable)
+
+        self.user = User.objects.create_user(email='user@example.com', username='user', password='password123')
+        self.post = Post.objects.create(user=self.user, caption='hello')
+        self.client = APIClient()
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {AccessToken.for_user(self.user)}')
+
+    def request(self, method, path):
+        """(status code, queries run on the primary, queries run on the replicas)"""
+        with CaptureQueriesContext(connections['default']) as primary:
+            with CaptureQueriesContext(connections['replica1']) as first, \
+                    CaptureQueriesContext(connections['replica2']) as second:
+                response = getattr(self.client, method)(path)
+        return response.status_code, len(primary), len(first) + len(second)
+
+    def test_safe_get_reads_from_a_replica(self):
+        status, primary, replicas = self.request('get', '/api/posts/recent/')
+        self.assertEqual(status, 200)
+        self.assertGreater(replicas, 0)
+
+    def test_write_pins_the_user_to_the_primary_until_it_expires(self):
+        status, primary, replicas = self.request('post', f'/api/posts/{self.post.pk}/like/')
+        self.assertEqual(status, 200)
+        self.assertEqual(replicas, 0)
+
+        status, primary, replicas = self.request('get', '/api/posts/recent/')
+        self.assertEqual((status, replicas), (200, 0))
+        self.assertGreater(primary, 0)
+
+        time.sleep(1.1)  # REPLICA_PIN_SECONDS
+        status, primary, replicas = self.request('get', '/api/posts/recent/')
+        self.assertEqual(status, 200)
+        self.assertGreater(replicas, 0)
+
+    def test_per_process_cache_keeps_reads_on_the_primary(self):
+        with override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}}):
+            status, primary, replicas = self.request('get', '/api/posts/recent/')
+            self.assertEqual((status, replicas), (200, 0))
+            with self.assertRaisesMessage(SystemCheckError, 'api.W001'):
+                call_command('check', fail_level='WARNING')
@@ -0,0 +1,29 @@
+from django.test import TestCase
+
+from api.models import Tag
+from api.tag_index import TagIndex
+
+
+class TagIndexTests(TestCase):
+    def setUp(self):
+        Tag.objects.create(name='sunset', post_count=3)
+        Tag.objects.create(name='sundae', post_count=5)
+        Tag.objects.create(name='beach', post_count=1)
+        self.index = TagIndex()
+
+    def test_suggest_most_used_first(self):
+        self.assertEqual(self.index.suggest('sun'), [('sundae', 5), ('sunset', 3)])
+
+    def test_refresh_publishes_new_lists(self):
+        self.index.refresh(force=True)
+        names, counts = published = self.index.entries
+        Tag.objects.create(name='sunrise', post_count=2)
+        Tag.objects.filter(name='sundae').update(post_count=0)
+
+        self.index.refresh(force=True)
+
+        # A lookup that read the old pair keeps a consistent view of it
+        self.assertEqual(published, (['beach', 'sundae', 'sunset'], [1, 5, 3]))
+        self.assertIsNot(self.index.entries[0], names)
+        self.assertIsNot(self.index.entries[1], counts)
+        self.assertEqual(self.index.suggest('sun'), [('sunset', 3), ('sunrise', 2)])
@@ -0,0 +1,72 @@
+import io
+import tempfile
+from unittest import mock
+
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import TestCase, override_settings
+from PIL import Image
+
+from api import uploads
+from api.models import User, UploadJob, ImageStatus
+
+
+def image_file(color):
+    buffer = io.BytesIO()
+    Image.new('RGB', (64, 48), color).save(buffer, 'PNG')
+    return SimpleUploadedFile('photo.png', buffer.getvalue(), content_type='image/png')
+
+
+class UploadJobTests(TestCase):
+    def setUp(self):
+        media = tempfile.TemporaryDirectory()
+        self.addCleanup(media.cleanup)
+        overrides = override_settings(MEDIA_ROOT=media.name, MEDIA_STORAGE='local',
+                                      LOCAL_MEDIA_ROOT=f'{media.name}/local_storage')
+        overrides.enable()
+        self.addCleanup(overrides.disable)
+        self.user = User.objects.create_user(email='user@example.com', username='user', password='password123')
+
+    def enqueue(self, color):
+        return UploadJob.enqueue_upload(self.user, image_file(color), 'snapgram/profiles')
+
+    def test_failed_newer_upload_does_not_supersede(self):
+        older = self.enqueue('red')
+        UploadJob.objects.filter(pk=older.pk).update(status=UploadJob.STATUS_RUNNING)  # Claimed by a worker
+        newer = self.enqueue('blue')
+        UploadJob.objects.filter(pk=newer.pk).update(status=UploadJob.STATUS_FAILED)
+
+        self.assertTrue(uploads.process_job(UploadJob.objects.get(pk=older.pk)))
+
+        self.user.refresh_from_db()
+        self.assertEqual(self.user.image_status, ImageStatus.READY)
+        self.assertTrue(self.user.image_path)
+
+    def test_pending_newer_upload_supersedes(self):
+        older = self.enqueue('red')
+        UploadJob.objects.filter(pk=older.pk).update(status=UploadJob.STATUS_RUNNING)
+        self.enqueue('blue')
+
+        self.assertTrue(uploads.process_job(UploadJob.objects.get(pk=older.pk)))
+
+        self.user.refresh_from_db()
+        self.assertFalse(self.user.image_path)
+
+
+class AssetKeyTests(TestCase):
+    """Asset keys name the format renditions are really encoded in"""
+
+    @override_settings(IMAGE_RENDITION_FORMAT='WEBP')
+    def test_webp_fallback_shares_jpeg_keys(self):
+        with mock.patch('api.image_processing.features.check', return_value=False):
+            fallback = uploads._asset_key('abc', 'full', 400)
+        with override_settings(IMAGE_RENDITION_FORMAT='JPEG'):
+            jpeg = uploads._asset_key('abc', 'full', 400)
+        self.assertEqual(fallback, jpeg)
+
+    @override_settings(IMAGE_RENDITION_FORMAT='WEBP')
+    def test_webp_and_fallback_keys_differ(self):
+        with mock.patch('api.image_processing.features.check', return_value=True):
+            webp = uploads._asset_key('abc', 'full', 400)
+        with mock.patch('api.image_processing.features.check', return_value=False):
+            fallback = uploads._asset_key('abc', 'full', 400)
+        self.assertNotEqual(webp, fallback)
@@ -0,0 +1,110 @@
+"""
+Home timelines
+
+Posts are copied into each follower's TimelineEntry rows by the
+`process_fanout_jobs` command (fan-out-on-write), so reading a home feed is
+a range scan on the viewer's own timeline. Accounts with more than
+FEED_FANOUT_MAX_FOLLOWERS followers are skipped at write time and merged in
+at read time instead (fan-out-on-read), which keeps a single post from
+writing millions of rows.
+"""
+from itertools import islice
+
+from django.conf import settings
+from django.db.models import F
+
+from .job_queue import JobQueue
+from .models import FanoutJob, Follow, Post, TimelineEntry
+
+
+def is_high_fanout(user):
+    return user.followers_count >= settings.FEED_FANOUT_MAX_FOLLOWERS
+
+
+def timeline_sources(user):
+    """
+    Querysets whose merge is `user`'s home timeline
+
+    Every source yields {'created_at', 'post_id'} rows so the keyset
+    paginator can page through them together. Visibility is checked when the
+    page's posts are loaded, not here.
+    """
+    return _sources(user, high_fanout_followees(user))
+
+
+async def atimeline_sources(user):
+    """timeline_sources for async views"""
+    return _sources(user, [followee_id async for followee_id in high_fanout_followees(user)])
+
+
+def high_fanout_followees(user):
+    """Ids of the accounts `user` follows whose posts are read at request time"""
+    return Follow.objects.filter(
+        follower=user, followee__followers_count__gte=settings.FEED_FANOUT_MAX_FOLLOWERS
+    ).order_by().values_list('followee_id', flat=True)
+
+
+def _sources(user, high_fanout):
+    sources = [TimelineEntry.objects.filter(user=user).values('created_at', 'post_id')]
+    # One source per account: each is a range scan in (user, created_at, id) order,
+    # where a single user_id IN (...) query would have to sort the union
+    for followee_id in high_fanout:
+        sources.append(
+            Post.objects.filter(user_id=followee_id, is_private=False)
+            .annotate(post_id=F('id')).values('created_at', 'post_id')
+        )
+    return sources
+
+
+def fan_out(post):
+    """Copy `post` into the timelines of its author's followers; returns rows written"""
+    if post.is_private or is_high_fanout(post.user):
+        return 0
+    batch_size = settings.FEED_FANOUT_BATCH_SIZE
+    followers = (
+        Follow.objects.filter(followee_id=post.user_id).order_by('id')
+        .values_list('follower_id', flat=True).iterator(chunk_size=batch_size)
+    )
+    written = 0
+    while True:
+        batch = list(islice(followers, batch_size))
+        if not batch:
+            return written
+        TimelineEntry.objects.bulk_create([
+            TimelineEntry(user_id=follower_id, post_id=post.pk, author_id=post.user_id,
+                          created_at=post.created_at)
+            for follower_id in batch
+        ], ignore_conflicts=True)
+        written += len(batch)
+
+
+queue = JobQueue(
+    FanoutJob, lease_setting='FANOUT_JOB_LEASE_SECONDS', max_attempts_setting='FANOUT_JOB_MAX_ATTEMPTS',
+    retry_delay_setting='FANOUT_JOB_RETRY_DELAY', running_status=FanoutJob.STATUS_RUNNING,
+    done_status=FanoutJob.STATUS_DONE, failed_status=FanoutJob.STATUS_FAILED,
+)
+
+
+def process_job(job):
+    """Run one claimed job, scheduling a retry with backoff if it fails"""
+    try:
+        post = Post.objects.select_related('user').filter(pk=job.post_id).first()
+        if post is not None:
+            fan_out(post)
+    except Exception as e:
+        queue.retry(job, e)
+        return False
+    queue.complete(job)
+    return True
+
+
+def run_pending(limit=10):
+    """Claim and process one batch of jobs; returns (succeeded, failed)"""
+    succeeded = failed = 0
+    for job in queue.claim(limit):
+        if process_job(job):
+            succeeded += 1
+        else:
+            failed += 1
+    return succeeded, failed
+
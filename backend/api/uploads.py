@@ -0,0 +1,222 @@
+"""
+Background media upload pipeline
+
+Work queued in the UploadJob table is claimed and executed here by the
+`process_upload_jobs` management command, never inside a web request.
+"""
+import hashlib
+import io
+from collections import Counter
+
+from django.conf import settings
+from django.core.files import File
+from django.db import transaction, IntegrityError
+from django.db.models import F
+
+from . import authentication, public_cache
+from .image_processing import ImageProcessingError, build_renditions, output_format
+from .job_queue import JobQueue
+from .media_storage import get_media_storage
+from .models import UploadJob, ImageStatus, MediaAsset, Post, User
+
+
+def _target_model(job):
+    return Post if job.target_type == UploadJob.TARGET_POST else User
+
+
+queue = JobQueue(
+    UploadJob, lease_setting='UPLOAD_JOB_LEASE_SECONDS', max_attempts_setting='UPLOAD_JOB_MAX_ATTEMPTS',
+    retry_delay_setting='UPLOAD_JOB_RETRY_DELAY', running_status=UploadJob.STATUS_RUNNING,
+    done_status=UploadJob.STATUS_DONE, failed_status=UploadJob.STATUS_FAILED,
+)
+
+
+def process_job(job):
+    """Run one claimed job, scheduling a retry with backoff if it fails"""
+    try:
+        if job.action == UploadJob.ACTION_DELETE:
+            _run_delete(job)
+        else:
+            _run_upload(job)
+    except ImageProcessingError as e:
+        _schedule_retry(job, e, permanent=True)  # Retrying won't make the file decodable
+        return False
+    except Exception as e:
+        _schedule_retry(job, e)
+        return False
+    _finish(job)
+    return True
+
+
+def run_pending(limit=10):
+    """Claim and process one batch of jobs; returns (succeeded, failed)"""
+    succeeded = failed = 0
+    for job in queue.claim(limit):
+        if process_job(job):
+            succeeded += 1
+        else:
+            failed += 1
+    return succeeded, failed
+
+
+def _rendition_sizes(job):
+    if job.target_type == UploadJob.TARGET_POST:
+        return settings.POST_IMAGE_RENDITIONS
+    return settings.PROFILE_IMAGE_RENDITIONS
+
+
+def _source_hash(staged):
+    digest = hashlib.sha256()
+    for chunk in iter(lambda: staged.read(1024 * 1024), b''):
+        digest.update(chunk)
+    staged.seek(0)
+    return digest.hexdigest()
+
+
+def _asset_key(source_hash, name, edge):
+    # The rendition spec is part of the key so changed settings produce new blobs. It names the
+    # format actually written, so a host without WEBP never shares a key with one that has it
+    spec = f"{source_hash}:{name}:{edge}:{output_format()}:{settings.IMAGE_RENDITION_QUALITY}"
+    return hashlib.sha256(spec.encode('ascii')).hexdigest()
+
+
+def _acquire_existing(key):
+    """Take a reference on an existing asset; returns None if the blob isn't stored yet"""
+    with transaction.atomic():
+        asset = MediaAsset.objects.select_for_update().filter(key=key).first()
+        if asset is None:
+            return None
+        MediaAsset.objects.filter(pk=asset.pk).update(ref_count=F('ref_count') + 1)
+    return asset
+
+
+def _register_uploaded(key, rendition, stored):
+    """Record a freshly uploaded blob with one reference"""
+    try:
+        with transaction.atomic():
+            return MediaAsset.objects.create(
+                key=key, storage=settings.MEDIA_STORAGE, storage_key=stored.key, url=stored.url,
+                width=rendition.width, height=rendition.height,
+                size_bytes=len(rendition.content), format=rendition.format.lower(), ref_count=1,
+            )
+    except IntegrityError:
+        # Another worker stored the same bytes under the same key meanwhile
+        return _acquire_existing(key)
+
+
+def release_assets(urls):
+    """
+    Drop one reference per entry in `urls`, deleting blobs whose last reference goes
+
+    Freed blobs are removed with one bulk delete per storage backend while
+    their asset rows are still locked, so a concurrent upload of the same
+    content either reuses the row before we get here or re-uploads after the
+    blob is gone. Returns the number of blobs deleted.
+    """
+    releases = Counter(urls)
+    if not releases:
+        return 0
+    with transaction.atomic():
+        assets = list(MediaAsset.objects.select_for_update().filter(url__in=releases).order_by('id'))
+        freed = []
+        for asset in assets:
+            count = releases[asset.url]
+            if asset.ref_count > count:
+                MediaAsset.objects.filter(pk=asset.pk).update(ref_count=F('ref_count') - count)
+            else:
+                freed.append(asset)
+
+        keys_by_storage = {}
+        for asset in freed:
+            keys_by_storage.setdefault(asset.storage, []).append(asset.storage_key)
+        for storage_name, keys in keys_by_storage.items():
+            get_media_storage(storage_name).bulk_delete(keys)
+        MediaAsset.objects.filter(pk__in=[asset.pk for asset in freed]).delete()
+    return len(freed)
+
+
+def _upload_renditions(job):
+    """
+    Resolve every rendition to a MediaAsset; returns {name: metadata}
+
+    Renditions whose content key is already stored are reused without
+    decoding or transferring anything; only the missing ones are encoded
+    and uploaded, named by their key.
+    """
+    storage = get_media_storage()
+    sizes = _rendition_sizes(job)
+    acquired = {}
+    try:
+        with job.file.open('rb') as staged:
+            source_hash = _source_hash(staged)
+            keys = {name: _asset_key(source_hash, name, edge) for name, edge in sizes.items()}
+            for name, key in keys.items():
+                asset = _acquire_existing(key)
+                if asset:
+                    acquired[name] = asset
+
+            missing = {name: edge for name, edge in sizes.items() if name not in acquired}
+            renditions = build_renditions(staged, missing) if missing else []
+
+        for rendition in renditions:
+            key = keys[rendition.name]
+            content = File(io.BytesIO(rendition.content), name=f"{key}.{rendition.extension}")
+            stored = storage.upload(content, key, job.folder)
+            acquired[rendition.name] = _register_uploaded(key, rendition, stored)
+    except Exception:
+        # Give back the references we took; the retry starts from scratch
+        release_assets([asset.url for asset in acquired.values()])
+        raise
+    return {name: asset.describe() for name, asset in acquired.items()}
+
+
+def _run_upload(job):
+    model = _target_model(job)
+    if not model.objects.filter(pk=job.target_id).exists():
+        return  # Target deleted while the job was queued; nothing to attach
+
+    renditions = _upload_renditions(job)
+    changes = {'image_path': renditions['full']['url'], 'image_status': ImageStatus.READY}
+    if model is Post:
+        changes['image_renditions'] = renditions
+
+    with transaction.atomic():
+        # A newer upload that failed for good never replaces this one, so it doesn't count
+        superseded = UploadJob.objects.filter(
+            target_type=job.target_type, target_id=job.target_id,
+            action=UploadJob.ACTION_UPLOAD, id__gt=job.id,
+            status__in=[UploadJob.STATUS_PENDING, UploadJob.STATUS_RUNNING, UploadJob.STATUS_DONE],
+        ).exists()
+        target = model.objects.filter(pk=job.target_id).first()
+        if superseded or target is None:
+            # A newer image replaced this one (or the target vanished) before we finished
+            released = [meta['url'] for meta in renditions.values()]
+        else:
+            released = target.image_urls()
+            # update() leaves auto_now updated_at alone, so posts aren't marked edited
+            model.objects.filter(pk=job.target_id).update(**changes)
+            if model is Post:
+                public_cache.invalidate_post(target.pk, target.user_id)
+            else:
+                public_cache.invalidate_user(target.pk)
+                authentication.invalidate_user(target.pk)
+
+    release_assets(released)
+
+
+def _run_delete(job):
+    release_assets(job.urls)
+
+
+def _finish(job):
+    if job.file:
+        job.file.delete(save=False)
+    queue.complete(job, file='')
+
+
+def _schedule_retry(job, error, permanent=False):
+    if queue.retry(job, error, permanent) and job.action == UploadJob.ACTION_UPLOAD:
+        model = _target_model(job)
+        model.objects.filter(pk=job.target_id).update(image_status=ImageStatus.FAILED)
+        if model is User:
+            authentication.invalidate_user(job.target_id)
@@ -1,29 +1,43 @@
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
-from . import views
+from . import views, async_views
+from .async_views import read_async
 
 urlpatterns = [
     # Auth endpoints
     path('auth/signup/', views.UserRegistrationView.as_view(), name='user-registration'),
     path('auth/login/', views.LoginView.as_view(), name='login'),
     path('auth/me/', views.CurrentUserView.as_view(), name='current-user'),
+    path('auth/me/liked/', views.LikedPostsView.as_view(), name='liked-posts'),
     path('auth/users/', views.UserListView.as_view(), name='user-list'),
+    path('auth/users/autocomplete/', views.user_autocomplete, name='user-autocomplete'),
     path('auth/users/<int:id>/', views.UserDetailView.as_view(), name='user-detail'),
     path('auth/toggle-privacy/', views.toggle_user_privacy, name='toggle-user-privacy'),
     path('auth/forgot-password/', views.forgot_password, name='forgot-password'),
     path('auth/reset-password/<str:token>/', views.reset_password, name='reset-password'),
     
     # Post endpoints
-    path('posts/', views.PostListView.as_view(), name='post-list'),
+    path('posts/', read_async(async_views.home_feed, views.PostListView.as_view()), name='post-list'),
     path('posts/recent/', views.RecentPostsView.as_view(), name='recent-posts'),
-    path('posts/<int:id>/', views.PostDetailView.as_view(), name='post-detail'),
+    path('posts/<int:id>/', read_async(async_views.post_detail, views.PostDetailView.as_view()), name='post-detail'),
     path('posts/public/<int:id>/', views.PublicPostDetailView.as_view(), name='public-post-detail'),
     path('posts/<int:post_id>/like/', views.like_post, name='like-post'),
-    path('posts/<int:post_id>/comments/', views.CommentListView.as_view(), name='comment-list'),
+    path('posts/<int:post_id>/comments/', read_async(async_views.comments, views.CommentListView.as_view()),
+         name='comment-list'),
     
     # User posts
-    path('users/<int:user_id>/posts/', views.UserPostsView.as_view(), name='user-posts'),
+    path('users/<int:user_id>/posts/', read_async(async_views.user_posts, views.UserPostsView.as_view()),
+         name='user-posts'),
     path('users/public/<int:user_id>/posts/', views.PublicUserPostsView.as_view(), name='public-user-posts'),
+    path('users/<int:user_id>/follow/', views.follow_user, name='follow-user'),
+    
+    # Tags
+    path('tags/autocomplete/', views.tag_autocomplete, name='tag-autocomplete'),
+    path('tags/<str:name>/posts/', views.TagPostsView.as_view(), name='tag-posts'),
+    
+    # Search
+    path('search/posts/', views.PostSearchView.as_view(), name='search-posts'),
+    path('search/users/', views.UserSearchView.as_view(), name='search-users'),
     
     # Comment endpoints
     path('comments/<int:id>/', views.CommentDetailView.as_view(), name='comment-detail'),
@@ -31,5 +45,10 @@ urlpatterns = [
     
     # Saved posts endpoints
     path('saves/', views.SavedPostListView.as_view(), name='saved-post-list'),
+    path('saves/state/', views.saved_state, name='saved-state'),
     path('saves/<int:id>/', views.SavedPostDetailView.as_view(), name='saved-post-detail'),
+    
+    # Operations
+    path('cache/stats/', views.public_cache_stats, name='public-cache-stats'),
+    path('metrics/', views.prometheus_metrics, name='metrics'),
 ]
@@ -8,18 +8,85 @@ from django.db.models import Q
 from django.db import models
 from django.shortcuts import get_object_or_404
 from django.utils import timezone
-from django.core.mail import send_mail
 from django.conf import settings
+from django.http import Http404, HttpResponse
+from django.utils.crypto import constant_time_compare
+from django.views.decorators.http import require_GET
 from rest_framework.exceptions import PermissionDenied
 import secrets
 from datetime import timedelta
-from .models import User, Post, Comment, SavedPost
+from .models import User, Post, Comment, SavedPost, Like, Follow, FanoutJob, PostSearchTerm, UserSearchTerm, Tag, PostTag
 from .serializers import (
     UserRegistrationSerializer, UserSerializer, UserUpdateSerializer,
     PostSerializer, PostListSerializer, PostCreateSerializer, PostUpdateSerializer, CommentSerializer, SavedPostSerializer,
-    SavedPostCreateSerializer
+    SavedPostCreateSerializer, UserSummarySerializer
 )
-from .email_utils import send_welcome_email
+from .email_utils import send_welcome_email, send_password_reset_email
+from .pagination import (
+    PostCursorPagination, CommentCursorPagination, TimelineCursorPagination, SearchCursorPagination,
+    UserSearchCursorPagination, TagFeedCursorPagination, UserDirectoryCursorPagination,
+    UserPrefixCursorPagination, LikedPostsCursorPagination, SavedPostCursorPagination
+)
+from .tag_index import tag_index
+from .timelines import timeline_sources
+from .replicas import pin_to_primary, use_primary
+from . import metrics, public_cache, search
+from .conditional import (
+    ConditionalGetMixin, POST_VALIDATOR_FIELDS, POST_DETAIL_VALIDATOR_FIELDS, COMMENT_VALIDATOR_FIELDS, with_viewer_state
+)
+from .fast_lists import (
+    FastListMixin, POST_ROW_FIELDS, SAVED_POST_ROW_FIELDS, COMMENT_ROW_FIELDS, post_rows, saved_post_rows, comment_rows
+)
+
+MAX_SAVED_STATE_IDS = 100  # Post ids per /saves/state/ request
+
+
+class ExpandableSerializerMixin:
+    """
+    Pass the comma-separated `expand` query parameter to the serializer
+    context so callers can opt in to expensive nested fields (e.g. expand=posts).
+    """
+
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        expand = self.request.query_params.get('expand', '')
+        context['expand'] = {field.strip() for field in expand.split(',') if field.strip()}
+        return context
+
+
+class PublicCacheMixin:
+    """
+    Serve anonymous GETs from the public response cache (see api/public_cache.py)
+    
+    Authenticated requests bypass the cache because their payload carries
+    viewer state (is_liked, is_saved). Responses report X-Cache: HIT or MISS.
+    """
+
+    def get_public_cache_key(self):
+        raise NotImplementedError
+
+    def get_public_cache_dependencies(self):
+        raise NotImplementedError
+
+    def get(self, request, *args, **kwargs):
+        if request.user.is_authenticated:
+            return super().get(request, *args, **kwargs)
+
+        key = self.get_public_cache_key()
+        data = public_cache.lookup(key)
+        if data is not None:
+            response = Response(data)
+            response['X-Cache'] = 'HIT'
+            return response
+
+        tokens = public_cache.snapshot(*self.get_public_cache_dependencies())
+        # A lagging replica could store data from before the change that bumped a token
+        with use_primary():
+            response = super().get(request, *args, **kwargs)
+        if response.status_code == status.HTTP_200_OK:
+            public_cache.store(key, response.data, tokens)
+        response['X-Cache'] = 'MISS'
+        return response
 
 
 class UserRegistrationView(generics.CreateAPIView):
@@ -32,8 +99,10 @@ class UserRegistrationView(generics.CreateAPIView):
         serializer = self.get_serializer(data=request.data)
         serializer.is_valid(raise_exception=True)
         user = serializer.save()
+        # The new account's first requests must find it, even before the replicas have it
+        pin_to_primary(user.pk)
         
-        # Send welcome email
+        # Queue welcome email
         send_welcome_email(user)
         
         # Generate JWT tokens
@@ -76,7 +145,7 @@ class LoginView(APIView):
         )
 
 
-class CurrentUserView(generics.RetrieveUpdateAPIView):
+class CurrentUserView(ExpandableSerializerMixin, generics.RetrieveUpdateAPIView):
     """View for current user profile"""
     serializer_class = UserSerializer
     permission_classes = [permissions.IsAuthenticated]
@@ -88,48 +157,100 @@ class CurrentUserView(generics.RetrieveUpdateAPIView):
         if self.request.method in ['PATCH', 'PUT']:
             return UserUpdateSerializer
         return UserSerializer
-    
-    def get_serializer_context(self):
-        context = super().get_serializer_context()
-        context['request'] = self.request
-        return context
+
+
+class LikedPostsView(FastListMixin, generics.ListAPIView):
+    """The current user's liked posts, most recently liked first"""
+    serializer_class = PostListSerializer
+    permission_classes = [permissions.IsAuthenticated]
+    pagination_class = LikedPostsCursorPagination
+
+    def list(self, request, *args, **kwargs):
+        rows = self.paginator.paginate_queryset(Like.liked_by(request.user), request, view=self)
+        # A liked post may have turned private since; only show what the viewer can still see
+        visible = Post.objects.select_related('user').filter(
+            models.Q(user__is_private=False, is_private=False) | models.Q(user=request.user)
+        )
+        return self.paginator.get_paginated_response(self.post_page(visible, [row['post_id'] for row in rows]))
 
 
 class UserListView(generics.ListAPIView):
-    """View for listing users"""
-    serializer_class = UserSerializer
+    """
+    User directory: compact user cards, newest first (cursor-paginated)
+    
+    ?q= narrows the directory to users whose username or name starts with q,
+    listed alphabetically by the matching value.
+    """
+    serializer_class = UserSummarySerializer
     permission_classes = [permissions.IsAuthenticated]
-    pagination_class = None  # Disable pagination for this view
+    pagination_class = UserDirectoryCursorPagination
 
     def get_queryset(self):
-        limit = self.request.query_params.get('limit')
-        queryset = User.objects.all().order_by('-created_at')
-        if limit:
-            try:
-                queryset = queryset[:int(limit)]
-            except ValueError:
-                pass
-        return queryset
+        return User.objects.only(*User.SUMMARY_FIELDS)
+
+    def list(self, request, *args, **kwargs):
+        prefix = search.normalize_prefix(request.query_params.get('q', ''))
+        if not prefix:
+            return super().list(request, *args, **kwargs)
+        paginator = UserPrefixCursorPagination()
+        sources = [queryset.only(*User.SUMMARY_FIELDS) for queryset in User.prefix_matches(prefix)]
+        page = paginator.paginate_querysets(sources, request, view=self)
+        with metrics.serializing():
+            data = self.get_serializer(page, many=True).data
+        return paginator.get_paginated_response(data)
+
+
+@api_view(['GET'])
+@permission_classes([permissions.IsAuthenticated])
+def user_autocomplete(request):
+    """Users whose username or name starts with ?q=, alphabetically (typeahead)"""
+    prefix = search.normalize_prefix(request.query_params.get('q', ''))
+    if not prefix:
+        return Response({'results': []})
+    try:
+        limit = min(max(int(request.query_params.get('limit', 10)), 1), 20)
+    except ValueError:
+        limit = 10
+    return Response({'results': UserSummarySerializer(User.suggest(prefix, limit), many=True).data})
 
 
-class UserDetailView(generics.RetrieveAPIView):
+class UserDetailView(ConditionalGetMixin, ExpandableSerializerMixin, generics.RetrieveAPIView):
     """View for user detail"""
     serializer_class = UserSerializer
     permission_classes = [permissions.IsAuthenticated]
     lookup_field = 'id'
+    validator_fields = (
+        'id', 'updated_at', 'image_path', 'image_status', 'is_private',
+        'followers_count', 'following_count', 'posts_count', 'is_following',
+    )
+
+    def get_validator_rows(self):
+        # The embedded posts list changes without touching the user row
+        if 'posts' in self.get_serializer_context()['expand']:
+            return None
+        return super().get_validator_rows()
 
     def get_queryset(self):
-        return User.objects.prefetch_related('posts__likes', 'posts__comments').all()
-    
-    def get_serializer_context(self):
-        context = super().get_serializer_context()
-        context['request'] = self.request
-        return context
+        # Count only the posts the viewer is allowed to see
+        visible_posts = Q(posts__is_private=False) | Q(id=self.request.user.id)
+        return User.objects.annotate(
+            posts_count=models.Count('posts', filter=visible_posts),
+            is_following=models.Exists(
+                Follow.objects.filter(follower_id=self.request.user.id, followee_id=models.OuterRef('pk'))
+            ),
+        )
 
 
-class PostListView(generics.ListCreateAPIView):
-    """View for listing and creating posts"""
+class PostListView(ConditionalGetMixin, FastListMixin, generics.ListCreateAPIView):
+    """
+    View for the home timeline and creating posts
+    
+    The feed is the viewer's materialized timeline (own posts plus posts
+    fanned out from followed accounts), merged with recent posts from followed
+    high-follower accounts that are read on demand.
+    """
     permission_classes = [permissions.IsAuthenticated]
+    pagination_class = TimelineCursorPagination  # Keyset pagination on (created_at, post_id)
 
     def get_serializer_class(self):
         if self.request.method == 'POST':
@@ -138,7 +259,7 @@ class PostListView(generics.ListCreateAPIView):
 
     def get_queryset(self):
         # Filter out posts from private profiles and private posts
-        queryset = Post.objects.select_related('user').prefetch_related('comments', 'likes')
+        queryset = Post.objects.select_related('user')
         # Only show posts that meet these criteria:
         # 1. Posts from public profiles (user.is_private=False) AND public posts (post.is_private=False)
         # 2. Posts from the current user (regardless of profile or post privacy)
@@ -146,21 +267,47 @@ class PostListView(generics.ListCreateAPIView):
             models.Q(
                 models.Q(user__is_private=False) & models.Q(is_private=False)
             ) | models.Q(user=self.request.user)
-        ).order_by('-created_at')
+        )
         return queryset
 
+    def get_timeline_page(self):
+        if not hasattr(self, '_timeline_page'):
+            self._timeline_page = self.paginator.paginate_querysets(
+                timeline_sources(self.request.user), self.request, view=self
+            )
+        return self._timeline_page
+
+    def get_validator_rows(self):
+        post_ids = [row['post_id'] for row in self.get_timeline_page()]
+        posts = with_viewer_state(self.get_queryset().filter(id__in=post_ids), self.request.user)
+        return [post_ids, sorted(posts.order_by().values(*POST_VALIDATOR_FIELDS), key=lambda row: row['id'])]
+
+    def list(self, request, *args, **kwargs):
+        post_ids = [row['post_id'] for row in self.get_timeline_page()]
+        # Timeline rows may outlive a post's visibility, so the check happens here
+        return self.paginator.get_paginated_response(self.post_page(self.get_queryset(), post_ids))
+
     def perform_create(self, serializer):
         serializer.save(user=self.request.user)
 
 
-class RecentPostsView(generics.ListAPIView):
+class RecentPostsView(ConditionalGetMixin, FastListMixin, generics.ListAPIView):
     """View for recent posts"""
     serializer_class = PostListSerializer
     permission_classes = [permissions.IsAuthenticated]
+    pagination_class = PostCursorPagination
+    validator_fields = POST_VALIDATOR_FIELDS
+    list_fields = POST_ROW_FIELDS
+
+    def list_rows(self, rows):
+        return post_rows(rows, self.request.user)
+
+    def get_validator_queryset(self):
+        return with_viewer_state(super().get_validator_queryset(), self.request.user)
 
     def get_queryset(self):
         # Filter out posts from private profiles and private posts
-        queryset = Post.objects.select_related('user').prefetch_related('comments', 'likes')
+        queryset = Post.objects.select_related('user')
         
         # Only show posts that meet these criteria:
         # 1. Posts from public profiles (user.is_private=False) AND public posts (post.is_private=False)
@@ -172,24 +319,20 @@ class RecentPostsView(generics.ListAPIView):
         )
         
         return queryset.order_by('-created_at')
-    
-    def list(self, request, *args, **kwargs):
-        response = super().list(request, *args, **kwargs)
-        # Add cache-busting headers to prevent frontend caching
-        response['Cache-Control'] = 'no-cache, no-store, must-revalidate'
-        response['Pragma'] = 'no-cache'
-        response['Expires'] = '0'
-        return response
 
 
-class PostDetailView(generics.RetrieveUpdateDestroyAPIView):
+class PostDetailView(ConditionalGetMixin, generics.RetrieveUpdateDestroyAPIView):
     """View for post detail, update, and delete"""
     serializer_class = PostSerializer
     permission_classes = [permissions.IsAuthenticated]
     lookup_field = 'id'
+    validator_fields = POST_DETAIL_VALIDATOR_FIELDS
+
+    def get_validator_queryset(self):
+        return with_viewer_state(super().get_validator_queryset(), self.request.user)
 
     def get_queryset(self):
-        queryset = Post.objects.select_related('user').prefetch_related('likes', 'comments')
+        queryset = Post.objects.select_related('user')
         # Only allow access to public posts or posts from the current user
         queryset = queryset.filter(
             models.Q(is_private=False) | models.Q(user=self.request.user)
@@ -206,7 +349,11 @@ class PostDetailView(generics.RetrieveUpdateDestroyAPIView):
         if serializer.instance.user != self.request.user:
             from rest_framework.exceptions import PermissionDenied
             raise PermissionDenied("You can only update your own posts.")
-        serializer.save()
+        was_private = serializer.instance.is_private
+        post = serializer.save()
+        if was_private and not post.is_private:
+            # Newly public: deliver it to followers' timelines
+            FanoutJob.objects.create(post=post)
 
     def perform_destroy(self, instance):
         # Only allow post owners to delete their posts
@@ -216,14 +363,24 @@ class PostDetailView(generics.RetrieveUpdateDestroyAPIView):
         instance.delete()
 
 
-class PublicPostDetailView(generics.RetrieveAPIView):
+class PublicPostDetailView(PublicCacheMixin, generics.RetrieveAPIView):
     """View for public post detail (for shared posts)"""
     serializer_class = PostSerializer
     permission_classes = [permissions.AllowAny]
     lookup_field = 'id'
 
     def get_queryset(self):
-        return Post.objects.select_related('user').prefetch_related('likes', 'comments')
+        return Post.objects.select_related('user')
+
+    def get_public_cache_key(self):
+        return public_cache.post_detail_key(self.kwargs['id'])
+
+    def get_public_cache_dependencies(self):
+        dependencies = [public_cache.post_dependency(self.kwargs['id'])]
+        author_id = Post.objects.filter(id=self.kwargs['id']).values_list('user_id', flat=True).first()
+        if author_id is not None:
+            dependencies.append(public_cache.user_dependency(author_id))
+        return dependencies
 
 
 @api_view(['POST'])
@@ -231,53 +388,157 @@ class PublicPostDetailView(generics.RetrieveAPIView):
 def like_post(request, post_id):
     """View for liking/unliking a post"""
     post = get_object_or_404(Post, id=post_id)
-    user = request.user
-    
-    if post.likes.filter(id=user.id).exists():
-        post.likes.remove(user)
-        liked = False
-    else:
-        post.likes.add(user)
-        liked = True
+    liked, likes_count = post.toggle_like(request.user)
     
     return Response({
         'liked': liked,
-        'likes_count': post.likes.count()
+        'likes_count': likes_count
+    })
+
+
+@api_view(['POST'])
+@permission_classes([permissions.IsAuthenticated])
+def follow_user(request, user_id):
+    """View for following/unfollowing a user"""
+    target = get_object_or_404(User, id=user_id)
+    if target.id == request.user.id:
+        return Response({'error': 'You cannot follow yourself'}, status=status.HTTP_400_BAD_REQUEST)
+    following, followers_count = request.user.toggle_follow(target)
+    
+    return Response({
+        'following': following,
+        'followers_count': followers_count
     })
 
 
-class UserPostsView(generics.ListAPIView):
-    """View for user's posts"""
+class UserPostsView(ConditionalGetMixin, FastListMixin, generics.ListAPIView):
+    """View for user's posts (profile grid), newest first"""
     serializer_class = PostListSerializer
     permission_classes = [permissions.IsAuthenticated]
+    pagination_class = PostCursorPagination
+    validator_fields = POST_VALIDATOR_FIELDS
+    list_fields = POST_ROW_FIELDS
+
+    def list_rows(self, rows):
+        return post_rows(rows, self.request.user)
+
+    def get_validator_queryset(self):
+        return with_viewer_state(super().get_validator_queryset(), self.request.user)
 
     def get_queryset(self):
         user_id = self.kwargs['user_id']
-        queryset = Post.objects.filter(user_id=user_id).select_related('user').prefetch_related('comments', 'likes')
+        queryset = Post.objects.filter(user_id=user_id).select_related('user')
         # If viewing another user's posts, only show public posts
         if str(user_id) != str(self.request.user.id):
             queryset = queryset.filter(is_private=False)
         return queryset.order_by('-created_at')
 
 
-class PublicUserPostsView(generics.ListAPIView):
+class PublicUserPostsView(PublicCacheMixin, FastListMixin, generics.ListAPIView):
     """View for public user's posts (for shared posts)"""
     serializer_class = PostListSerializer
     permission_classes = [permissions.AllowAny]
+    pagination_class = PostCursorPagination
+    list_fields = POST_ROW_FIELDS
+
+    def list_rows(self, rows):
+        return post_rows(rows, self.request.user)
 
     def get_queryset(self):
         user_id = self.kwargs['user_id']
-        return Post.objects.filter(user_id=user_id).select_related('user').prefetch_related('comments').order_by('-created_at')
+        return Post.objects.filter(user_id=user_id).select_related('user').order_by('-created_at')
+
+    def get_public_cache_key(self):
+        return public_cache.user_posts_key(self.kwargs['user_id'], self.request.META.get('QUERY_STRING', ''))
+
+    def get_public_cache_dependencies(self):
+        return [public_cache.user_dependency(self.kwargs['user_id'])]
+
 
+class TagPostsView(FastListMixin, generics.ListAPIView):
+    """View for a hashtag feed (/tags/<name>/posts/), newest first"""
+    serializer_class = PostListSerializer
+    permission_classes = [permissions.IsAuthenticated]
+    pagination_class = TagFeedCursorPagination
+
+    def list(self, request, *args, **kwargs):
+        tag = get_object_or_404(Tag, name=search.normalize_tag(self.kwargs['name']))
+        rows = self.paginator.paginate_queryset(PostTag.feed(tag, request.user), request, view=self)
+        page = self.post_page(Post.objects.select_related('user'), [row['post_id'] for row in rows])
+        response = self.paginator.get_paginated_response(page)
+        response.data['tag'] = {'name': tag.name, 'post_count': tag.post_count}
+        return response
+
+
+@api_view(['GET'])
+@permission_classes([permissions.IsAuthenticated])
+def tag_autocomplete(request):
+    """Tag names starting with ?q=, most used first (served from the in-memory tag index)"""
+    prefix = search.normalize_tag(request.query_params.get('q', ''))
+    if not prefix:
+        return Response({'results': []})
+    try:
+        limit = min(max(int(request.query_params.get('limit', 10)), 1), 50)
+    except ValueError:
+        limit = 10
+    return Response({
+        'results': [{'name': name, 'post_count': count} for name, count in tag_index.suggest(prefix, limit)]
+    })
 
-class CommentListView(generics.ListCreateAPIView):
+
+class PostSearchView(FastListMixin, generics.ListAPIView):
+    """
+    Full-text post search (?q=) over captions, tags and locations
+    
+    Served from the PostSearchTerm inverted index: posts must match every
+    query term and are ranked by summed term weight, then recency.
+    """
+    serializer_class = PostListSerializer
+    permission_classes = [permissions.IsAuthenticated]
+    pagination_class = SearchCursorPagination
+
+    def list(self, request, *args, **kwargs):
+        if not request.query_params.get('q', '').strip():
+            return Response({'error': 'Query parameter q is required'}, status=status.HTTP_400_BAD_REQUEST)
+        terms = search.query_terms(request.query_params['q'])
+        matches = PostSearchTerm.search(terms, request.user)  # No terms (e.g. only stop words): no rows
+        rows = self.paginator.paginate_queryset(matches, request, view=self)
+        page = self.post_page(Post.objects.select_related('user'), [row['post_id'] for row in rows])
+        return self.paginator.get_paginated_response(page)
+
+
+class UserSearchView(generics.ListAPIView):
+    """Full-text user search (?q=) over usernames, names, locations and bios"""
+    serializer_class = UserSummarySerializer
+    permission_classes = [permissions.IsAuthenticated]
+    pagination_class = UserSearchCursorPagination
+
+    def list(self, request, *args, **kwargs):
+        if not request.query_params.get('q', '').strip():
+            return Response({'error': 'Query parameter q is required'}, status=status.HTTP_400_BAD_REQUEST)
+        terms = search.query_terms(request.query_params['q'])
+        matches = UserSearchTerm.search(terms)
+        rows = self.paginator.paginate_queryset(matches, request, view=self)
+        users = User.objects.only('id', 'username', 'name', 'image_path').order_by().in_bulk([row['user_id'] for row in rows])
+        page = [users[row['user_id']] for row in rows if row['user_id'] in users]
+        with metrics.serializing():
+            data = self.get_serializer(page, many=True).data
+        return self.paginator.get_paginated_response(data)
+
+
+class CommentListView(ConditionalGetMixin, FastListMixin, generics.ListCreateAPIView):
     """View for listing and creating comments"""
     serializer_class = CommentSerializer
     permission_classes = [permissions.IsAuthenticated]
+    pagination_class = CommentCursorPagination  # Pinned first, then (created_at, id)
+    validator_fields = COMMENT_VALIDATOR_FIELDS
+    list_fields = COMMENT_ROW_FIELDS
+
+    def list_rows(self, rows):
+        return comment_rows(rows)
 
     def get_queryset(self):
-        post_id = self.kwargs['post_id']
-        return Comment.objects.filter(post_id=post_id).select_related('user').order_by('-pinned', '-created_at')
+        return Comment.thread(self.kwargs['post_id'])
 
     def perform_create(self, serializer):
         post_id = self.kwargs['post_id']
@@ -352,10 +613,14 @@ class CommentPinView(APIView):
             )
 
 
-class SavedPostListView(generics.ListCreateAPIView):
+class SavedPostListView(FastListMixin, generics.ListCreateAPIView):
     """View for listing and creating saved posts"""
     permission_classes = [permissions.IsAuthenticated]
-    pagination_class = None  # Disable pagination for now, but we could add it later
+    pagination_class = SavedPostCursorPagination  # Keyset pagination on (created_at, id)
+    list_fields = SAVED_POST_ROW_FIELDS
+
+    def list_rows(self, rows):
+        return saved_post_rows(rows)
 
     def get_serializer_class(self):
         if self.request.method == 'POST':
@@ -369,6 +634,24 @@ class SavedPostListView(generics.ListCreateAPIView):
         serializer.save(user=self.request.user)
 
 
+@api_view(['GET'])
+@permission_classes([permissions.IsAuthenticated])
+def saved_state(request):
+    """
+    Which of ?ids=1,2,3 the current user has saved, as {post_id: saved record id}
+    
+    Lets a client mark the save buttons of a feed page with one indexed
+    query instead of downloading the whole saved collection.
+    """
+    try:
+        post_ids = {int(post_id) for post_id in request.query_params.get('ids', '').split(',') if post_id.strip()}
+    except ValueError:
+        return Response({'error': 'ids must be a comma-separated list of post ids'}, status=status.HTTP_400_BAD_REQUEST)
+    if len(post_ids) > MAX_SAVED_STATE_IDS:
+        return Response({'error': f'At most {MAX_SAVED_STATE_IDS} ids per request'}, status=status.HTTP_400_BAD_REQUEST)
+    return Response({'saved': SavedPost.records_for(request.user, post_ids)})
+
+
 class SavedPostDetailView(generics.DestroyAPIView):
     """View for deleting saved posts"""
     serializer_class = SavedPostSerializer
@@ -393,7 +676,8 @@ def toggle_user_privacy(request):
         )
     
     user.is_private = is_private
-    user.save()
+    # request.user may come from the auth cache; write only what changed
+    user.save(update_fields=['is_private', 'updated_at'])
     
     return Response({
         'message': f'Profile privacy set to {"private" if is_private else "public"}',
@@ -423,37 +707,10 @@ def forgot_password(request):
     user.reset_token_expires = timezone.now() + timedelta(hours=1)  # Token expires in 1 hour
     user.save()
     
-    # Send email (in production, you would use a proper email service)
+    # Queue the email; the outbox worker delivers it
     reset_url = f"{settings.FRONTEND_URL}/reset-password/{reset_token}"
     
-    try:
-        send_mail(
-            'Password Reset Request - SnapGram',
-            f'''
-            Hi {user.name},
-            
-            You requested a password reset for your SnapGram account.
-            
-            Click the link below to reset your password:
-            {reset_url}
-            
-            This link will expire in 1 hour.
-            
-            If you didn't request this password reset, please ignore this email.
-            
-            Best regards,
-            The SnapGram Team
-            ''',
-            settings.DEFAULT_FROM_EMAIL,
-            [user.email],
-            fail_silently=False,
-        )
-        print(f"Password reset email sent successfully to {user.email}")
-    except Exception as e:
-        print(f"Email sending failed: {e}")
-        # Log the error but don't reveal it to the user for security
-        # In production, you might want to use a proper email service like SendGrid
-        # For now, we'll still return success to not reveal if email exists
+    send_password_reset_email(user, reset_url)
     
     return Response({'message': 'If an account with this email exists, a password reset link has been sent.'}, 
                    status=status.HTTP_200_OK)
@@ -491,3 +748,24 @@ def reset_password(request, token):
     
     return Response({'message': 'Password has been successfully reset'}, 
                    status=status.HTTP_200_OK)
+
+
+@api_view(['GET'])
+@permission_classes([permissions.IsAdminUser])
+def public_cache_stats(request):
+    """Hit/miss counters for the public share page cache"""
+    return Response(public_cache.stats())
+
+
+@require_GET
+def prometheus_metrics(request):
+    """
+    Per-route request metrics in the Prometheus text format
+    
+    A plain Django view: scrapers authenticate with the static METRICS_TOKEN
+    rather than a user JWT. Without a configured token the endpoint is off.
+    """
+    token = settings.METRICS_TOKEN
+    if not token or not constant_time_compare(request.headers.get('Authorization', ''), f'Bearer {token}'):
+        raise Http404
+    return HttpResponse(metrics.registry.render(), content_type='text/plain; version=0.0.4; charset=utf-8')
@@ -12,5 +12,9 @@ import os
 from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'snapgram_backend.settings')
+# Serve the hot read endpoints with the async views (see api/async_views.py)
+os.environ.setdefault('ASYNC_READ_VIEWS', 'True')
+# Each request runs its queries in its own thread, so don't keep connections open between requests
+os.environ.setdefault('DB_CONN_MAX_AGE', '0')
 
 application = get_asgi_application()
@@ -63,6 +63,8 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'api.metrics.PerformanceMetricsMiddleware',  # Outermost, so it times everything below
+    'api.replicas.ReplicaMiddleware',  # Before anything that can query the database
     'corsheaders.middleware.CorsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
@@ -105,9 +107,26 @@ DATABASES = {
         'PASSWORD': os.getenv('DB_PASSWORD', 'root'),
         'HOST': os.getenv('DB_HOST', 'localhost'),
         'PORT': os.getenv('DB_PORT', '3306'),
+        # Keep connections open between requests, checked before reuse. asgi.py sets this to 0:
+        # under ASGI every request gets its own thread, so persistent connections would pile up
+        'CONN_MAX_AGE': int(os.getenv('DB_CONN_MAX_AGE', '60')),  # Seconds
+        'CONN_HEALTH_CHECKS': True,
     }
 }
 
+# Read replicas: DB_REPLICA_HOSTS=host[:port],... adds a `replicaN` alias per host, with the
+# primary's name and credentials. api/replicas.py routes the reads of GET requests to them
+DATABASE_REPLICAS = []
+for number, address in enumerate(filter(None, os.getenv('DB_REPLICA_HOSTS', '').split(',')), start=1):
+    host, _, port = address.strip().partition(':')
+    alias = f'replica{number}'
+    DATABASES[alias] = dict(DATABASES['default'], HOST=host, PORT=port or DATABASES['default']['PORT'],
+                            TEST={'MIRROR': 'default'})
+    DATABASE_REPLICAS.append(alias)
+
+DATABASE_ROUTERS = ['api.replicas.ReplicaRouter']
+REPLICA_PIN_SECONDS = int(os.getenv('REPLICA_PIN_SECONDS', '10'))  # Read-your-writes window after a write
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
@@ -163,7 +182,7 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 REST_FRAMEWORK = {
     # JWT Authentication - Secure token-based authentication
     'DEFAULT_AUTHENTICATION_CLASSES': (
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'api.authentication.CachedJWTAuthentication',  # simplejwt, with the user row cached in a shared cache
     ),
     # Require authentication for all API endpoints
     'DEFAULT_PERMISSION_CLASSES': [
@@ -171,7 +190,12 @@ REST_FRAMEWORK = {
     ],
     # Pagination settings - 10 items per page by default
     'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
-    'PAGE_SIZE': 10  # Can be overridden per view (e.g., UserListView has pagination disabled)
+    'PAGE_SIZE': 10,  # Can be overridden per view (e.g., UserListView has pagination disabled)
+    # JSON rendering time is reported as serializer time in the request metrics
+    'DEFAULT_RENDERER_CLASSES': [
+        'api.renderers.TimedJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ],
 }
 
 # JWT Settings
@@ -233,6 +257,12 @@ if EMAIL_BACKEND == 'smtp':
 elif EMAIL_BACKEND == 'console':
     EMAIL_BACKEND = 'django.core.mail.backends.console.EmailBackend'
 
+# Email Outbox
+# Emails are queued in the OutboxEmail table and delivered by `manage.py send_queued_emails`
+EMAIL_OUTBOX_MAX_ATTEMPTS = int(os.getenv('EMAIL_OUTBOX_MAX_ATTEMPTS', '5'))
+EMAIL_OUTBOX_RETRY_DELAY = int(os.getenv('EMAIL_OUTBOX_RETRY_DELAY', '60'))      # Seconds, doubled per attempt
+EMAIL_OUTBOX_LEASE_SECONDS = int(os.getenv('EMAIL_OUTBOX_LEASE_SECONDS', '300'))  # Reclaim emails from dead workers
+
 # Frontend URL for password reset links
 FRONTEND_URL = os.getenv('FRONTEND_URL', 'http://localhost:5173')
 
@@ -242,4 +272,80 @@ cloudinary.config(
     api_key=os.getenv('CLOUDINARY_API_KEY'),
     api_secret=os.getenv('CLOUDINARY_API_SECRET'),
     secure=True
-)
\ No newline at end of file
+)
+
+# Media Upload Pipeline
+# Images are staged under MEDIA_ROOT and uploaded by `manage.py process_upload_jobs`.
+# MEDIA_STORAGE selects the backend in api/media_storage.py: 'cloudinary' (default), 'local'
+# (filesystem under LOCAL_MEDIA_ROOT served from LOCAL_MEDIA_URL, e.g. our own disk/CDN),
+# or a dotted path to a MediaStorage subclass
+MEDIA_STORAGE = os.getenv('MEDIA_STORAGE', 'cloudinary')
+LOCAL_MEDIA_ROOT = os.getenv('LOCAL_MEDIA_ROOT', os.path.join(MEDIA_ROOT, 'local_storage'))
+LOCAL_MEDIA_URL = os.getenv('LOCAL_MEDIA_URL', MEDIA_URL + 'local_storage/')
+UPLOAD_JOB_MAX_ATTEMPTS = int(os.getenv('UPLOAD_JOB_MAX_ATTEMPTS', '5'))
+UPLOAD_JOB_RETRY_DELAY = int(os.getenv('UPLOAD_JOB_RETRY_DELAY', '30'))      # Seconds, doubled per attempt
+UPLOAD_JOB_LEASE_SECONDS = int(os.getenv('UPLOAD_JOB_LEASE_SECONDS', '300'))  # Reclaim jobs from dead workers
+
+# Caching
+# CACHE_BACKEND=locmem (per process, default) or file (shared by every process on the host,
+# stored under CACHE_LOCATION)
+CACHE_BACKEND = os.getenv('CACHE_BACKEND', 'locmem')
+if CACHE_BACKEND == 'file':
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+            'LOCATION': os.getenv('CACHE_LOCATION', os.path.join(BASE_DIR, 'cache')),
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+            'LOCATION': 'snapgram',
+        }
+    }
+
+# Public share pages (/api/posts/public/<id>/, /api/users/public/<id>/posts/) are cached for
+# anonymous visitors and invalidated on every change; see api/public_cache.py
+PUBLIC_CACHE_ALIAS = 'default'
+PUBLIC_CACHE_TIMEOUT = int(os.getenv('PUBLIC_CACHE_TIMEOUT', '300'))  # Seconds
+
+# Authenticated users are cached between requests for this many seconds (0 loads them from the
+# database every time). Needs a shared cache (CACHE_BACKEND=file); see api/authentication.py
+AUTH_USER_CACHE_TIMEOUT = int(os.getenv('AUTH_USER_CACHE_TIMEOUT', '60'))
+
+# Home Timelines
+# Posts are fanned out to followers' timelines by `manage.py process_fanout_jobs`. Accounts with
+# at least FEED_FANOUT_MAX_FOLLOWERS followers are read at request time instead (fan-out-on-read)
+FEED_FANOUT_MAX_FOLLOWERS = int(os.getenv('FEED_FANOUT_MAX_FOLLOWERS', '10000'))
+FEED_FANOUT_BATCH_SIZE = int(os.getenv('FEED_FANOUT_BATCH_SIZE', '1000'))   # Timeline rows per insert
+FEED_FOLLOW_BACKFILL = int(os.getenv('FEED_FOLLOW_BACKFILL', '20'))         # Recent posts copied on follow
+FANOUT_JOB_MAX_ATTEMPTS = int(os.getenv('FANOUT_JOB_MAX_ATTEMPTS', '5'))
+FANOUT_JOB_RETRY_DELAY = int(os.getenv('FANOUT_JOB_RETRY_DELAY', '10'))     # Seconds, doubled per attempt
+FANOUT_JOB_LEASE_SECONDS = int(os.getenv('FANOUT_JOB_LEASE_SECONDS', '300'))
+
+# Hashtag autocomplete: seconds between incremental refreshes of each process's in-memory tag index
+TAG_INDEX_REFRESH_SECONDS = int(os.getenv('TAG_INDEX_REFRESH_SECONDS', '30'))
+
+# Performance metrics: Server-Timing headers and per-route histograms (see api/metrics.py).
+# /api/metrics/ answers only requests carrying "Authorization: Bearer <METRICS_TOKEN>".
+PERF_METRICS_ENABLED = os.getenv('PERF_METRICS_ENABLED', 'True').lower() == 'true'
+METRICS_TOKEN = os.getenv('METRICS_TOKEN', '')
+# Server-Timing reveals DB time and query counts, so only staff and DEBUG get it unless this is on
+SERVER_TIMING_HEADER = os.getenv('SERVER_TIMING_HEADER', 'False').lower() == 'true'
+
+# Opt in to building post, saved-post and comment lists from values() rows rendered with orjson
+# (see api/fast_lists.py); off, they go through their DRF serializers
+FAST_LIST_SERIALIZATION = os.getenv('FAST_LIST_SERIALIZATION', 'False').lower() == 'true'
+
+# Async read views: GETs to the feed, post detail, comments and profile posts are served by the
+# coroutines in api/async_views.py. asgi.py turns this on; under WSGI they would only add overhead
+ASYNC_READ_VIEWS = os.getenv('ASYNC_READ_VIEWS', 'False').lower() == 'true'
+
+# Image Renditions
+# The upload worker strips EXIF, fixes orientation and stores these sizes (longest edge, px).
+# List endpoints serve `medium`/`thumb`; post detail serves `full`.
+POST_IMAGE_RENDITIONS = {'thumb': 320, 'medium': 1080, 'full': 2048}
+PROFILE_IMAGE_RENDITIONS = {'full': 400}
+IMAGE_RENDITION_FORMAT = os.getenv('IMAGE_RENDITION_FORMAT', 'WEBP')  # WEBP or JPEG
+IMAGE_RENDITION_QUALITY = int(os.getenv('IMAGE_RENDITION_QUALITY', '82'))
@@ -1,44 +1,123 @@
-import { useToast } from "@/components/SimpleToast";
+import { useState, useEffect, useCallback } from "react";
 import Loader from "@/components/Loader";
 import UserCard from "@/components/UserCard";
-import { useGetUsers } from "@/hooks/useQueries";
+import { getUsers } from "@/lib/api";
 
 /**
  * All Users Page Component - People Discovery
- * 
- * This page displays all users in the system for discovery and networking.
+ *
+ * This page displays the user directory for discovery and networking.
  * Features:
- * - Shows all users without pagination limits
+ * - Newest users first, loaded a page at a time with a Load More button
+ * - Search box that filters by username/name prefix as you type
  * - User cards with profile information
- * - Follow/unfollow functionality
- * - Error handling with toast notifications
+ * - Error handling with retry functionality
  */
 const AllUsers = () => {
-  const { toast } = useToast();
+  const [users, setUsers] = useState([]);            // Array of compact user objects
+  const [query, setQuery] = useState("");            // Search box contents
+  const [isLoading, setIsLoading] = useState(true);  // Initial loading state
+  const [isLoadingMore, setIsLoadingMore] = useState(false); // Load more button state
+  const [hasMore, setHasMore] = useState(false);     // Whether more users are available
+  const [nextPage, setNextPage] = useState(null);    // Cursor for the next page
+  const [error, setError] = useState(null);          // Error state for failed requests
 
-  // Fetch all users from the API (no limit = shows all users)
-  const { data: creators, isLoading, error: isErrorCreators } = useGetUsers();
+  /**
+   * Fetches one directory page
+   * @param {string} search - Username/name prefix ('' for everyone)
+   * @param {string|null} cursor - Cursor of the page to fetch (null for the first page)
+   */
+  const fetchUsers = useCallback(async (search, cursor = null) => {
+    try {
+      if (cursor) {
+        setIsLoadingMore(true);
+      } else {
+        setIsLoading(true);
+      }
+      setError(null);
 
-  if (isErrorCreators) {
-    toast({ title: "Something went wrong." });
-    
-    return;
+      const response = await getUsers({ cursor, query: search });
+      const newUsers = response.documents || [];
+
+      setUsers(prevUsers => (cursor ? [...prevUsers, ...newUsers] : newUsers));
+      setHasMore(response.hasMore);
+      setNextPage(response.nextPage);
+    } catch (err) {
+      console.error('Error fetching users:', err);
+      setError(err);
+    } finally {
+      setIsLoading(false);
+      setIsLoadingMore(false);
+    }
+  }, []);
+
+  // Reload from the first page whenever the search changes (debounced while typing)
+  useEffect(() => {
+    const timer = setTimeout(() => fetchUsers(query.trim(), null), 250);
+    return () => clearTimeout(timer);
+  }, [query, fetchUsers]);
+
+  const loadMoreUsers = useCallback(() => {
+    if (!isLoadingMore && hasMore) {
+      fetchUsers(query.trim(), nextPage);
+    }
+  }, [fetchUsers, query, nextPage, isLoadingMore, hasMore]);
+
+  if (error) {
+    return (
+      <div className="common-container">
+        <div className="user-container">
+          <p className="body-medium text-light-1">Something went wrong.</p>
+          <button
+            onClick={() => fetchUsers(query.trim(), null)}
+            className="mt-4 px-4 py-2 bg-primary-500 text-white rounded-lg hover:bg-primary-600"
+          >
+            Try Again
+          </button>
+        </div>
+      </div>
+    );
   }
 
   return (
     <div className="common-container">
       <div className="user-container">
         <h2 className="h3-bold md:h2-bold text-left w-full">Other Users</h2>
-        {isLoading && !creators ? (
+        <input
+          type="text"
+          value={query}
+          onChange={(e) => setQuery(e.target.value)}
+          className="w-full h-12 px-4 py-3 bg-dark-4 border border-dark-4 rounded-lg text-light-1 placeholder-light-3 focus:outline-none focus:ring-2 focus:ring-primary-500"
+          placeholder="Search by username or name"
+        />
+        {isLoading ? (
           <Loader />
         ) : (
-          <ul className="user-grid">
-            {creators?.documents.map((creator) => (
-              <li key={creator?.id} className="flex-1 min-w-[200px] w-full  ">
-                <UserCard user={creator} />
-              </li>
-            ))}
-          </ul>
+          <>
+            <ul className="user-grid">
+              {users.map((creator) => (
+                <li key={creator?.id} className="flex-1 min-w-[200px] w-full  ">
+                  <UserCard user={creator} />
+                </li>
+              ))}
+            </ul>
+
+            {users.length === 0 && (
+              <p className="text-light-3 body-medium">No users found</p>
+            )}
+
+            {hasMore && (
+              <div className="flex justify-center w-full py-8">
+                <button
+                  onClick={loadMoreUsers}
+                  disabled={isLoadingMore}
+                  className="px-6 py-3 bg-primary-500 text-white rounded-lg hover:bg-primary-600 disabled:opacity-50 disabled:cursor-not-allowed"
+                >
+                  {isLoadingMore ? "Loading..." : "Load More Users"}
+                </button>
+              </div>
+            )}
+          </>
         )}
       </div>
     </div>
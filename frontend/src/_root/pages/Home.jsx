@@ -19,15 +19,15 @@ const Home = () => {
   const [isLoading, setIsLoading] = useState(true); // Initial loading state
   const [isLoadingMore, setIsLoadingMore] = useState(false); // Load more button state
   const [hasMore, setHasMore] = useState(true);     // Whether more posts are available
-  const [nextPage, setNextPage] = useState(1);      // Next page number for pagination
+  const [nextPage, setNextPage] = useState(null);   // Cursor for the next page
   const [error, setError] = useState(null);         // Error state for failed requests
 
   /**
    * Fetches posts from the API with pagination support
-   * @param {number} page - Page number to fetch (default: 1)
+   * @param {string|null} cursor - Cursor of the page to fetch (null for the first page)
    * @param {boolean} isLoadMore - Whether this is loading more posts (append vs replace)
    */
-  const fetchPosts = useCallback(async (page = 1, isLoadMore = false) => {
+  const fetchPosts = useCallback(async (cursor = null, isLoadMore = false) => {
     try {
       // Set appropriate loading state based on whether we're loading more or initial load
       if (isLoadMore) {
@@ -37,8 +37,8 @@ const Home = () => {
       }
       setError(null);
       
-      // Call API to get posts for the specified page
-      const response = await getInfinitePosts({ pageParam: page });
+      // Call API to get posts for the specified cursor
+      const response = await getInfinitePosts({ pageParam: cursor });
       const newPosts = response.documents || [];
       
       // Update posts array - either append (load more) or replace (initial load)
@@ -50,7 +50,7 @@ const Home = () => {
       
       // Update pagination state
       setHasMore(response.hasMore);                    // Whether more posts are available
-      setNextPage(response.nextPage || page + 1);     // Next page number
+      setNextPage(response.nextPage);                 // Cursor for the next page
     } catch (err) {
       console.error('Error fetching posts:', err);
       setError(err);
@@ -63,7 +63,7 @@ const Home = () => {
 
   // Load initial posts when component mounts
   useEffect(() => {
-    fetchPosts(1, false);
+    fetchPosts(null, false);
   }, [fetchPosts]);
 
   /**
@@ -81,7 +81,7 @@ const Home = () => {
    * Called when a post is deleted to ensure UI stays in sync
    */
   const handlePostDeleted = useCallback(() => {
-    fetchPosts(1, false); // Reload from page 1 to get updated post list
+    fetchPosts(null, false); // Reload from the first page to get updated post list
   }, [fetchPosts]);
 
   if (error) {
@@ -90,7 +90,7 @@ const Home = () => {
         <div className="home-container">
           <p className="body-medium text-light-1">Something bad happened</p>
           <button 
-            onClick={() => fetchPosts(1, false)}
+            onClick={() => fetchPosts(null, false)}
             className="mt-4 px-4 py-2 bg-primary-500 text-white rounded-lg hover:bg-primary-600"
           >
             Try Again
@@ -1,11 +1,38 @@
+import { useState, useEffect, useCallback } from "react";
 import GridPostList from "@/components/GridPostList";
 import Loader from "@/components/Loader";
-import { useGetCurrentUser } from "@/hooks/useQueries";
+import { getLikedPosts } from "@/lib/api";
 
 const LikedPosts = () => {
-  const { data: currentUser } = useGetCurrentUser();
+  const [posts, setPosts] = useState([]);
+  const [isLoading, setIsLoading] = useState(true);
+  const [isLoadingMore, setIsLoadingMore] = useState(false);
+  const [nextPage, setNextPage] = useState(null);   // Cursor for the next page
+  const [hasMore, setHasMore] = useState(false);
 
-  if (!currentUser)
+  // Liked posts come from the server, most recently liked first
+  const fetchLikedPosts = useCallback(async (cursor = null) => {
+    try {
+      if (cursor) {
+        setIsLoadingMore(true);
+      }
+      const response = await getLikedPosts({ cursor });
+      setPosts(prevPosts => (cursor ? [...prevPosts, ...response.documents] : response.documents));
+      setNextPage(response.nextPage);
+      setHasMore(response.hasMore);
+    } catch (err) {
+      console.error('Error fetching liked posts:', err);
+    } finally {
+      setIsLoading(false);
+      setIsLoadingMore(false);
+    }
+  }, []);
+
+  useEffect(() => {
+    fetchLikedPosts(null);
+  }, [fetchLikedPosts]);
+
+  if (isLoading)
     return (
       <div className="flex-center w-full h-full">
         <Loader />
@@ -14,11 +41,23 @@ const LikedPosts = () => {
 
   return (
     <>
-      {currentUser.liked.length === 0 && (
+      {posts.length === 0 && (
         <p className="text-light-4">No liked posts</p>
       )}
 
-      <GridPostList posts={currentUser.liked} showStats={false} />
+      <GridPostList posts={posts} showStats={false} />
+
+      {hasMore && (
+        <div className="flex justify-center w-full py-8">
+          <button
+            onClick={() => fetchLikedPosts(nextPage)}
+            disabled={isLoadingMore}
+            className="px-6 py-3 bg-primary-500 text-white rounded-lg hover:bg-primary-600 disabled:opacity-50 disabled:cursor-not-allowed"
+          >
+            {isLoadingMore ? "Loading..." : "Load More"}
+          </button>
+        </div>
+      )}
     </>
   );
 };
@@ -1,3 +1,4 @@
+import { useState, useEffect } from "react";
 import {
   Route,
   Routes,
@@ -10,7 +11,7 @@ import {
 import SimpleButton from "@/components/SimpleButton";
 import LikedPosts from "@/_root/pages/LikedPosts";
 import { useUserContext } from "@/context/AuthContext";
-import { useGetUserById, useGetUserPosts } from "@/hooks/useQueries";
+import { useFollowUser, useGetUserById, useGetUserPosts } from "@/hooks/useQueries";
 import GridPostList from "@/components/GridPostList";
 import Loader from "@/components/Loader";
 import PrivacyMessage from "@/components/PrivacyMessage";
@@ -32,7 +33,22 @@ const Profile = () => {
   const userId = id || user.id;
   const { data: currentUser } = useGetUserById(userId);
   const { data: userPosts } = useGetUserPosts(userId);
+  const { callApi: followUser, isLoading: isFollowLoading } = useFollowUser();
+  const [follow, setFollow] = useState(null);
 
+  useEffect(() => {
+    if (currentUser) {
+      setFollow({
+        following: !!currentUser.is_following,
+        followers_count: currentUser.followers_count ?? 0,
+      });
+    }
+  }, [currentUser]);
+
+  const handleFollow = async () => {
+    const result = await followUser(currentUser.id);
+    setFollow(result);
+  };
 
   if (!currentUser)
     return (
@@ -63,7 +79,9 @@ const Profile = () => {
             </div>
 
             <div className="flex gap-8 mt-10 items-center justify-center xl:justify-start flex-wrap z-20">
-              <StatBlock value={userPosts?.documents?.length || currentUser.posts?.length || 0} label="Posts" />
+              <StatBlock value={currentUser.posts_count ?? userPosts?.documents?.length ?? 0} label="Posts" />
+              <StatBlock value={follow?.followers_count ?? currentUser.followers_count ?? 0} label="Followers" />
+              <StatBlock value={currentUser.following_count ?? 0} label="Following" />
             </div>
 
             <p className="small-medium md:base-medium text-center xl:text-left mt-7 max-w-screen-sm">
@@ -112,6 +130,15 @@ const Profile = () => {
                 </p>
               </Link>
             </div>
+            <div className={`${user.id === currentUser.id && "hidden"}`}>
+              <SimpleButton
+                type="button"
+                className="h-12 px-8"
+                onClick={handleFollow}
+                disabled={isFollowLoading}>
+                {follow?.following ? "Unfollow" : "Follow"}
+              </SimpleButton>
+            </div>
           </div>
         </div>
       </div>
@@ -160,7 +187,7 @@ const Profile = () => {
               />
             ) : (
               // Always show posts for the profile owner, or if the profile is public
-              <GridPostList posts={userPosts?.documents || currentUser.posts || []} showUser={false} />
+              <GridPostList posts={userPosts?.documents || []} showUser={false} />
             )
           }
         />
@@ -1,14 +1,41 @@
+import { useState, useEffect, useCallback } from "react";
 import GridPostList from "@/components/GridPostList";
 import Loader from "@/components/Loader";
-import { useSavedPosts } from "@/context/SavedPostsContext";
+import { getSavedPosts } from "@/lib/api";
 
 const Saved = () => {
-  const { savedPosts, isLoading } = useSavedPosts();
+  const [savedPosts, setSavedPosts] = useState([]);
+  const [isLoading, setIsLoading] = useState(true);
+  const [isLoadingMore, setIsLoadingMore] = useState(false);
+  const [nextPage, setNextPage] = useState(null);   // Cursor for the next page
+  const [hasMore, setHasMore] = useState(false);
 
-  const savePosts = savedPosts?.documents?.map((savePost) => ({
+  // Saved posts come a page at a time, most recently saved first
+  const fetchSavedPosts = useCallback(async (cursor = null) => {
+    try {
+      if (cursor) {
+        setIsLoadingMore(true);
+      }
+      const response = await getSavedPosts({ cursor });
+      setSavedPosts(prev => (cursor ? [...prev, ...response.documents] : response.documents));
+      setNextPage(response.nextPage);
+      setHasMore(response.hasMore);
+    } catch (err) {
+      console.error('Error fetching saved posts:', err);
+    } finally {
+      setIsLoading(false);
+      setIsLoadingMore(false);
+    }
+  }, []);
+
+  useEffect(() => {
+    fetchSavedPosts(null);
+  }, [fetchSavedPosts]);
+
+  const savePosts = savedPosts.map((savePost) => ({
     ...savePost.post,
     user: savePost.post.user, // Use the user field from the post
-  })) || [];
+  }));
 
   return (
     <div className="saved-container">
@@ -26,13 +53,27 @@ const Saved = () => {
       {isLoading ? (
         <Loader />
       ) : (
-        <ul className="w-full flex justify-center max-w-5xl gap-9">
-          {savePosts?.length === 0 ? (
-            <p className="text-light-4">No available posts</p>
-          ) : (
-            <GridPostList posts={savePosts} showStats={false} />
+        <>
+          <ul className="w-full flex justify-center max-w-5xl gap-9">
+            {savePosts.length === 0 ? (
+              <p className="text-light-4">No available posts</p>
+            ) : (
+              <GridPostList posts={savePosts} showStats={false} />
+            )}
+          </ul>
+
+          {hasMore && (
+            <div className="flex justify-center w-full py-8">
+              <button
+                onClick={() => fetchSavedPosts(nextPage)}
+                disabled={isLoadingMore}
+                className="px-6 py-3 bg-primary-500 text-white rounded-lg hover:bg-primary-600 disabled:opacity-50 disabled:cursor-not-allowed"
+              >
+                {isLoadingMore ? "Loading..." : "Load More"}
+              </button>
+            </div>
           )}
-        </ul>
+        </>
       )}
     </div>
   );
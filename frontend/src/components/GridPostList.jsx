@@ -17,7 +17,7 @@ const GridPostList = ({
         <li key={post.id} className="relative min-w-80 aspect-square">
           <Link to={`/posts/${post.id}`} className="grid-post_link">
             <img
-              src={getImageUrl(post.imageUrl)}
+              src={getImageUrl(post.thumbnailUrl || post.imageUrl)}
               alt="post"
               className="h-full w-full object-cover object-center"
             />
@@ -15,21 +15,19 @@ const PostStats = ({ post, userId }) => {
   // Initialize likes based on is_liked status and likes_count
   const [likes, setLikes] = useState([]);
   const [likeCount, setLikeCount] = useState(post.likes_count || 0);
-  const [isSaved, setIsSaved] = useState(false);
 
   const { callApi: likePost } = useLikePost();
   const { callApi: savePost } = useSavePost();
   const { callApi: deleteSavePost } = useDeleteSavedPost();
-  const { savedPosts, refreshSavedPosts } = useSavedPosts();
-
-  // Find if this post is saved
-  const savedPostRecord = savedPosts?.documents?.find(
-    (record) => record.post?.id === post.id
-  );
+  const { savedRecords, requestSavedState, markSaved, markUnsaved } = useSavedPosts();
 
+  // Saved state is loaded in batches for every card on the page
   useEffect(() => {
-    setIsSaved(!!savedPostRecord);
-  }, [savedPostRecord]);
+    requestSavedState(post.id);
+  }, [post.id, requestSavedState]);
+
+  const savedRecordId = savedRecords[post.id];
+  const isSaved = savedRecordId === undefined ? !!post.is_saved : savedRecordId !== null;
 
   // Initialize likes state based on post.is_liked
   useEffect(() => {
@@ -74,16 +72,18 @@ const PostStats = ({ post, userId }) => {
   const handleSavePost = async (e) => {
     e.stopPropagation();
 
+    if (savedRecordId === undefined && post.is_saved) {
+      return; // Still loading the saved record this button would delete
+    }
+
     try {
-      if (savedPostRecord) {
-        await deleteSavePost(savedPostRecord.id);
-        setIsSaved(false);
+      if (savedRecordId) {
+        await deleteSavePost(savedRecordId);
+        markUnsaved(post.id);
       } else {
-        await savePost({ userId: userId, postId: post.id });
-        setIsSaved(true);
+        const record = await savePost({ userId: userId, postId: post.id });
+        markSaved(post.id, record.id);
       }
-      // Refresh saved posts list
-      refreshSavedPosts();
     } catch (error) {
       console.error('Error saving/deleting post:', error);
     }
@@ -1,46 +1,82 @@
-import { createContext, useContext, useEffect, useState } from 'react';
-import { useGetSavedPosts } from '@/hooks/useQueries';
+import { createContext, useCallback, useContext, useEffect, useRef, useState } from 'react';
+import { getSavedState } from '@/lib/api';
 import { useUserContext } from './AuthContext';
 
 const SavedPostsContext = createContext();
 
+// Matches MAX_SAVED_STATE_IDS on the backend
+const MAX_IDS_PER_REQUEST = 100;
+
+/**
+ * Tracks which posts the current user has saved, post by post.
+ *
+ * Cards ask for their post's state with requestSavedState(postId); every
+ * request made while a page renders is batched into one /saves/state/ call,
+ * so the full saved collection is never downloaded just to draw buttons.
+ */
 export const SavedPostsProvider = ({ children }) => {
-  const { data: savedPosts, callApi: fetchSavedPosts } = useGetSavedPosts();
-  const [isLoading, setIsLoading] = useState(false);
+  // postId -> saved record id, or null when known not to be saved
+  const [savedRecords, setSavedRecords] = useState({});
   const { isAuthenticated } = useUserContext();
 
-  // Fetch saved posts only when user is authenticated
+  const requested = useRef(new Set()); // Post ids already asked for
+  const pending = useRef(new Set());   // Post ids waiting for the next batch
+  const timer = useRef(null);
+
+  // Forget everything when the user changes
   useEffect(() => {
-    if (!isAuthenticated) {
-      return; // Don't fetch if user is not authenticated
-    }
+    setSavedRecords({});
+    requested.current = new Set();
+    pending.current = new Set();
+  }, [isAuthenticated]);
 
-    const loadSavedPosts = async () => {
-      setIsLoading(true);
+  const flush = useCallback(async () => {
+    timer.current = null;
+    const postIds = [...pending.current];
+    pending.current = new Set();
+
+    for (let i = 0; i < postIds.length; i += MAX_IDS_PER_REQUEST) {
+      const batch = postIds.slice(i, i + MAX_IDS_PER_REQUEST);
       try {
-        await fetchSavedPosts();
+        const saved = await getSavedState(batch);
+        setSavedRecords(prev => {
+          const next = { ...prev };
+          batch.forEach((postId) => {
+            next[postId] = saved[postId] ?? null;
+          });
+          return next;
+        });
       } catch (error) {
-        console.error('Error loading saved posts:', error);
-      } finally {
-        setIsLoading(false);
+        console.error('Error loading saved state:', error);
+        batch.forEach((postId) => requested.current.delete(postId)); // Retry on next request
       }
-    };
-
-    loadSavedPosts();
-  }, [isAuthenticated]); // Run when authentication status changes
+    }
+  }, []);
 
-  const refreshSavedPosts = async () => {
-    try {
-      await fetchSavedPosts();
-    } catch (error) {
-      console.error('Error refreshing saved posts:', error);
+  const requestSavedState = useCallback((postId) => {
+    if (!isAuthenticated || !postId || requested.current.has(postId)) {
+      return;
     }
-  };
+    requested.current.add(postId);
+    pending.current.add(postId);
+    if (!timer.current) {
+      timer.current = setTimeout(flush, 0);
+    }
+  }, [isAuthenticated, flush]);
+
+  const markSaved = useCallback((postId, savedRecordId) => {
+    setSavedRecords(prev => ({ ...prev, [postId]: savedRecordId }));
+  }, []);
+
+  const markUnsaved = useCallback((postId) => {
+    setSavedRecords(prev => ({ ...prev, [postId]: null }));
+  }, []);
 
   const value = {
-    savedPosts,
-    isLoading,
-    refreshSavedPosts,
+    savedRecords,
+    requestSavedState,
+    markSaved,
+    markUnsaved,
   };
 
   return (
@@ -16,10 +16,10 @@ import {
   getUserById,
   updateUser,
   toggleUserPrivacy,
+  followUser,
   getInfinitePosts,
   savePost,
   deleteSavedPost,
-  getSavedPosts,
   getComments,
   createComment,
   updateComment,
@@ -111,7 +111,6 @@ export const useSavePost = () => {
   return useApiCall(apiFunction);
 };
 export const useDeleteSavedPost = () => useApiCall(deleteSavedPost);
-export const useGetSavedPosts = () => useApiCall(getSavedPosts);
 
 // ============================================================
 // USER QUERIES
@@ -119,7 +118,7 @@ export const useGetSavedPosts = () => useApiCall(getSavedPosts);
 
 export const useGetCurrentUser = () => useApiCall(getCurrentUser);
 export const useGetUsers = (limit) => {
-  const apiFunction = useCallback(() => getUsers(limit), [limit]);
+  const apiFunction = useCallback(() => getUsers({ limit }), [limit]);
   return useApiCall(apiFunction, true); // Auto-fetch
 };
 export const useGetUserById = (userId) => {
@@ -128,6 +127,7 @@ export const useGetUserById = (userId) => {
 };
 export const useUpdateUser = () => useApiCall(updateUser);
 export const useToggleUserPrivacy = () => useApiCall(toggleUserPrivacy);
+export const useFollowUser = () => useApiCall(followUser);
 
 // ============================================================
 // COMMENT QUERIES
@@ -95,11 +95,36 @@ export const getCurrentUser = async () => {
   }
 };
 
-export const getUsers = async (limit) => {
+export const getLikedPosts = async ({ cursor = null } = {}) => {
   try {
-    const params = limit ? { limit } : {};
+    const response = await api.get('/api/auth/me/liked/', {
+      params: cursor ? { cursor } : {}
+    });
+    const nextCursor = getCursorFromUrl(response.data.next);
+    return {
+      documents: response.data.results,
+      nextPage: nextCursor,
+      hasMore: nextCursor !== null
+    };
+  } catch (error) {
+    console.error('Error getting liked posts:', error);
+    throw error;
+  }
+};
+
+export const getUsers = async ({ cursor = null, query = '', limit } = {}) => {
+  try {
+    const params = {};
+    if (cursor) params.cursor = cursor;
+    if (query) params.q = query;
+    if (limit) params.limit = limit;
     const response = await api.get('/api/auth/users/', { params });
-    return { documents: response.data.results || response.data };
+    const nextCursor = getCursorFromUrl(response.data.next);
+    return {
+      documents: response.data.results || response.data,
+      nextPage: nextCursor,
+      hasMore: nextCursor !== null
+    };
   } catch (error) {
     console.error('Error getting users:', error);
     throw error;
@@ -188,21 +213,30 @@ export const createPost = async (post) => {
 };
 
 
-export const getInfinitePosts = async ({ pageParam = 1 }) => {
+/**
+ * Extracts the opaque cursor from a next/previous link of a cursor-paginated response
+ * @param {string|null} url - The `next` or `previous` URL returned by the API
+ * @returns {string|null} - Cursor value or null when there is no further page
+ */
+export const getCursorFromUrl = (url) => {
+  if (!url) return null;
+  return new URL(url).searchParams.get('cursor');
+};
+
+export const getInfinitePosts = async ({ pageParam = null }) => {
   try {
     const response = await api.get('/api/posts/', {
-      params: { page: pageParam }
+      params: pageParam ? { cursor: pageParam } : {}
     });
     
-    // Extract posts from paginated response
+    // Extract posts from cursor-paginated response
     const posts = response.data.results || response.data;
-    const hasNext = response.data.next !== null;
-    const hasMore = hasNext || (posts && posts.length === 10);
+    const nextCursor = getCursorFromUrl(response.data.next);
     
     return { 
       documents: posts,
-      nextPage: hasMore ? pageParam + 1 : null,
-      hasMore: hasMore
+      nextPage: nextCursor,
+      hasMore: nextCursor !== null
     };
   } catch (error) {
     console.error('Error getting infinite posts:', error);
@@ -284,22 +318,42 @@ export const likePost = async (postId, likesArray) => {
   }
 };
 
-export const getUserPosts = async (userId) => {
+export const followUser = async (userId) => {
+  try {
+    const response = await api.post(`/api/users/${userId}/follow/`);
+    return response.data;
+  } catch (error) {
+    console.error('Error following user:', error);
+    throw error;
+  }
+};
+
+export const getUserPosts = async (userId, cursor = null) => {
   try {
     if (!userId) throw new Error('User ID is required');
-    const response = await api.get(`/api/users/${userId}/posts/`);
-    return { documents: response.data.results || response.data };
+    const response = await api.get(`/api/users/${userId}/posts/`, {
+      params: cursor ? { cursor } : {}
+    });
+    return {
+      documents: response.data.results || response.data,
+      nextCursor: getCursorFromUrl(response.data.next)
+    };
   } catch (error) {
     console.error('Error getting user posts:', error);
     throw error;
   }
 };
 
-export const getPublicUserPosts = async (userId) => {
+export const getPublicUserPosts = async (userId, cursor = null) => {
   try {
     if (!userId) throw new Error('User ID is required');
-    const response = await api.get(`/api/users/public/${userId}/posts/`);
-    return { documents: response.data.results || response.data };
+    const response = await api.get(`/api/users/public/${userId}/posts/`, {
+      params: cursor ? { cursor } : {}
+    });
+    return {
+      documents: response.data.results || response.data,
+      nextCursor: getCursorFromUrl(response.data.next)
+    };
   } catch (error) {
     console.error('Error getting public user posts:', error);
     throw error;
@@ -332,16 +386,36 @@ export const deleteSavedPost = async (savedRecordId) => {
   }
 };
 
-export const getSavedPosts = async () => {
+export const getSavedPosts = async ({ cursor = null } = {}) => {
   try {
-    const response = await api.get('/api/saves/');
-    return { documents: response.data.results || response.data };
+    const response = await api.get('/api/saves/', {
+      params: cursor ? { cursor } : {}
+    });
+    const nextCursor = getCursorFromUrl(response.data.next);
+    return {
+      documents: response.data.results || response.data,
+      nextPage: nextCursor,
+      hasMore: nextCursor !== null
+    };
   } catch (error) {
     console.error('Error getting saved posts:', error);
     throw error;
   }
 };
 
+// Returns { postId: savedRecordId } for the given posts that are saved
+export const getSavedState = async (postIds) => {
+  try {
+    const response = await api.get('/api/saves/state/', {
+      params: { ids: postIds.join(',') }
+    });
+    return response.data.saved;
+  } catch (error) {
+    console.error('Error getting saved state:', error);
+    throw error;
+  }
+};
+
 // ============================================================
 // COMMENT SERVICES
 // ============================================================